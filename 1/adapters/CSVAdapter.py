@@ -1,7 +1,6 @@
 """
 CSVAdapter.py
 """
-import pandas as pd
 import tempfile
 import os
 import json
@@ -43,6 +42,7 @@ class CSVAdapter(ChainableAdapter):
         return self
 
     def _execute_self(self, input_data=None):
+        import pandas as pd
         try:
             # Handle different operations
             if self._operation == 'read_file':
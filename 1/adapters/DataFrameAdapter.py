@@ -1,8 +1,6 @@
 """
 DataFrameAdapter.py
 """
-import pandas as pd
-import numpy as np
 import os
 import json
 import tempfile
@@ -102,6 +100,7 @@ class DataFrameAdapter(ChainableAdapter):
         return self
 
     def _execute_self(self, input_data=None):
+        import pandas as pd
         # Operations that populate self._df
         if self._operation == 'load_data':
             data = self._params.get('data')
@@ -2,7 +2,6 @@
 DatabaseAdapter.py
 """
 import sqlite3
-import pandas as pd
 import os
 import json
 import tempfile
@@ -2,7 +2,6 @@
 HTMLAdapter.py
 """
 import os
-from bs4 import BeautifulSoup
 from .ChainableAdapter import ChainableAdapter
 
 
@@ -64,6 +63,7 @@ class HTMLAdapter(ChainableAdapter):
         return self
 
     def _execute_self(self, input_data=None):
+        from bs4 import BeautifulSoup
         try:
             # Operations that populate self._soup
             if self._operation == 'parse_string':
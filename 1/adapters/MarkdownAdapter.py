@@ -2,7 +2,6 @@
 MarkdownAdapter.py
 """
 import os
-import markdown
 import re
 from .ChainableAdapter import ChainableAdapter
 
@@ -58,6 +57,7 @@ class MarkdownAdapter(ChainableAdapter):
         return self
 
     def _execute_self(self, input_data=None):
+        import markdown
         try:
             # Operations that populate self._content
             if self._operation == 'parse_file':
@@ -5,7 +5,6 @@ import sqlite3
 import tempfile
 import os
 import json
-import pandas as pd
 from .ChainableAdapter import ChainableAdapter
 
 
@@ -39,6 +38,7 @@ class SQLAdapter(ChainableAdapter):
         return self
 
     def _execute_self(self, input_data=None):
+        import pandas as pd
         temp_db = None
 
         try:
@@ -4,7 +4,6 @@ Adapter do przetwarzania obrazów i wideo za pomocą OpenCV.
 
 import os
 import tempfile
-import numpy as np
 import json
 from .base import BaseAdapter
 
@@ -35,6 +34,7 @@ class OpenCVAdapter(BaseAdapter):
 
     def _read_image(self, input_data, cv2):
         """Wczytuje obraz z pliku lub danych binarnych."""
+        import numpy as np
         # Sprawdź źródło obrazu
         if isinstance(input_data, str) and os.path.exists(input_data):
             # Wczytaj z pliku
@@ -74,6 +74,7 @@ class OpenCVAdapter(BaseAdapter):
 
     def _process_image(self, input_data, cv2):
         """Przetwarza obraz za pomocą OpenCV."""
+        import numpy as np
         # Pobierz obraz wejściowy
         if isinstance(input_data, dict) and 'image' in input_data:
             image = input_data['image']
@@ -150,6 +151,7 @@ class OpenCVAdapter(BaseAdapter):
 
     def _detect_objects(self, input_data, cv2):
         """Wykrywa obiekty na obrazie za pomocą kaskad Haara lub DNN."""
+        import numpy as np
         # Pobierz obraz wejściowy
         if isinstance(input_data, dict) and 'image' in input_data:
             image = input_data['image']
@@ -241,6 +243,7 @@ class OpenCVAdapter(BaseAdapter):
 
     def _detect_with_dnn(self, image, cv2):
         """Wykrywa obiekty za pomocą modeli DNN."""
+        import numpy as np
         # Pobierz model i konfigurację
         model_path = self._params.get('model_path')
         config_path = self._params.get('config_path')
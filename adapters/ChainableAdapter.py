@@ -2,7 +2,6 @@ import subprocess
 import os
 import json
 import tempfile
-import requests
 from typing import Dict, Any, List, Union
 
 ADAPTERS = {}
@@ -10,6 +9,18 @@ ADAPTERS = {}
 class ChainableAdapter:
     """Bazowa klasa dla adapterów, które można łączyć."""
 
+    # Czy adapter ma natywną implementację _execute_self_async()
+    supports_async = False
+
+    # Czy instancje adaptera mogą wykonywać się równolegle (brak stanu współdzielonego w klasie)
+    thread_safe = True
+
+    # Czy wynik zależy wyłącznie od parametrów i danych wejściowych (można go zapamiętać)
+    deterministic = False
+
+    # Czy identyczne równoczesne wykonania mogą współdzielić jedno wykonanie (core/singleflight.py)
+    single_flight = True
+
     def __init__(self, name=None, previous=None):
         self.name = name
         self._params = {}
@@ -42,6 +53,32 @@ class ChainableAdapter:
         """Implementacja wykonania specyficzna dla konkretnego adaptera."""
         raise NotImplementedError("Subclasses must implement _execute_self()")
 
+    async def execute_async(self, input_data=None):
+        """Asynchronicznie wykonuje adapter oraz wszystkie poprzednie w łańcuchu."""
+        if self._previous:
+            # Wykonaj poprzedni adapter w łańcuchu
+            input_data = await self._previous.execute_async(input_data)
+
+        # Wykonaj ten adapter
+        return await self._execute_self_async(input_data)
+
+    async def _execute_self_async(self, input_data=None):
+        """Domyślnie uruchamia blokujące _execute_self() w puli wątków pętli zdarzeń."""
+        # asyncio jest już załadowane, skoro działa pętla - import modułu nie spowalnia startu
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._execute_self, input_data)
+
+    def execute_stream(self, records=None):
+        """Wykonuje adapter (wraz z łańcuchem) osobno dla każdego rekordu strumienia."""
+        if records is None:
+            yield self.execute(None)
+            return
+
+        for record in records:
+            yield self.execute(record)
+
     def reset(self):
         """Resetuje parametry adaptera."""
         self._params = {}
@@ -1,87 +1,91 @@
 # Plik inicjalizacyjny z rejestracją adapterów
 """
 Moduł inicjalizacyjny adapterów.
-Importuje i rejestruje wszystkie dostępne adaptery.
+Rejestruje wszystkie dostępne adaptery w leniwym rejestrze - moduł adaptera
+(wraz z jego zależnościami) jest importowany dopiero przy pierwszym użyciu.
 """
 
+from .base import BaseAdapter
+from .pool import AdapterPool
+from .registry import LazyAdapterRegistry, ENTRY_POINT_GROUP, import_target
 
-# Dodaj na początku pliku importy nowych adapterów
-from .tts_adapter import TTSAdapter
-from .stt_adapter import STTAdapter
-from .rpi_audio_adapter import RpiAudioAdapter
-from .opencv_adapter import OpenCVAdapter
-from .rtsp_adapter import RtspAdapter
+# Klasy adapterów: nazwa klasy -> ścieżka względem pakietu
+ADAPTER_CLASSES = {
+    'BashAdapter': '.bash_adapter:BashAdapter',
+    'HttpClientAdapter': '.http_client_adapter:HttpClientAdapter',
+    'HttpServerAdapter': '.http_server_adapter:HttpServerAdapter',
+    'FileAdapter': '.file_adapter:FileAdapter',
+    'PythonAdapter': '.python_adapter:PythonAdapter',
+    'DatabaseAdapter': '.database_adapter:DatabaseAdapter',
+    'MLAdapter': '.ml_adapter:MLAdapter',
+    'MessageQueueAdapter': '.message_queue_adapter:MessageQueueAdapter',
+    'WebSocketAdapter': '.websocket_adapter:WebSocketAdapter',
+    'ConditionalAdapter': '.conditional_adapter:ConditionalAdapter',
 
+    # Adaptery specyficzne dla drukarek
+    'ZplAdapter': '.zpl_adapter:ZplAdapter',
+    'EscPosAdapter': '.escpos_adapter:EscPosAdapter',
+    'PclAdapter': '.pcl_adapter:PclAdapter',
+    'EpcosAdapter': '.epcos_adapter:EpcosAdapter',
 
-from .base import BaseAdapter
+    # Adaptery multimediów
+    'OpenCVAdapter': '.opencv_adapter:OpenCVAdapter',
+    'RtspAdapter': '.rtsp_adapter:RtspAdapter',
+    'TTSAdapter': '.tts_adapter:TTSAdapter',
+    'STTAdapter': '.stt_adapter:STTAdapter',
+    'RpiAudioAdapter': '.rpi_audio_adapter:RpiAudioAdapter'
+}
 
-# Importowanie adapterów
-from .bash_adapter import BashAdapter
-from .http_client_adapter import HttpClientAdapter
-from .http_server_adapter import HttpServerAdapter
-from .file_adapter import FileAdapter
-from .python_adapter import PythonAdapter
-from .database_adapter import DatabaseAdapter
-from .ml_adapter import MLAdapter
-from .message_queue_adapter import MessageQueueAdapter
-from .websocket_adapter import WebSocketAdapter
-from .conditional_adapter import ConditionalAdapter
+# Adaptery w rejestrze: nazwa adaptera -> nazwa klasy
+ADAPTER_NAMES = {
+    'bash': 'BashAdapter',
+    'http_client': 'HttpClientAdapter',
+    'http_server': 'HttpServerAdapter',
+    'file': 'FileAdapter',
+    'python': 'PythonAdapter',
+    'database': 'DatabaseAdapter',
+    'ml': 'MLAdapter',
+    'message_queue': 'MessageQueueAdapter',
+    'websocket': 'WebSocketAdapter',
+    'conditional': 'ConditionalAdapter',
+    'zpl': 'ZplAdapter',
+    'escpos': 'EscPosAdapter',
+    'pcl': 'PclAdapter',
+    'epcos': 'EpcosAdapter',
+    'opencv': 'OpenCVAdapter',
+    'rtsp': 'RtspAdapter',
+    'tts': 'TTSAdapter',
+    'stt': 'STTAdapter',
+    'rpi_audio': 'RpiAudioAdapter'
+}
 
-# Adaptery specyficzne dla drukarek
-from .zpl_adapter import ZplAdapter
-from .escpos_adapter import EscPosAdapter
-from .pcl_adapter import PclAdapter
-from .epcos_adapter import EpcosAdapter
+# Nazwy atrybutów modułu różne od nazw adapterów (np. 'from adapters import file_adapter')
+_INSTANCE_ALIASES = {'file_adapter': 'file'}
 
-# Tworzenie instancji adapterów
-bash = BashAdapter('bash')
-http_client = HttpClientAdapter('http_client')
-http_server = HttpServerAdapter('http_server')
-file_adapter = FileAdapter('file')
-python = PythonAdapter('python')
-database = DatabaseAdapter('database')
-ml = MLAdapter('ml')
-message_queue = MessageQueueAdapter('message_queue')
-websocket = WebSocketAdapter('websocket')
-conditional = ConditionalAdapter('conditional')
+# Słownik wszystkich adapterów (prototypów) - ładowanych przy pierwszym odczycie
+ADAPTERS = LazyAdapterRegistry(package=__name__)
+for _name, _class_name in ADAPTER_NAMES.items():
+    ADAPTERS.register(_name, ADAPTER_CLASSES[_class_name])
 
-# Adaptery drukarek
-zpl = ZplAdapter('zpl')
-escpos = EscPosAdapter('escpos')
-pcl = PclAdapter('pcl')
-epcos = EpcosAdapter('epcos')
+# Adaptery zewnętrznych pakietów (entry points '2print.adapters')
+ADAPTERS.load_entry_points()
 
-# Dodaj do sekcji tworzenia instancji adapterów
-opencv = OpenCVAdapter('opencv')
-rtsp = RtspAdapter('rtsp')
-tts = TTSAdapter('tts')
-stt = STTAdapter('stt')
-rpi_audio = RpiAudioAdapter('rpi_audio')
+# Pula izolowanych instancji - ADAPTERS przechowuje jedynie prototypy
+ADAPTER_POOL = AdapterPool(ADAPTERS)
 
 
+def __getattr__(name):
+    """Leniwie udostępnia klasy i instancje adapterów jako atrybuty modułu (np. 'from adapters import bash')."""
+    if name in ADAPTER_CLASSES:
+        value = import_target(ADAPTER_CLASSES[name], __name__)
+    else:
+        adapter_name = _INSTANCE_ALIASES.get(name, name)
+        if adapter_name not in ADAPTERS:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        value = ADAPTERS[adapter_name]
 
-# Słownik wszystkich adapterów
-ADAPTERS = {
-    'bash': bash,
-    'http_client': http_client,
-    'http_server': http_server,
-    'file': file_adapter,
-    'python': python,
-    'database': database,
-    'ml': ml,
-    'message_queue': message_queue,
-    'websocket': websocket,
-    'conditional': conditional,
-    'zpl': zpl,
-    'escpos': escpos,
-    'pcl': pcl,
-    'epcos': epcos,
-    'opencv': opencv,
-    'rtsp': rtsp,
-    'tts': tts,
-    'stt': stt,
-    'rpi_audio': rpi_audio
-}
+    globals()[name] = value
+    return value
 
 
 # Funkcja pomocnicza do rejestracji nowego adaptera
@@ -91,4 +95,4 @@ def register_adapter(adapter_id, adapter_instance):
         raise TypeError("Adapter must be an instance of BaseAdapter")
 
     ADAPTERS[adapter_id] = adapter_instance
-    return adapter_instance
\ No newline at end of file
+    return adapter_instance
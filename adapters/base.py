@@ -3,11 +3,21 @@
 base.py
 """
 
-
-
 class BaseAdapter:
     """Bazowa klasa dla wszystkich adapterów."""
 
+    # Czy adapter ma natywną implementację execute_async()
+    supports_async = False
+
+    # Czy instancje adaptera mogą wykonywać się równolegle (brak stanu współdzielonego w klasie)
+    thread_safe = True
+
+    # Czy wynik zależy wyłącznie od parametrów i danych wejściowych (można go zapamiętać)
+    deterministic = False
+
+    # Czy identyczne równoczesne wykonania mogą współdzielić jedno wykonanie (core/singleflight.py)
+    single_flight = True
+
     def __init__(self, name):
         self.name = name
         self._params = {}
@@ -25,6 +35,33 @@ class BaseAdapter:
         """Wykonuje adapter z ustawionymi parametrami."""
         raise NotImplementedError("Subclasses must implement execute()")
 
+    async def execute_async(self, input_data=None):
+        """
+        Asynchronicznie wykonuje adapter.
+
+        Domyślnie blokujące execute() trafia do puli wątków pętli zdarzeń;
+        adaptery oczekujące na I/O mogą nadpisać tę metodę natywną implementacją.
+        """
+        # asyncio jest już załadowane, skoro działa pętla - import modułu nie spowalnia startu
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.execute, input_data)
+
+    def execute_stream(self, records=None):
+        """
+        Wykonuje adapter na strumieniu rekordów (tryb strumieniowy pipeline'u).
+
+        Domyślnie execute() jest wywoływane osobno dla każdego rekordu;
+        adaptery czytające lub zapisujące dane przyrostowo mogą nadpisać tę metodę.
+        """
+        if records is None:
+            yield self.execute(None)
+            return
+
+        for record in records:
+            yield self.execute(record)
+
     def reset(self):
         """Resetuje parametry adaptera."""
         self._params = {}
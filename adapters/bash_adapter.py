@@ -3,16 +3,35 @@
 bash_adapter.py
 """
 import subprocess
+import signal
 import tempfile
 import os
 import json
 import ChainableAdapter
+from .cancellation import current_token, OperationCancelled
+
+
+def _kill_process_group(process):
+    """Zabija proces polecenia razem z procesami potomnymi (cała grupa procesów)."""
+    if process.poll() is not None:
+        return
+
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
 
 
 
 class BashAdapter(ChainableAdapter):
     """Adapter wykonujący skrypty bash."""
 
+    # Skrypt może zmieniać stan systemu - każde wywołanie musi się wykonać
+    single_flight = False
+
     def _execute_self(self, input_data=None):
         # Zapisz dane wejściowe do pliku tymczasowego (jeśli istnieją)
         input_file = None
@@ -37,24 +56,49 @@ class BashAdapter(ChainableAdapter):
         env = os.environ.copy()
         env.update(self._params.get('env', {}))
 
-        result = subprocess.run(
+        # Własna sesja - przy anulowaniu zabijamy całą grupę procesów, nie tylko powłokę
+        process = subprocess.Popen(
             command,
             shell=True,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            env=env
+            env=env,
+            start_new_session=True
         )
 
-        # Usuń plik tymczasowy jeśli był utworzony
-        if input_file and os.path.exists(input_file):
-            os.unlink(input_file)
+        token = current_token()
+        kill = lambda: _kill_process_group(process)
+        token.add_callback(kill)
+
+        timeout = self._params.get('timeout')
+        remaining = token.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_process_group(process)
+            process.communicate()
+            if token.cancelled:
+                raise OperationCancelled(token.reason)
+            raise RuntimeError(f"Bash command timed out after {self._params.get('timeout')}s")
+        finally:
+            token.remove_callback(kill)
+
+            # Usuń plik tymczasowy jeśli był utworzony
+            if input_file and os.path.exists(input_file):
+                os.unlink(input_file)
+
+        token.raise_if_cancelled()
 
         # Sprawdź wynik
-        if result.returncode != 0 and not self._params.get('ignore_errors', False):
-            raise RuntimeError(f"Bash command failed: {result.stderr}")
+        if process.returncode != 0 and not self._params.get('ignore_errors', False):
+            raise RuntimeError(f"Bash command failed: {stderr}")
 
         # Zwróć wynik
-        output = result.stdout.strip()
+        output = stdout.strip()
 
         # Automatycznie parsuj JSON jeśli wygląda jak JSON
         if output.startswith('{') or output.startswith('['):
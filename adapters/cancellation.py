@@ -0,0 +1,125 @@
+# Kooperacyjne anulowanie wykonania
+"""
+cancellation.py
+"""
+
+"""
+Tokeny anulowania przekazywane adapterom przez silniki.
+
+Silnik tworzy token dla każdego kroku (z terminem wynikającym z 'timeout'
+kroku i 'deadline' workflow) i ustawia go jako bieżący w kontekście wykonania
+kroku (contextvars - działa dla wątków i zadań asyncio). Adaptery mogą:
+- sprawdzać token w pętlach (raise_if_cancelled),
+- ograniczać własne limity czasu do pozostałego czasu (remaining),
+- rejestrować wywołania zwrotne, np. zabicie grupy procesów (add_callback).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class OperationCancelled(RuntimeError):
+    """Wykonanie zostało anulowane (przekroczony limit czasu lub przerwanie)."""
+
+
+class CancellationToken:
+    """Token anulowania z opcjonalnym terminem."""
+
+    def __init__(self, timeout=None, parent=None):
+        """
+        Inicjalizacja tokenu.
+
+        Args:
+            timeout: Limit czasu w sekundach (None - bez limitu)
+            parent: Token nadrzędny - jego anulowanie anuluje też ten token
+        """
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.reason = None
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+        if parent is not None:
+            if parent.deadline is not None and (self.deadline is None or parent.deadline < self.deadline):
+                self.deadline = parent.deadline
+            parent.add_callback(lambda: self.cancel(parent.reason))
+
+    @property
+    def cancelled(self):
+        """Czy token został anulowany (lub minął jego termin)."""
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("Deadline exceeded")
+        return self._event.is_set()
+
+    def remaining(self, default=None):
+        """Zwraca czas do terminu w sekundach (default, jeśli termin nie jest ustawiony)."""
+        if self.deadline is None:
+            return default
+        return max(0.0, self.deadline - time.monotonic())
+
+    def cancel(self, reason="Cancelled"):
+        """Anuluje token i wywołuje zarejestrowane wywołania zwrotne."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def add_callback(self, callback):
+        """Rejestruje funkcję wywoływaną przy anulowaniu (od razu, jeśli token już anulowano)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+
+        callback()
+
+    def remove_callback(self, callback):
+        """Usuwa zarejestrowaną funkcję."""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        """Zgłasza OperationCancelled, jeśli token został anulowany."""
+        if self.cancelled:
+            raise OperationCancelled(self.reason)
+
+    def wait(self, timeout=None):
+        """Czeka na anulowanie najwyżej timeout sekund; zwraca True, jeśli anulowano."""
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        return self._event.wait(timeout) or self.cancelled
+
+
+# Token, który nigdy nie jest anulowany (wykonania poza silnikiem)
+NEVER_CANCELLED = CancellationToken()
+
+_current_token = ContextVar('cancellation_token', default=NEVER_CANCELLED)
+
+
+def current_token():
+    """Zwraca token anulowania bieżącego kontekstu wykonania."""
+    return _current_token.get()
+
+
+@contextmanager
+def use_token(token):
+    """Ustawia token anulowania bieżącego kontekstu na czas bloku."""
+    reset_token = _current_token.set(token)
+
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset_token)
@@ -4,8 +4,12 @@ conditional_adapter.py
 """
 
 # conditional_adapter.py
+import re
 from adapters import ChainableAdapter
 
+# Dawna postać warunku wykonywana przez exec: 'result = <wyrażenie>'
+LEGACY_RESULT_PATTERN = re.compile(r'^\s*result\s*=(?!=)\s*(.+?)\s*$', re.DOTALL)
+
 
 class ConditionalAdapter(ChainableAdapter):
     """Adapter do warunkowego wykonywania operacji."""
@@ -26,14 +30,9 @@ class ConditionalAdapter(ChainableAdapter):
             # Jeśli to funkcja, wywołaj ją
             result = condition(input_data)
         elif isinstance(condition, str):
-            # Jeśli to kod Pythona, wykonaj go
-            global_vars = {
-                'input_data': input_data,
-                'params': self._params,
-                'result': False
-            }
-            exec(condition, global_vars)
-            result = global_vars.get('result', False)
+            # Jeśli to wyrażenie, oblicz je bezpiecznym językiem wyrażeń (bez exec)
+            expression = self._compile_condition(condition)
+            result = bool(expression({'input_data': input_data, 'params': self._params}))
         else:
             # Jeśli to wartość, użyj jej bezpośrednio
             result = bool(condition)
@@ -53,6 +52,18 @@ class ConditionalAdapter(ChainableAdapter):
         # Jeśli nie podano odpowiedniej ścieżki, zwróć dane wejściowe
         return input_data
 
+    @staticmethod
+    def _compile_condition(condition):
+        """Kompiluje warunek; obsługuje też dawną postać 'result = <wyrażenie>'."""
+        # Import w miejscu użycia - core importuje pakiet adapters
+        from core.expressions import compile_expression
+
+        match = LEGACY_RESULT_PATTERN.match(condition)
+        if match:
+            condition = match.group(1)
+
+        return compile_expression(condition)
+
 
 # Dodaj adapter do dostępnych adapterów
 conditional = ConditionalAdapter('conditional')
@@ -6,11 +6,16 @@ import os
 import json
 import ChainableAdapter
 
+# Domyślna liczba rekordów zapisywanych jednym executemany w trybie strumieniowym
+DEFAULT_BATCH_SIZE = 1000
 
 
 class DatabaseAdapter(ChainableAdapter):
     """Adapter do operacji bazodanowych."""
 
+    # Zapytania mogą modyfikować dane, a odczyty zależą od stanu bazy
+    single_flight = False
+
     def _execute_self(self, input_data=None):
         db_type = self._params.get('type', 'sqlite')
         connection_string = self._params.get('connection')
@@ -26,21 +31,10 @@ class DatabaseAdapter(ChainableAdapter):
             conn = sqlite3.connect(connection_string or ':memory:')
             cursor = conn.cursor()
 
-            # Wykonanie zapytania
-            if isinstance(input_data, dict):
-                cursor.execute(query, input_data)
-            elif isinstance(input_data, list) and all(isinstance(item, dict) for item in input_data):
-                cursor.executemany(query, input_data)
-            else:
-                cursor.execute(query)
-
-            # Pobranie wyników
-            if query.strip().upper().startswith(('SELECT', 'PRAGMA')):
-                columns = [col[0] for col in cursor.description]
-                result = [dict(zip(columns, row)) for row in cursor.fetchall()]
-            else:
+            result = self._execute_sqlite(cursor, query, input_data)
+
+            if not query.strip().upper().startswith(('SELECT', 'PRAGMA')):
                 conn.commit()
-                result = {'affected_rows': cursor.rowcount}
 
             conn.close()
             return result
@@ -78,3 +72,73 @@ class DatabaseAdapter(ChainableAdapter):
         else:
             raise ValueError(f"Unsupported database type: {db_type}")
 
+    def execute_many(self, inputs):
+        """
+        Wykonuje zapytanie dla paczki danych wejściowych.
+
+        Dla SQLite cała paczka używa jednego połączenia i jednej transakcji
+        (jeden commit), a każdy element dostaje własny wynik. Pozostałe bazy
+        wykonują zapytanie osobno dla każdego elementu.
+        """
+        inputs = list(inputs)
+        query = self._params.get('query')
+
+        if self._previous or self._params.get('type', 'sqlite') != 'sqlite' or not query:
+            return [self.execute(item) for item in inputs]
+
+        import sqlite3
+
+        is_select = query.strip().upper().startswith(('SELECT', 'PRAGMA'))
+        conn = sqlite3.connect(self._params.get('connection') or ':memory:')
+
+        try:
+            cursor = conn.cursor()
+
+            results = [self._execute_sqlite(cursor, query, item) for item in inputs]
+
+            if not is_select:
+                conn.commit()
+
+            return results
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _execute_sqlite(cursor, query, input_data):
+        """Wykonuje zapytanie na kursorze SQLite i zwraca wynik."""
+        # Wykonanie zapytania
+        if isinstance(input_data, dict):
+            cursor.execute(query, input_data)
+        elif isinstance(input_data, list) and all(isinstance(item, dict) for item in input_data):
+            cursor.executemany(query, input_data)
+        else:
+            cursor.execute(query)
+
+        # Pobranie wyników
+        if query.strip().upper().startswith(('SELECT', 'PRAGMA')):
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        return {'affected_rows': cursor.rowcount}
+
+    def execute_stream(self, records=None):
+        """
+        Wykonuje zapytanie dla strumienia rekordów (słowników) w paczkach 'batch_size'.
+
+        Każda paczka jest zapisywana jednym executemany; zwracany jest wynik każdej paczki.
+        """
+        if records is None:
+            yield self._execute_self(None)
+            return
+
+        batch_size = int(self._params.get('batch_size', DEFAULT_BATCH_SIZE))
+        batch = []
+
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield self._execute_self(batch)
+                batch = []
+
+        if batch:
+            yield self._execute_self(batch)
@@ -15,6 +15,9 @@ from .base import BaseAdapter
 class EpcosAdapter(BaseAdapter):
     """Adapter do przetwarzania i renderowania języka EPCOS."""
 
+    # Renderowanie EPCOS jest deterministyczne
+    deterministic = True
+
     def _execute_self(self, input_data=None):
         # Pobierz dane EPCOS
         epcos_data = input_data
@@ -16,6 +16,9 @@ from .base import BaseAdapter
 class EscPosAdapter(BaseAdapter):
     """Adapter do interpretacji i renderowania komend ESC/POS."""
 
+    # Renderowanie ESC/POS zależy tylko od danych i parametrów
+    deterministic = True
+
     def _execute_self(self, input_data=None):
         # Pobierz dane ESC/POS
         escpos_data = input_data
@@ -6,9 +6,15 @@ import os
 import json
 import ChainableAdapter
 
+# Domyślny rozmiar fragmentu przy strumieniowym odczycie binarnym (w bajtach)
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
 class FileAdapter(ChainableAdapter):
     """Adapter do operacji na plikach."""
 
+    # Zapisy plików są efektami ubocznymi, a odczyty zależą od stanu dysku
+    single_flight = False
+
     def _execute_self(self, input_data=None):
         operation = self._params.get('operation', 'read')
         path = self._params.get('path')
@@ -50,6 +56,56 @@ class FileAdapter(ChainableAdapter):
         else:
             raise ValueError(f"Unsupported file operation: {operation}")
 
+    def execute_stream(self, records=None):
+        """
+        Strumieniowy odczyt lub zapis pliku.
+
+        Odczyt zwraca kolejne linie (tryb tekstowy, ze znakiem końca linii) lub fragmenty
+        'chunk_size' bajtów (tryb binarny). Zapis dopisuje kolejne rekordy do jednego
+        otwartego pliku - słowniki i listy jako linie JSON.
+        """
+        operation = self._params.get('operation', 'read')
+        path = self._params.get('path')
+
+        if not path:
+            raise ValueError("File adapter requires 'path' method")
+
+        if operation == 'read':
+            mode = self._params.get('mode', 'r')
+
+            if 'b' in mode:
+                chunk_size = int(self._params.get('chunk_size', DEFAULT_CHUNK_SIZE))
+                with open(path, mode) as f:
+                    while True:
+                        chunk = f.read(chunk_size)
+                        if not chunk:
+                            break
+                        yield chunk
+            else:
+                with open(path, mode, encoding=self._params.get('encoding', 'utf-8')) as f:
+                    yield from f
+
+        elif operation == 'write':
+            mode = self._params.get('mode', 'w')
+            encoding = self._params.get('encoding', 'utf-8') if 'b' not in mode else None
+
+            # Utwórz katalogi jeśli nie istnieją
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+            count = 0
+            with open(path, mode, encoding=encoding) as f:
+                for record in records or ():
+                    if isinstance(record, (dict, list)) and 'b' not in mode:
+                        f.write(json.dumps(record) + '\n')
+                    else:
+                        f.write(record)
+                    count += 1
+
+            yield {'success': True, 'path': path, 'records': count}
+
+        else:
+            raise ValueError(f"Unsupported file operation: {operation}")
+
 
 
 # Tworzenie i rejestracja adapterów
@@ -8,6 +8,7 @@ import json
 import tempfile
 import requests
 import ChainableAdapter
+from .cancellation import current_token
 from typing import Dict, Any, List, Union
 
 
@@ -15,6 +16,9 @@ from typing import Dict, Any, List, Union
 class HttpClientAdapter(ChainableAdapter):
     """Adapter wykonujący zapytania HTTP jako klient."""
 
+    # Zapytania (np. POST) mogą zmieniać stan zdalnej usługi
+    single_flight = False
+
     def _execute_self(self, input_data=None):
         url = self._params.get('url')
         method = self._params.get('method', 'GET').upper()
@@ -23,9 +27,18 @@ class HttpClientAdapter(ChainableAdapter):
         if not url:
             raise ValueError("HTTP client adapter requires 'url' method")
 
+        # Zapytanie nie może trwać dłużej niż pozostały czas kroku
+        token = current_token()
+        token.raise_if_cancelled()
+
+        timeout = self._params.get('timeout', 30)
+        remaining = token.remaining()
+        if remaining is not None:
+            timeout = min(timeout, max(remaining, 0.001))
+
         request_params = {
             'headers': headers,
-            'timeout': self._params.get('timeout', 30)
+            'timeout': timeout
         }
 
         # Dodaj dane w zależności od metody
@@ -17,6 +17,12 @@ import ChainableAdapter
 class HttpServerAdapter(ChainableAdapter):
     """Adapter tworzący endpoint HTTP."""
 
+    # Rejestracja tras jest efektem ubocznym
+    single_flight = False
+
+    # Aplikacja i trasy są współdzielone przez wszystkie instancje
+    thread_safe = False
+
     _app = None
     _routes = {}
 
@@ -12,6 +12,9 @@ import time
 class MessageQueueAdapter(ChainableAdapter):
     """Adapter dla systemów kolejkowych (Redis, RabbitMQ, Kafka)."""
 
+    # Każda publikacja i odbiór to osobna wiadomość
+    single_flight = False
+
     def _execute_self(self, input_data=None):
         queue_type = self._params.get('type', 'redis')
         operation = self._params.get('operation', 'publish')
@@ -28,15 +28,76 @@ class MLAdapter(ChainableAdapter):
         else:
             raise ValueError(f"Unsupported ML operation: {operation}")
 
-    def _predict(self, input_data):
-        # Sprawdź, czy podano model
+    def execute_many(self, inputs):
+        """
+        Wykonuje adapter dla paczki danych wejściowych.
+
+        Predykcja dla słowników i list słowników jest liczona jednym wywołaniem
+        model.predict na połączonych wierszach; pozostałe operacje i typy danych
+        są wykonywane osobno dla każdego elementu.
+        """
+        inputs = list(inputs)
+
+        batchable = all(
+            isinstance(item, dict)
+            or (isinstance(item, list) and item and all(isinstance(x, dict) for x in item))
+            for item in inputs
+        )
+
+        if self._previous or self._params.get('operation', 'predict') != 'predict' or not batchable:
+            return [self.execute(item) for item in inputs]
+
+        model = self._load_model('predict')
+
+        try:
+            import pandas as pd
+
+            # Jeden DataFrame ze wszystkimi wierszami paczki
+            frames = [pd.DataFrame([item] if isinstance(item, dict) else item) for item in inputs]
+            X = pd.concat(frames, ignore_index=True)
+
+            predictions = model.predict(X)
+
+            probabilities = None
+            if hasattr(model, 'predict_proba'):
+                try:
+                    probabilities = model.predict_proba(X)
+                except:
+                    pass
+
+            # Podziel wyniki z powrotem na elementy paczki (format jak w _predict dla DataFrame)
+            results = []
+            offset = 0
+            for frame in frames:
+                end = offset + len(frame)
+                result = {'predictions': predictions[offset:end].tolist()}
+
+                if probabilities is not None:
+                    result['probabilities'] = probabilities[offset:end].tolist()
+
+                if self._params.get('include_input', False):
+                    result['input_data'] = frame.to_dict('records')
+
+                results.append(result)
+                offset = end
+
+            return results
+
+        except Exception as e:
+            raise RuntimeError(f"Error making prediction: {e}")
+
+    def _load_model(self, operation):
+        """Ładuje model z pliku 'model_path'."""
         model_path = self._params.get('model_path')
         if not model_path:
-            raise ValueError("ML adapter requires 'model_path' parameter for predict operation")
+            raise ValueError(f"ML adapter requires 'model_path' parameter for {operation} operation")
 
-        # Załaduj model
         with open(model_path, 'rb') as f:
-            model = pickle.load(f)
+            return pickle.load(f)
+
+    def _predict(self, input_data):
+        # Załaduj model
+        model = self._load_model('predict')
 
         # Wykonaj predykcję
         try:
@@ -4,7 +4,6 @@ Adapter do przetwarzania obrazów i wideo za pomocą OpenCV.
 
 import os
 import tempfile
-import numpy as np
 import json
 from .base import BaseAdapter
 
@@ -35,6 +34,7 @@ class OpenCVAdapter(BaseAdapter):
 
     def _read_image(self, input_data, cv2):
         """Wczytuje obraz z pliku lub danych binarnych."""
+        import numpy as np
         # Sprawdź źródło obrazu
         if isinstance(input_data, str) and os.path.exists(input_data):
             # Wczytaj z pliku
@@ -74,6 +74,7 @@ class OpenCVAdapter(BaseAdapter):
 
     def _process_image(self, input_data, cv2):
         """Przetwarza obraz za pomocą OpenCV."""
+        import numpy as np
         # Pobierz obraz wejściowy
         if isinstance(input_data, dict) and 'image' in input_data:
             image = input_data['image']
@@ -86,10 +87,14 @@ class OpenCVAdapter(BaseAdapter):
 
         # Wykonaj operacje przetwarzania
         operations = self._params.get('operations', [])
-        processed_image = image.copy()
+        # Obraz wejściowy może być współdzielony z innymi krokami - kopia powstaje
+        # dopiero przed pierwszą operacją rysującą w miejscu (resize, blur itd. tworzą nowe tablice)
+        processed_image = image
 
         for op in operations:
             op_type = op.get('type')
+            if op_type == 'draw' and processed_image is image:
+                processed_image = image.copy()
 
             if op_type == 'resize':
                 width = op.get('width', int(processed_image.shape[1] * op.get('scale', 1.0)))
@@ -150,6 +155,7 @@ class OpenCVAdapter(BaseAdapter):
 
     def _detect_objects(self, input_data, cv2):
         """Wykrywa obiekty na obrazie za pomocą kaskad Haara lub DNN."""
+        import numpy as np
         # Pobierz obraz wejściowy
         if isinstance(input_data, dict) and 'image' in input_data:
             image = input_data['image']
@@ -241,6 +247,7 @@ class OpenCVAdapter(BaseAdapter):
 
     def _detect_with_dnn(self, image, cv2):
         """Wykrywa obiekty za pomocą modeli DNN."""
+        import numpy as np
         # Pobierz model i konfigurację
         model_path = self._params.get('model_path')
         config_path = self._params.get('config_path')
@@ -16,6 +16,9 @@ from .base import BaseAdapter
 class PclAdapter(BaseAdapter):
     """Adapter do przetwarzania i renderowania języka PCL."""
 
+    # Wynik renderowania PCL zależy tylko od danych i parametrów
+    deterministic = True
+
     def _execute_self(self, input_data=None):
         # Pobierz dane PCL
         pcl_data = input_data
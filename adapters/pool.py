@@ -0,0 +1,128 @@
+# Pula instancji adapterów
+"""
+pool.py
+"""
+
+"""
+Pula izolowanych instancji adapterów.
+
+Instancje w ADAPTERS służą jako prototypy - każde wykonanie dostaje własną
+instancję tej samej klasy (z recyklingu lub nową), więc równoległe wykonania
+nie nadpisują sobie nawzajem parametrów.
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+class AdapterPool:
+    """Pula instancji adapterów tworzonych na podstawie prototypów z rejestru."""
+
+    def __init__(self, registry, max_idle=8):
+        """
+        Inicjalizacja puli.
+
+        Args:
+            registry: Słownik prototypów adapterów (np. ADAPTERS)
+            max_idle: Maksymalna liczba bezczynnych instancji przechowywanych dla adaptera
+        """
+        self._registry = registry
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._class_locks = {}
+
+    def create(self, adapter_name):
+        """
+        Tworzy nową instancję adaptera na podstawie prototypu.
+
+        Args:
+            adapter_name: Nazwa adaptera w rejestrze
+
+        Returns:
+            Nowa instancja adaptera
+        """
+        if adapter_name not in self._registry:
+            raise ValueError(f"Unknown adapter: {adapter_name}")
+
+        prototype = self._registry[adapter_name]
+        return prototype.__class__(prototype.name)
+
+    def acquire(self, adapter_name):
+        """
+        Pobiera wyczyszczoną instancję adaptera na wyłączność.
+
+        Args:
+            adapter_name: Nazwa adaptera w rejestrze
+
+        Returns:
+            Instancja adaptera, którą należy oddać przez release()
+        """
+        if adapter_name not in self._registry:
+            raise ValueError(f"Unknown adapter: {adapter_name}")
+
+        # Klucz zawiera klasę - po podmianie prototypu stare instancje nie są używane
+        key = (adapter_name, self._registry[adapter_name].__class__)
+
+        with self._lock:
+            idle = self._idle.get(key)
+            adapter = idle.pop() if idle else None
+
+        if adapter is None:
+            adapter = self.create(adapter_name)
+
+        return adapter.reset()
+
+    def release(self, adapter_name, adapter):
+        """
+        Oddaje instancję adaptera do puli.
+
+        Args:
+            adapter_name: Nazwa adaptera w rejestrze
+            adapter: Instancja pobrana przez acquire()
+        """
+        adapter.reset()
+        key = (adapter_name, adapter.__class__)
+
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(adapter)
+
+    def execution_lock(self, adapter):
+        """
+        Zwraca blokadę wykonania dla klasy adaptera.
+
+        Adaptery z thread_safe = False współdzielą stan na poziomie klasy
+        (np. aktywne strumienie lub połączenia), więc ich wykonania są serializowane.
+
+        Returns:
+            threading.Lock lub None dla adapterów bezpiecznych wątkowo
+        """
+        adapter_class = adapter.__class__
+        if getattr(adapter_class, 'thread_safe', True):
+            return None
+
+        with self._lock:
+            return self._class_locks.setdefault(adapter_class, threading.Lock())
+
+    @contextmanager
+    def adapter(self, adapter_name):
+        """
+        Kontekst udostępniający instancję adaptera na czas jednego wykonania.
+
+        Przykład:
+            with ADAPTER_POOL.adapter('zpl') as zpl:
+                result = zpl.dpi(203).execute(code)
+        """
+        adapter = self.acquire(adapter_name)
+        lock = self.execution_lock(adapter)
+
+        try:
+            if lock is None:
+                yield adapter
+            else:
+                with lock:
+                    yield adapter
+        finally:
+            self.release(adapter_name, adapter)
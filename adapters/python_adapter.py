@@ -11,6 +11,9 @@ import ChainableAdapter
 class PythonAdapter(ChainableAdapter):
     """Adapter wykonujący kod Python."""
 
+    # Kod użytkownika może mieć efekty uboczne
+    single_flight = False
+
     def _execute_self(self, input_data=None):
         code = self._params.get('code')
         func = self._params.get('function')
@@ -41,3 +44,44 @@ class PythonAdapter(ChainableAdapter):
 
         return None
 
+    def execute_stream(self, records=None):
+        """
+        Wykonuje kod lub funkcję dla każdego rekordu strumienia.
+
+        Kod jest kompilowany raz dla całego strumienia. Rekordy, dla których
+        wynikiem jest None, są pomijane - adapter działa wtedy jak filtr.
+        """
+        code = self._params.get('code')
+        func = self._params.get('function')
+
+        if not code and not func:
+            raise ValueError("Python adapter requires 'code' or 'function' method")
+
+        if records is None:
+            records = (None,)
+
+        if func:
+            if not callable(func):
+                raise ValueError("'function' parameter must be callable")
+
+            args = self._params.get('args', {})
+            for record in records:
+                result = func(record, **args)
+                if result is not None:
+                    yield result
+            return
+
+        compiled_code = compile(code, '<python_adapter>', 'exec')
+
+        for record in records:
+            globals_dict = {
+                'input_data': record,
+                'params': self._params,
+                'result': None
+            }
+            exec(compiled_code, globals_dict)
+
+            result = globals_dict.get('result')
+            if result is not None:
+                yield result
+
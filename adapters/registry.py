@@ -0,0 +1,213 @@
+# Leniwy rejestr adapterów
+"""
+registry.py
+"""
+
+"""
+Rejestr adapterów importowanych dopiero przy pierwszym użyciu.
+
+Adapter jest rejestrowany nazwą i ścieżką do klasy ('pakiet.moduł:Klasa'
+lub 'pakiet.moduł.Klasa'). Moduł adaptera (i jego zależności, np. numpy,
+requests, flask) jest importowany przy pierwszym odczycie ADAPTERS[nazwa],
+więc uruchomienie prostego pipeline'u nie płaci za import wszystkich
+adapterów. Sprawdzenie 'nazwa in ADAPTERS' nie importuje modułów adapterów.
+
+Zewnętrzne pakiety mogą dostarczać adaptery przez entry points w grupie
+ENTRY_POINT_GROUP, np. w setup.py:
+
+    entry_points={'2print.adapters': ['barcode = my_package.barcode:BarcodeAdapter']}
+
+Adaptery spoza pakietów (np. katalog wtyczek AdapterManager) można wskazać
+ścieżką do pliku: '/ścieżka/do/barcode_adapter.py:BarcodeAdapter'.
+"""
+
+import importlib
+import importlib.util
+import os
+import threading
+from collections.abc import MutableMapping
+
+# Grupa entry points z adapterami zewnętrznych pakietów
+ENTRY_POINT_GROUP = '2print.adapters'
+
+# Moduły wczytane z plików (ścieżka -> moduł) - plik jest wykonywany tylko raz
+_file_modules = {}
+_file_modules_lock = threading.RLock()
+
+
+def _entry_points(group):
+    """Zwraca entry points grupy (różne API importlib.metadata w zależności od wersji Pythona)."""
+    try:
+        from importlib import metadata
+    except ImportError:
+        try:
+            import importlib_metadata as metadata
+        except ImportError:
+            return []
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        return list(entry_points.select(group=group))
+    return list(entry_points.get(group, []))
+
+
+def load_file_module(file_path):
+    """Wykonuje plik .py jako moduł (raz na ścieżkę) i zwraca go."""
+    file_path = os.path.abspath(file_path)
+    with _file_modules_lock:
+        module = _file_modules.get(file_path)
+        if module is None:
+            module_name = os.path.splitext(os.path.basename(file_path))[0]
+            spec = importlib.util.spec_from_file_location(module_name, file_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _file_modules[file_path] = module
+        return module
+
+
+def import_target(path, package=None):
+    """
+    Importuje obiekt wskazany ścieżką 'moduł:obiekt', 'moduł.obiekt' lub 'plik.py:obiekt'.
+
+    Args:
+        path: Ścieżka do obiektu (moduł może być względny, np. '.bash_adapter:BashAdapter')
+        package: Pakiet bazowy dla ścieżek względnych
+    """
+    if ':' in path:
+        module_name, _, attribute = path.rpartition(':')
+    else:
+        module_name, _, attribute = path.rpartition('.')
+
+    if module_name.endswith('.py'):
+        module = load_file_module(module_name)
+    else:
+        module = importlib.import_module(module_name, package)
+    return getattr(module, attribute)
+
+
+class LazyAdapterRegistry(MutableMapping):
+    """Słownik prototypów adapterów ładowanych leniwie."""
+
+    def __init__(self, package=None):
+        """
+        Inicjalizacja rejestru.
+
+        Args:
+            package: Pakiet bazowy dla względnych ścieżek adapterów
+        """
+        self.package = package
+        # Nazwy adapterów w kolejności rejestracji: nazwa -> ścieżka lub fabryka
+        self._targets = {}
+        self._instances = {}
+        # Grupy entry points do przeszukania przy pierwszym braku nazwy lub wyliczeniu rejestru
+        self._pending_groups = []
+        self._lock = threading.RLock()
+
+    def register(self, name, target):
+        """
+        Rejestruje adapter bez importowania go.
+
+        Args:
+            name: Nazwa adaptera (np. 'bash')
+            target: Ścieżka do klasy ('moduł:Klasa'), klasa lub gotowa instancja
+        """
+        with self._lock:
+            self._instances.pop(name, None)
+            if isinstance(target, (str, type)):
+                self._targets[name] = target
+            else:
+                self._targets[name] = None
+                self._instances[name] = target
+        return self
+
+    def load_entry_points(self, group=ENTRY_POINT_GROUP):
+        """
+        Zgłasza grupę entry points z adapterami zewnętrznych pakietów.
+
+        Przeszukanie zainstalowanych pakietów (importlib.metadata) jest kosztowne,
+        więc odbywa się dopiero przy pierwszym odwołaniu do nieznanej nazwy
+        lub wyliczeniu rejestru. Adaptery już zarejestrowane nie są nadpisywane.
+        """
+        with self._lock:
+            if group not in self._pending_groups:
+                self._pending_groups.append(group)
+        return self
+
+    def _discover(self):
+        """Rejestruje adaptery ze zgłoszonych grup entry points."""
+        if not self._pending_groups:
+            return
+
+        with self._lock:
+            groups, self._pending_groups = self._pending_groups, []
+            for group in groups:
+                for entry_point in _entry_points(group):
+                    if entry_point.name not in self._targets:
+                        self.register(entry_point.name, entry_point.value)
+
+    def is_loaded(self, name):
+        """Sprawdza, czy adapter został już zaimportowany."""
+        return name in self._instances
+
+    def class_name(self, name):
+        """Zwraca nazwę klasy adaptera bez importowania jego modułu."""
+        if name in self._instances:
+            return self._instances[name].__class__.__name__
+
+        target = self._targets[name]
+        if isinstance(target, str):
+            return target.replace(':', '.').rpartition('.')[2]
+        return target.__name__
+
+    def _load(self, name):
+        with self._lock:
+            if name in self._instances:
+                return self._instances[name]
+
+            target = self._targets[name]
+            try:
+                adapter_class = import_target(target, self.package) if isinstance(target, str) else target
+            except Exception as e:
+                raise ImportError(f"Cannot load adapter {name} ({target}): {e}") from e
+
+            instance = self._instances[name] = adapter_class(name)
+            return instance
+
+    def __getitem__(self, name):
+        # Szybka ścieżka bez blokady dla adapterów już załadowanych
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        if name not in self._targets:
+            self._discover()
+            if name not in self._targets:
+                raise KeyError(name)
+
+        return self._load(name)
+
+    def __setitem__(self, name, adapter):
+        self.register(name, adapter)
+
+    def __delitem__(self, name):
+        with self._lock:
+            del self._targets[name]
+            self._instances.pop(name, None)
+
+    def __contains__(self, name):
+        if name in self._targets:
+            return True
+        self._discover()
+        return name in self._targets
+
+    def __iter__(self):
+        self._discover()
+        return iter(list(self._targets))
+
+    def __len__(self):
+        self._discover()
+        return len(self._targets)
+
+    def __repr__(self):
+        loaded = sum(1 for name in self._targets if name in self._instances)
+        return f"<LazyAdapterRegistry {len(self._targets)} adapters, {loaded} loaded>"
@@ -14,6 +14,12 @@ from .base import BaseAdapter
 class RpiAudioAdapter(BaseAdapter):
     """Adapter do obsługi audio na Raspberry Pi."""
 
+    # Nagranie i odtworzenie dźwięku zależą od chwili wykonania
+    single_flight = False
+
+    # Mikrofon i głośnik nie mogą być używane przez kilka wykonań naraz
+    thread_safe = False
+
     def _execute_self(self, input_data=None):
         # Pobierz operację do wykonania
         operation = self._params.get('operation', 'check_devices')
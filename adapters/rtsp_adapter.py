@@ -13,6 +13,12 @@ from .base import BaseAdapter
 class RtspAdapter(BaseAdapter):
     """Adapter do obsługi strumieni RTSP."""
 
+    # Klatki strumienia na żywo zależą od chwili odczytu
+    single_flight = False
+
+    # Aktywne strumienie są współdzielone przez wszystkie instancje
+    thread_safe = False
+
     # Słownik przechowujący aktywne strumienie
     _active_streams = {}
 
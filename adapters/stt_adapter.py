@@ -14,6 +14,9 @@ from .base import BaseAdapter
 class STTAdapter(BaseAdapter):
     """Adapter do konwersji mowy na tekst (Speech-to-Text)."""
 
+    # Mikrofon i głośnik nie mogą być używane przez kilka wykonań naraz
+    thread_safe = False
+
     def _execute_self(self, input_data=None):
         # Pobierz parametry
         engine = self._params.get('engine', 'vosk')  # Domyślnie Vosk (działa offline)
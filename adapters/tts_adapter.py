@@ -13,6 +13,30 @@ from .base import BaseAdapter
 class TTSAdapter(BaseAdapter):
     """Adapter do konwersji tekstu na mowę (Text-to-Speech)."""
 
+    # edge_tts działa natywnie na pętli zdarzeń
+    supports_async = True
+
+    async def execute_async(self, input_data=None):
+        """Asynchroniczna konwersja - edge_tts natywnie, pozostałe silniki w puli wątków."""
+        if self._params.get('engine', 'pyttsx3') != 'edge_tts':
+            return await super().execute_async(input_data)
+
+        # Pobierz tekst do konwersji
+        text = input_data
+        if isinstance(input_data, dict) and 'text' in input_data:
+            text = input_data['text']
+
+        # Sprawdź czy mamy tekst
+        if not text:
+            raise ValueError("No text provided for TTS conversion")
+
+        return await self._edge_tts_async(
+            text,
+            self._params.get('language', 'en'),
+            self._params.get('voice'),
+            self._params.get('output_path')
+        )
+
     def _execute_self(self, input_data=None):
         # Pobierz tekst do konwersji
         text = input_data
@@ -177,6 +201,18 @@ class TTSAdapter(BaseAdapter):
 
     def _tts_with_edge_tts(self, text, language, voice, output_path):
         """Konwersja tekstu na mowę za pomocą Microsoft Edge TTS (wymaga internetu)."""
+        import asyncio
+
+        # Wykonaj funkcję asynchroniczną
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        result = loop.run_until_complete(self._edge_tts_async(text, language, voice, output_path))
+        loop.close()
+
+        return result
+
+    async def _edge_tts_async(self, text, language, voice, output_path):
+        """Asynchroniczna konwersja tekstu na mowę za pomocą Microsoft Edge TTS."""
         try:
             import edge_tts
             import asyncio
@@ -199,47 +235,38 @@ class TTSAdapter(BaseAdapter):
             }
             voice = language_map.get(language, 'en-US-AriaNeural')
 
-        # Funkcja asynchroniczna
-        async def run_edge_tts():
-            # Komunikujemy się z usługą Microsoft Edge TTS
-            communicate = edge_tts.Communicate(text, voice)
+        # Komunikujemy się z usługą Microsoft Edge TTS
+        communicate = edge_tts.Communicate(text, voice)
 
-            # Jeśli podano output_path, zapisz do pliku
-            if output_path:
-                # Utwórz katalogi jeśli nie istnieją
-                os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-                await communicate.save(output_path)
-            else:
-                # W przeciwnym razie zapisz do pliku tymczasowego i odtwórz
-                with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp:
-                    temp_path = temp.name
-
-                await communicate.save(temp_path)
-
-                # Odtwórz dźwięk
-                self._play_audio(temp_path)
+        # Jeśli podano output_path, zapisz do pliku
+        if output_path:
+            # Utwórz katalogi jeśli nie istnieją
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            await communicate.save(output_path)
+        else:
+            # W przeciwnym razie zapisz do pliku tymczasowego i odtwórz
+            with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp:
+                temp_path = temp.name
 
-                # Usuń plik tymczasowy
-                try:
-                    os.unlink(temp_path)
-                except:
-                    pass
+            await communicate.save(temp_path)
 
-            return {
-                'success': True,
-                'engine': 'edge_tts',
-                'text': text,
-                'output_path': output_path,
-                'voice': voice
-            }
+            # Odtwórz dźwięk (blokujące - poza pętlą zdarzeń)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._play_audio, temp_path)
 
-        # Wykonaj funkcję asynchroniczną
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(run_edge_tts())
-        loop.close()
+            # Usuń plik tymczasowy
+            try:
+                os.unlink(temp_path)
+            except:
+                pass
 
-        return result
+        return {
+            'success': True,
+            'engine': 'edge_tts',
+            'text': text,
+            'output_path': output_path,
+            'voice': voice
+        }
 
     def _play_audio(self, audio_file):
         """Odtwarza plik audio na różnych platformach."""
@@ -13,6 +13,12 @@ import time
 class WebSocketAdapter(ChainableAdapter):
     """Adapter do komunikacji przez WebSockety."""
 
+    # Wysłane wiadomości nie mogą być łączone
+    single_flight = False
+
+    # Połączenia są współdzielone przez wszystkie instancje
+    thread_safe = False
+
     _connections = {}  # Przechowuje aktywne połączenia
 
     def _execute_self(self, input_data=None):
@@ -17,7 +17,24 @@ from .base import BaseAdapter
 class ZplAdapter(BaseAdapter):
     """Adapter do renderowania kodu ZPL."""
 
-    def _execute_self(self, input_data=None):
+    # Ten sam kod ZPL i parametry dają zawsze ten sam obraz
+    deterministic = True
+
+    def execute(self, input_data=None):
+        """Renderuje kod ZPL."""
+        return self._execute_self(input_data)
+
+    def execute_many(self, inputs):
+        """
+        Renderuje paczkę etykiet.
+
+        Labelary zwraca jeden obraz PNG na żądanie, więc cała paczka korzysta
+        z jednej sesji HTTP (połączenie keep-alive) zamiast nowego połączenia na etykietę.
+        """
+        with requests.Session() as session:
+            return [self._execute_self(item, session) for item in inputs]
+
+    def _execute_self(self, input_data=None, session=None):
         # Pobierz kod ZPL z danych wejściowych
         zpl_code = input_data
         if isinstance(input_data, dict) and 'zpl' in input_data:
@@ -33,14 +50,14 @@ class ZplAdapter(BaseAdapter):
         render_mode = self._params.get('render_mode', 'labelary')
 
         if render_mode == 'labelary':
-            return self._render_with_labelary(zpl_code)
+            return self._render_with_labelary(zpl_code, session)
         elif render_mode == 'internal':
             return self._render_internally(zpl_code)
         else:
             raise ValueError(f"Unsupported render mode: {render_mode}")
 
-    def _render_with_labelary(self, zpl_code):
-        """Renderowanie ZPL przez Labelary API."""
+    def _render_with_labelary(self, zpl_code, session=None):
+        """Renderowanie ZPL przez Labelary API (opcjonalnie we wspólnej sesji HTTP)."""
         # Parametry renderowania
         dpi = self._params.get('dpi', 203)
         width = self._params.get('width', 4)
@@ -52,7 +69,7 @@ class ZplAdapter(BaseAdapter):
 
         try:
             # Wywołanie API
-            response = requests.post(
+            response = (session or requests).post(
                 endpoint,
                 headers={'Accept': 'application/pdf'} if self._params.get('format') == 'pdf' else {},
                 data=zpl_code
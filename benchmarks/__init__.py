@@ -0,0 +1,9 @@
+# Zestaw benchmarków
+"""
+Benchmarki silników, parserów i adapterów.
+
+Uruchomienie (z katalogu głównego repozytorium, bez dostępu do sieci):
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --baseline results.json --filter 'scheduler.*'
+"""
@@ -0,0 +1,95 @@
+# Uruchamianie benchmarków
+"""
+__main__.py
+"""
+
+"""
+Uruchamia zestaw benchmarków, zapisuje wyniki w JSON i porównuje je z wynikami bazowymi.
+Kod wyjścia 1 oznacza błąd benchmarku, regresję względem wyników bazowych
+lub przekroczenie budżetu importu.
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.harness import (
+    run_benchmarks, save_results, load_results, compare, format_time,
+    DEFAULT_REPEAT, DEFAULT_MIN_TIME, DEFAULT_THRESHOLD
+)
+from benchmarks import bench_parsing, bench_templates, bench_scheduler, bench_adapters, bench_startup
+
+
+def print_result(name, result):
+    """Wypisuje wynik jednego benchmarku."""
+    if 'skipped' in result:
+        print(f"{name:<36} skipped: {result['skipped']}")
+    elif 'error' in result:
+        print(f"{name:<36} error: {result['error']}")
+    else:
+        print(f"{name:<36} {format_time(result['median']):>12}  "
+              f"(min {format_time(result['min'])}, stdev {format_time(result['stdev'])}, n={result['number']})")
+
+
+def print_comparison(rows):
+    """Wypisuje porównanie z wynikami bazowymi."""
+    print(f"\n{'benchmark':<36} {'baseline':>12} {'current':>12} {'change':>8}  status")
+    for row in rows:
+        change = f"{row['change']:+.1%}" if row['change'] is not None else '-'
+        print(f"{row['name']:<36} {format_time(row['baseline']):>12} {format_time(row['current']):>12} "
+              f"{change:>8}  {row['status']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run engine, parser and adapter benchmarks')
+    parser.add_argument('--filter', '-f', action='append',
+                        help="Benchmark name pattern, e.g. 'scheduler.*' (repeatable)")
+    parser.add_argument('--output', '-o', help='Save results as JSON')
+    parser.add_argument('--baseline', '-b', help='Compare against results saved with --output')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Relative slowdown of the median reported as a regression')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Samples per benchmark')
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME,
+                        help='Minimum duration of one sample in seconds')
+    parser.add_argument('--check-import-budget', action='store_true',
+                        help='Fail if importing the adapters package exceeds its time budget')
+    args = parser.parse_args(argv)
+
+    if args.check_import_budget:
+        problems = bench_startup.check_import_budget()
+        for problem in problems:
+            print(f"Import budget exceeded: {problem}")
+        if problems:
+            return 1
+        print("Import budget OK")
+        return 0
+
+    document = run_benchmarks(args.filter, args.repeat, args.min_time, report=print_result)
+    status = 0
+
+    if args.output:
+        save_results(document, args.output)
+        print(f"\nResults saved to: {args.output}")
+
+    if args.baseline:
+        rows = compare(document, load_results(args.baseline), args.threshold)
+        print_comparison(rows)
+        if any(row['status'] == 'regression' for row in rows):
+            status = 1
+
+    # Zepsuty benchmark nie może przejść niezauważony (pominięte z braku bibliotek są w porządku)
+    errors = [name for name, result in document['results'].items() if 'error' in result]
+    if errors:
+        print(f"\nBenchmarks failed: {', '.join(errors)}")
+        status = 1
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+# Benchmarki adapterów
+"""
+bench_adapters.py
+"""
+
+"""
+Gorące ścieżki adapterów na lokalnych zamiennikach zasobów.
+
+Adaptery są wykonywane przez skompilowane plany (jak w PipelineEngine),
+więc pomiar obejmuje też pobranie instancji z puli i konfigurację metod.
+Benchmarki wymagające opcjonalnych bibliotek są pomijane, gdy ich brak.
+"""
+
+import os
+from .harness import benchmark, SkipBenchmark
+from .standins import (
+    require_adapter, require_module, start_http_server, temp_directory,
+    sqlite_database, synthetic_frame, synthetic_wav
+)
+
+# Liczba rekordów w benchmarkach wsadowych
+BATCH_SIZE = 100
+
+
+def _plan(*steps):
+    """Kompiluje plan z par (adapter, {metoda: wartość})."""
+    from core.plan import compile_pipeline
+
+    for adapter_name, _ in steps:
+        require_adapter(adapter_name)
+
+    return compile_pipeline([
+        {'adapter': adapter_name,
+         'methods': [{'name': name, 'value': value} for name, value in methods.items()]}
+        for adapter_name, methods in steps
+    ])
+
+
+def _execute(plan, input_data=None):
+    from core.plan import execute_plan
+    return lambda: execute_plan(plan, input_data)
+
+
+@benchmark('adapters.python_code')
+def bench_python_code():
+    plan = _plan(('python', {'code': 'result = [item * 2 for item in input_data]'}))
+    return _execute(plan, list(range(100)))
+
+
+@benchmark('adapters.bash_echo')
+def bench_bash_echo():
+    # Koszt uruchomienia podprocesu i przekazania danych przez plik tymczasowy
+    plan = _plan(('bash', {'command': 'cat $INPUT'}))
+    return _execute(plan, {'items': list(range(10))})
+
+
+@benchmark('adapters.file_write_read')
+def bench_file_write_read():
+    directory, cleanup = temp_directory()
+    path = os.path.join(directory, 'data.json')
+    plan = _plan(('file', {'operation': 'write', 'path': path}),
+                 ('file', {'operation': 'read', 'path': path}))
+    return _execute(plan, {'items': list(range(1000))}), cleanup
+
+
+@benchmark('adapters.file_stream_wav')
+def bench_file_stream_wav():
+    # Strumieniowy odczyt pliku WAV fragmentami (bez materializacji całego pliku)
+    from core.streaming import execute_stream
+
+    directory, cleanup = temp_directory()
+    path = synthetic_wav(os.path.join(directory, 'tone.wav'), seconds=2.0)
+    plan = _plan(('file', {'operation': 'read', 'path': path, 'mode': 'rb', 'chunk_size': 8192}))
+
+    def operation():
+        for _ in execute_stream(plan):
+            pass
+
+    return operation, cleanup
+
+
+@benchmark('adapters.sqlite_select')
+def bench_sqlite_select():
+    directory, cleanup = temp_directory()
+    path = sqlite_database(os.path.join(directory, 'bench.db'))
+    plan = _plan(('database', {'type': 'sqlite', 'connection': path,
+                               'query': 'SELECT * FROM items WHERE value > 100'}))
+    return _execute(plan), cleanup
+
+
+@benchmark('adapters.sqlite_insert_many')
+def bench_sqlite_insert_many():
+    # Wsadowe wstawianie jednym połączeniem i transakcją (execute_many)
+    from core.batch import execute_batch
+
+    directory, cleanup = temp_directory()
+    path = sqlite_database(os.path.join(directory, 'bench.db'), rows=0)
+    plan = _plan(('database', {'type': 'sqlite', 'connection': path,
+                               'query': 'INSERT INTO items (name, value) VALUES (:name, :value)'}))
+    inputs = [{'name': f"item-{index}", 'value': float(index)} for index in range(BATCH_SIZE)]
+    return lambda: execute_batch(plan, inputs), cleanup
+
+
+@benchmark('adapters.http_client_get')
+def bench_http_client_get():
+    require_module('requests')
+    url, stop = start_http_server()
+    try:
+        plan = _plan(('http_client', {'url': f"{url}/items", 'method': 'GET'}))
+    except SkipBenchmark:
+        stop()
+        raise
+    return _execute(plan), stop
+
+
+@benchmark('adapters.http_client_post')
+def bench_http_client_post():
+    require_module('requests')
+    url, stop = start_http_server()
+    try:
+        plan = _plan(('http_client', {'url': f"{url}/echo", 'method': 'POST'}))
+    except SkipBenchmark:
+        stop()
+        raise
+    return _execute(plan, {'items': list(range(100))}), stop
+
+
+@benchmark('adapters.opencv_process')
+def bench_opencv_process():
+    require_module('cv2')
+    frame = synthetic_frame()
+    plan = _plan(('opencv', {'operation': 'process', 'operations': [
+        {'type': 'resize', 'scale': 0.5},
+        {'type': 'blur', 'kernel_size': (5, 5)},
+        {'type': 'convert_color'},
+        {'type': 'canny'}
+    ]}))
+    return _execute(plan, frame)
+
+
+@benchmark('adapters.stt_vosk_wav')
+def bench_stt_vosk_wav():
+    # Wymaga modelu Vosk wskazanego zmienną VOSK_MODEL_PATH
+    require_module('vosk')
+    model_path = os.environ.get('VOSK_MODEL_PATH')
+    if not model_path or not os.path.exists(model_path):
+        raise SkipBenchmark("VOSK_MODEL_PATH does not point to a Vosk model")
+
+    directory, cleanup = temp_directory()
+    path = synthetic_wav(os.path.join(directory, 'tone.wav'), seconds=1.0)
+    plan = _plan(('stt', {'engine': 'vosk', 'model_path': model_path}))
+    return _execute(plan, path), cleanup
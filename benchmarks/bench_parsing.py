@@ -0,0 +1,78 @@
+# Benchmarki parserów i kompilacji
+"""
+bench_parsing.py
+"""
+
+"""
+Koszt parsowania notacji kropkowej, kompilacji planów, ładowania workflow YAML
+i kompilacji wyrażeń warunków.
+"""
+
+import os
+from .harness import benchmark, SkipBenchmark
+
+# Wyrażenie pipeline'u używane w benchmarkach parsera
+DOT_EXPRESSION = (
+    "http_client.url('https://example.com/api?page=1').method('GET').timeout(10)"
+    ".python.code('result = [item for item in input_data[\"items\"] if item > 3]')"
+    ".file.path('output/result.json').write(True)"
+)
+
+# Warunek workflow używany w benchmarkach wyrażeń
+CONDITION = "${inputs.mode} == 'fast' and len(steps) > 2 or steps.fetch.output.0.name in ['a', 'b']"
+
+# Workflow ładowany w benchmarku YAML - stały plik testowy, niezależny od przykładów w workflows/
+WORKFLOW_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'etl_workflow.yaml')
+
+
+@benchmark('parser.dot_notation')
+def bench_dot_notation():
+    # Podział na kroki i parsowanie każdego kroku - tak jak przy kompilacji planu
+    from core.dsl_parser import DotNotationParser
+    from core.pipeline_engine import PipelineEngine
+    return lambda: [DotNotationParser.parse(step) for step in PipelineEngine.split_expression(DOT_EXPRESSION)]
+
+
+def _compile_or_skip(compile_plan):
+    """Kompiluje DOT_EXPRESSION raz przed pomiarem - plan wymaga załadowania klas adapterów."""
+    try:
+        compile_plan(DOT_EXPRESSION)
+    except ImportError as e:
+        raise SkipBenchmark(f"pipeline adapters could not be loaded: {e}")
+
+
+@benchmark('parser.plan_compile')
+def bench_plan_compile():
+    # Kompilacja bez pamięci podręcznej planów
+    from core.plan import compile_expression
+    _compile_or_skip(compile_expression)
+    return lambda: compile_expression(DOT_EXPRESSION)
+
+
+@benchmark('parser.plan_cached')
+def bench_plan_cached():
+    from core.plan import get_expression_plan
+    _compile_or_skip(get_expression_plan)
+    return lambda: get_expression_plan(DOT_EXPRESSION)
+
+
+@benchmark('parser.workflow_yaml')
+def bench_workflow_yaml():
+    from core.workflow_engine import WorkflowEngine
+    engine = WorkflowEngine()
+    return lambda: engine.load_workflow(WORKFLOW_PATH), engine.shutdown
+
+
+@benchmark('parser.condition_compile')
+def bench_condition_compile():
+    # __wrapped__ omija pamięć podręczną - mierzymy samo parsowanie
+    from core.expressions import compile_expression
+    return lambda: compile_expression.__wrapped__(CONDITION)
+
+
+@benchmark('parser.condition_evaluate')
+def bench_condition_evaluate():
+    from core.expressions import compile_expression
+    condition = compile_expression(CONDITION)
+    context = {'inputs': {'mode': 'slow'}, 'steps': {'fetch': {'output': [{'name': 'a'}]}}}
+    return lambda: condition(context)
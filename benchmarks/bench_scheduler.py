@@ -0,0 +1,51 @@
+# Benchmarki harmonogramu workflow
+"""
+bench_scheduler.py
+"""
+
+"""
+Narzut silnika workflow dla syntetycznych DAG-ów 10/100/1000 kroków.
+
+Kroki wykonują adapter bez pracy, więc wynik to czysty koszt harmonogramu,
+interpolacji, puli adapterów i zapisu wyników. Silniki nie używają dyskowego
+poziomu pamięci podręcznej - benchmark nie zapisuje plików w katalogu roboczym.
+"""
+
+from .harness import benchmark
+from .standins import NoopAdapter, register_standin, synthetic_dag
+
+# Rozmiary syntetycznych workflow
+DAG_SIZES = (10, 100, 1000)
+
+
+def _workflow_benchmark(step_count, engine_factory):
+    def setup():
+        register_standin('bench_noop', NoopAdapter('bench_noop'))
+        engine = engine_factory()
+        workflow_id = f"synthetic_{step_count}"
+        engine.workflows[workflow_id] = synthetic_dag(step_count)
+        return lambda: engine.execute_workflow(workflow_id), engine.shutdown
+    return setup
+
+
+def _async_workflow_benchmark(step_count):
+    def setup():
+        import asyncio
+        from core.async_engine import AsyncWorkflowEngine
+
+        register_standin('bench_noop', NoopAdapter('bench_noop'))
+        engine = AsyncWorkflowEngine(cache_dir=None)
+        workflow_id = f"synthetic_{step_count}"
+        engine.workflows[workflow_id] = synthetic_dag(step_count)
+        return lambda: asyncio.run(engine.execute_workflow_async(workflow_id)), engine.shutdown
+    return setup
+
+
+def _thread_engine():
+    from core.workflow_engine import WorkflowEngine
+    return WorkflowEngine(cache_dir=None)
+
+
+for _size in DAG_SIZES:
+    benchmark(f"scheduler.dag_{_size}")(_workflow_benchmark(_size, _thread_engine))
+    benchmark(f"scheduler.async_dag_{_size}")(_async_workflow_benchmark(_size))
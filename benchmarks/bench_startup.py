@@ -0,0 +1,101 @@
+# Benchmarki czasu uruchomienia
+"""
+bench_startup.py
+"""
+
+"""
+Czas importu pakietu adapterów w świeżym interpreterze.
+
+Import 'adapters' nie powinien ładować modułów adapterów ani ich ciężkich
+zależności - są one importowane dopiero przy pierwszym odczycie z rejestru.
+check_import_budget() pilnuje tego w teście tests/test_import_budget.py
+i przy każdym uruchomieniu benchmarków z opcją --check-import-budget.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from .harness import benchmark, SkipBenchmark
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Maksymalny czas importu pakietu adapterów (w sekundach, bez startu interpretera)
+IMPORT_BUDGET_SECONDS = 0.25
+
+# Zależności, których sam import pakietu adapterów nie może ładować
+HEAVY_MODULES = ('numpy', 'cv2', 'pandas', 'requests', 'flask', 'sqlalchemy', 'websockets',
+                 'pyttsx3', 'speech_recognition', 'asyncio')
+
+# Skrypt mierzący import w procesie potomnym: wypisuje czas i załadowane ciężkie moduły
+_IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(','.join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def import_time(module='adapters', heavy_modules=HEAVY_MODULES):
+    """
+    Mierzy import modułu w świeżym interpreterze.
+
+    Returns:
+        tuple: (czas importu w sekundach, lista załadowanych ciężkich modułów)
+    """
+    script = _IMPORT_SCRIPT.format(module=module, heavy=tuple(heavy_modules))
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {result.stderr.strip().splitlines()[-1:]}")
+
+    elapsed, loaded = result.stdout.splitlines()[-2:]
+    return float(elapsed), [name for name in loaded.split(',') if name]
+
+
+def check_import_budget(budget=IMPORT_BUDGET_SECONDS, repeat=3):
+    """
+    Sprawdza budżet czasu importu pakietu adapterów.
+
+    Returns:
+        list: Opisy naruszeń (pusta lista - budżet dotrzymany)
+    """
+    timings = []
+    loaded = set()
+    for _ in range(repeat):
+        elapsed, heavy = import_time()
+        timings.append(elapsed)
+        loaded.update(heavy)
+
+    problems = []
+    # Najlepszy pomiar - odporny na chwilowe obciążenie maszyny
+    if min(timings) > budget:
+        problems.append(f"import adapters took {min(timings) * 1000:.1f} ms (budget {budget * 1000:.0f} ms)")
+    if loaded:
+        problems.append(f"import adapters loaded heavy modules: {', '.join(sorted(loaded))}")
+    return problems
+
+
+@benchmark('startup.import_adapters')
+def bench_import_adapters():
+    try:
+        import_time()
+    except RuntimeError as e:
+        raise SkipBenchmark(str(e))
+
+    def operation():
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import adapters'], cwd=ROOT, check=True)
+        return time.perf_counter() - start
+
+    return operation
+
+
+@benchmark('startup.first_adapter_lookup')
+def bench_first_lookup():
+    script = "from adapters import ADAPTERS; ADAPTERS['bash']"
+    if subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True).returncode != 0:
+        raise SkipBenchmark("adapter 'bash' could not be loaded")
+
+    return lambda: subprocess.run([sys.executable, '-c', script], cwd=ROOT, check=True)
@@ -0,0 +1,52 @@
+# Benchmarki interpolacji szablonów
+"""
+bench_templates.py
+"""
+
+"""
+Koszt interpolacji ${...} w wartościach kroków workflow.
+"""
+
+from .harness import benchmark
+
+TEMPLATE = "Report for ${inputs.customer} on ${timestamp}: ${steps.fetch.output.items}"
+
+CONTEXT = {
+    'inputs': {'customer': 'ACME'},
+    'timestamp': 1700000000,
+    'steps': {'fetch': {'output': {'items': list(range(20))}}}
+}
+
+
+@benchmark('templates.render')
+def bench_render():
+    from core.templates import compile_template
+    template = compile_template(TEMPLATE)
+    return lambda: template.render(CONTEXT)
+
+
+@benchmark('templates.render_static')
+def bench_render_static():
+    from core.templates import compile_template
+    template = compile_template('output/report.json')
+    return lambda: template.render(CONTEXT)
+
+
+@benchmark('templates.compile')
+def bench_compile():
+    from core.templates import Template
+    return lambda: Template(TEMPLATE)
+
+
+@benchmark('templates.step_methods')
+def bench_step_methods():
+    # Rozwiązanie wszystkich metod kroku jak przy wykonaniu workflow
+    from core.workflow_engine import WorkflowEngine
+    engine = WorkflowEngine()
+    step = {'id': 'report', 'adapter': 'file', 'methods': [
+        {'name': 'path', 'value': 'output/${inputs.customer}/${timestamp}.json'},
+        {'name': 'content', 'value': TEMPLATE},
+        {'name': 'mode', 'value': 'w'}
+    ]}
+    context = dict(CONTEXT, workflow_id='bench')
+    return lambda: engine._resolve_methods(step, context), engine.shutdown
@@ -0,0 +1,194 @@
+# Narzędzia pomiarowe benchmarków
+"""
+harness.py
+"""
+
+"""
+Rejestr benchmarków, pomiar czasu i porównanie z wynikami bazowymi.
+
+Benchmark to funkcja przygotowująca dane (niemierzona), która zwraca
+bezargumentową operację (lub parę: operacja, funkcja sprzątająca) -
+mierzony jest tylko czas tej operacji.
+"""
+
+import fnmatch
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+# Zarejestrowane benchmarki: lista (nazwa, funkcja przygotowująca)
+BENCHMARKS = []
+
+# Domyślna liczba próbek i minimalny czas jednej próbki (w sekundach)
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_TIME = 0.05
+
+# Domyślny próg regresji przy porównaniu z wynikami bazowymi (względna zmiana mediany)
+DEFAULT_THRESHOLD = 0.15
+
+
+class SkipBenchmark(Exception):
+    """Benchmark nie może działać w tym środowisku (np. brak opcjonalnej biblioteki)."""
+
+
+def benchmark(name):
+    """Rejestruje funkcję przygotowującą benchmark o podanej nazwie (np. 'parser.dot_notation')."""
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def measure(operation, repeat=DEFAULT_REPEAT, min_time=DEFAULT_MIN_TIME):
+    """
+    Mierzy czas jednego wykonania operacji.
+
+    Liczba wykonań w próbce jest dobierana tak, żeby próbka trwała co najmniej
+    min_time, a wynik to statystyki czasu pojedynczego wykonania.
+
+    Returns:
+        dict: median, mean, min, stdev (sekundy), ops_per_sec, number, repeat
+    """
+    # Rozgrzewka i kalibracja liczby wykonań w próbce
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        samples.append((time.perf_counter() - start) / number)
+
+    median = statistics.median(samples)
+    return {
+        'median': median,
+        'mean': statistics.mean(samples),
+        'min': min(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'ops_per_sec': 1.0 / median if median else None,
+        'number': number,
+        'repeat': repeat
+    }
+
+
+def run_benchmarks(patterns=None, repeat=DEFAULT_REPEAT, min_time=DEFAULT_MIN_TIME, report=None):
+    """
+    Wykonuje zarejestrowane benchmarki.
+
+    Args:
+        patterns: Wzorce nazw (fnmatch, np. 'scheduler.*'); None - wszystkie
+        report: Funkcja wywoływana po każdym benchmarku: report(nazwa, wynik)
+
+    Returns:
+        dict: Dokument wyników {'metadata': {...}, 'results': {nazwa: wynik}}
+    """
+    results = {}
+
+    for name, setup in BENCHMARKS:
+        if patterns and not any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+            continue
+
+        cleanup = None
+        try:
+            # Funkcja przygotowująca może zwrócić parę (operacja, sprzątanie) - np. zatrzymanie serwera
+            operation = setup()
+            if isinstance(operation, tuple):
+                operation, cleanup = operation
+            result = measure(operation, repeat, min_time)
+        except SkipBenchmark as e:
+            result = {'skipped': str(e)}
+        except Exception as e:
+            # Błąd jednego benchmarku nie przerywa całego zestawu
+            result = {'error': f"{type(e).__name__}: {e}"}
+        finally:
+            if cleanup is not None:
+                cleanup()
+
+        results[name] = result
+        if report is not None:
+            report(name, result)
+
+    return {'metadata': environment_metadata(), 'results': results}
+
+
+def environment_metadata():
+    """Zwraca opis środowiska zapisywany razem z wynikami."""
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine()
+    }
+
+
+def save_results(document, file_path):
+    """Zapisuje wyniki do pliku JSON."""
+    with open(file_path, 'w') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+
+def load_results(file_path):
+    """Wczytuje wyniki z pliku JSON."""
+    with open(file_path) as f:
+        return json.load(f)
+
+
+def compare(document, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Porównuje mediany z wynikami bazowymi.
+
+    Returns:
+        list: Wiersze {'name', 'baseline', 'current', 'change', 'status'}, gdzie status
+              to 'regression', 'improvement', 'same', 'new' lub 'skipped'
+    """
+    rows = []
+    baseline_results = baseline.get('results', {})
+
+    for name, result in document['results'].items():
+        base = baseline_results.get(name)
+        current = result.get('median')
+
+        if current is None or (base is not None and base.get('median') is None):
+            rows.append({'name': name, 'baseline': None, 'current': current, 'change': None,
+                         'status': 'skipped'})
+            continue
+
+        if base is None:
+            rows.append({'name': name, 'baseline': None, 'current': current, 'change': None,
+                         'status': 'new'})
+            continue
+
+        change = current / base['median'] - 1.0 if base['median'] else 0.0
+        if change > threshold:
+            status = 'regression'
+        elif change < -threshold:
+            status = 'improvement'
+        else:
+            status = 'same'
+
+        rows.append({'name': name, 'baseline': base['median'], 'current': current,
+                     'change': change, 'status': status})
+
+    return rows
+
+
+def format_time(seconds):
+    """Formatuje czas w czytelnej jednostce."""
+    if seconds is None:
+        return '-'
+    for unit, scale in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
@@ -0,0 +1,215 @@
+# Lokalne zamienniki zasobów dla benchmarków
+"""
+standins.py
+"""
+
+"""
+Lokalne zamienniki usług i danych używane przez benchmarki.
+
+Benchmarki działają bez sieci i sprzętu: serwer HTTP działa na 127.0.0.1,
+baza to plik SQLite, a klatki wideo i pliki WAV są generowane syntetycznie.
+"""
+
+import json
+import math
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+import threading
+import wave
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .harness import SkipBenchmark
+
+
+class NoopAdapter:
+    """Adapter bez pracy - mierzy sam narzut silnika (metody zapisują parametry)."""
+
+    thread_safe = True
+    supports_async = False
+    deterministic = False
+
+    def __init__(self, name=None):
+        self.name = name
+        self._params = {}
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def method(value):
+            self._params[name] = value
+            return self
+
+        return method
+
+    def reset(self):
+        self._params = {}
+        return self
+
+    def execute(self, input_data=None):
+        return input_data
+
+
+def register_standin(name, adapter):
+    """Rejestruje adapter zastępczy w rejestrze adapterów (jeśli jeszcze go nie ma)."""
+    from adapters import ADAPTERS
+
+    if name not in ADAPTERS:
+        ADAPTERS[name] = adapter
+    return name
+
+
+def synthetic_dag(step_count, adapter='bench_noop', fan_in=2):
+    """
+    Tworzy workflow z warstwowym DAG-iem kroków.
+
+    Krok i zależy od kroków i-1 ... i-fan_in (przez odwołania w 'input' i 'depends_on'),
+    więc harmonogram ma zarówno łańcuchy, jak i równoległe gałęzie.
+    """
+    steps = []
+    for index in range(step_count):
+        step = {'id': f"step_{index}", 'adapter': adapter, 'cache': False,
+                'methods': [{'name': 'label', 'value': f"${{inputs.prefix}}-{index}"}]}
+
+        parents = [f"step_{parent}" for parent in range(max(0, index - fan_in), index)]
+        if parents:
+            step['input'] = f"${{steps.{parents[-1]}.output}}"
+            step['depends_on'] = parents
+
+        steps.append(step)
+
+    return {
+        'name': f"synthetic_{step_count}",
+        'inputs': [{'name': 'prefix', 'default': 'bench'}],
+        'steps': steps,
+        'outputs': [{'name': 'last', 'value': f"${{steps.step_{step_count - 1}.output}}"}]
+    }
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    """Odpowiada stałym dokumentem JSON (GET) lub echem ciała (POST)."""
+
+    payload = json.dumps({'status': 'ok', 'items': list(range(32))}).encode()
+
+    def do_GET(self):
+        self._reply(self.payload)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self._reply(self.rfile.read(length) or b'{}')
+
+    def _reply(self, body):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def local_http_server():
+    """Uruchamia lokalny serwer HTTP; zwraca jego adres bazowy."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _JsonHandler)
+    thread = threading.Thread(target=server.serve_forever, name='bench-http', daemon=True)
+    thread.start()
+
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def start_http_server():
+    """Uruchamia lokalny serwer HTTP; zwraca (adres, funkcja zatrzymująca)."""
+    context = local_http_server()
+    url = context.__enter__()
+    return url, lambda: context.__exit__(None, None, None)
+
+
+def temp_directory():
+    """Tworzy katalog tymczasowy; zwraca (ścieżka, funkcja usuwająca)."""
+    path = tempfile.mkdtemp(prefix='bench-')
+    return path, lambda: shutil.rmtree(path, ignore_errors=True)
+
+
+def sqlite_database(path, rows=1000):
+    """Tworzy bazę SQLite z tabelą 'items' o podanej liczbie wierszy."""
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, name TEXT, value REAL)')
+    connection.executemany('INSERT INTO items (name, value) VALUES (?, ?)',
+                           [(f"item-{index}", index * 0.5) for index in range(rows)])
+    connection.commit()
+    connection.close()
+    return path
+
+
+def synthetic_frame(width=640, height=480):
+    """Zwraca syntetyczną klatkę BGR (gradient z kratką) jako tablicę numpy."""
+    try:
+        import numpy as np
+    except ImportError:
+        raise SkipBenchmark("numpy is not installed")
+
+    x = np.linspace(0, 255, width, dtype=np.uint8)
+    y = np.linspace(0, 255, height, dtype=np.uint8)
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[:, :, 0] = x[np.newaxis, :]
+    frame[:, :, 1] = y[:, np.newaxis]
+    frame[::16, :, 2] = 255
+    frame[:, ::16, 2] = 255
+    return frame
+
+
+def synthetic_wav(path, seconds=1.0, rate=16000, frequency=440.0):
+    """Zapisuje plik WAV (mono, 16 bit) z tonem sinusoidalnym."""
+    samples = int(seconds * rate)
+    data = b''.join(
+        struct.pack('<h', int(12000 * math.sin(2 * math.pi * frequency * index / rate)))
+        for index in range(samples)
+    )
+
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(data)
+
+    return path
+
+
+def require_module(name):
+    """Importuje opcjonalny moduł lub pomija benchmark."""
+    try:
+        return __import__(name)
+    except ImportError:
+        raise SkipBenchmark(f"{name} is not installed")
+
+
+def require_adapter(name):
+    """Zwraca nazwę adaptera z rejestru lub pomija benchmark, jeśli nie da się go załadować."""
+    try:
+        from adapters import ADAPTERS
+    except Exception as e:
+        raise SkipBenchmark(f"adapters could not be imported: {e}")
+
+    if name not in ADAPTERS:
+        raise SkipBenchmark(f"adapter {name} is not registered")
+    # Rejestr ładuje adaptery leniwie - brakujące zależności ujawniają się dopiero tutaj
+    try:
+        ADAPTERS[name]
+    except ImportError as e:
+        raise SkipBenchmark(str(e))
+    return name
+
+
+def remove_file(path):
+    """Usuwa plik, jeśli istnieje."""
+    if os.path.exists(path):
+        os.unlink(path)
@@ -8,6 +8,7 @@ from .workflow_engine import WorkflowEngine
 from .dsl_parser import DotNotationParser, YamlDSLParser
 from .adapter_manager import AdapterManager
 from .context import ExecutionContext
+from .async_engine import AsyncPipelineEngine, AsyncWorkflowEngine
 
 # Wersja
 __version__ = '1.0.0'
\ No newline at end of file
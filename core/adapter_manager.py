@@ -5,12 +5,71 @@ adapter_manager.py
 
 """
 Moduł zarządzający adapterami w systemie.
+
+Adaptery z katalogu są opisywane w manifeście (plik JSON w katalogu adapterów):
+identyfikator adaptera -> plik modułu -> klasa, wraz z czasem modyfikacji,
+rozmiarem i skrótem SHA-256 pliku. Przy starcie niezmienione pliki są tylko
+sprawdzane przez stat(), a adaptery rejestrowane leniwie - moduł jest
+wykonywany dopiero przy pierwszym użyciu adaptera.
 """
 
 import os
+import json
+import hashlib
 import importlib
 import inspect
+import tempfile
 from adapters.base import BaseAdapter
+from adapters.registry import LazyAdapterRegistry, load_file_module
+
+# Nazwa pliku manifestu adapterów w katalogu adapterów
+MANIFEST_FILENAME = '.adapters_manifest.json'
+
+# Wersja formatu manifestu (zmiana unieważnia zapisane manifesty)
+MANIFEST_VERSION = 1
+
+
+def _file_hash(file_path):
+    """Zwraca skrót SHA-256 zawartości pliku."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _adapter_id(module_name):
+    """Tworzy ID adaptera z nazwy modułu (bez końcówki '_adapter')."""
+    if module_name.endswith('_adapter'):
+        return module_name[:-8]
+    return module_name
+
+
+def load_manifest(manifest_path):
+    """Wczytuje manifest adapterów (pusty przy braku pliku lub innej wersji formatu)."""
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'version': MANIFEST_VERSION, 'files': {}}
+
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return {'version': MANIFEST_VERSION, 'files': {}}
+    return manifest
+
+
+def save_manifest(manifest, manifest_path):
+    """Zapisuje manifest atomowo; brak uprawnień do zapisu nie jest błędem (np. obraz tylko do odczytu)."""
+    directory = os.path.dirname(os.path.abspath(manifest_path))
+    try:
+        fd, temp_path = tempfile.mkstemp(prefix='.adapters_manifest-', dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(temp_path, manifest_path)
+        return True
+    except OSError as e:
+        print(f"Cannot write adapter manifest {manifest_path}: {e}")
+        return False
 
 
 class AdapterManager:
@@ -20,7 +79,8 @@ class AdapterManager:
 
     def __init__(self):
         """Inicjalizacja menedżera adapterów."""
-        self.adapters = {}
+        # Adaptery z katalogów są ładowane przy pierwszym odczycie
+        self.adapters = LazyAdapterRegistry()
 
     def register_adapter(self, adapter_id, adapter_instance):
         """
@@ -51,12 +111,17 @@ class AdapterManager:
         """
         return self.adapters.get(adapter_id)
 
-    def load_adapters_from_directory(self, directory):
+    def load_adapters_from_directory(self, directory, manifest_path=None):
         """
         Ładuje adaptery z podanego katalogu.
 
+        Pliki zgodne z manifestem (ten sam czas modyfikacji i rozmiar lub ten sam
+        skrót zawartości) nie są wykonywane - ich adaptery są rejestrowane leniwie.
+        Nowe i zmienione pliki są przeszukiwane, a manifest aktualizowany.
+
         Args:
             directory: Ścieżka do katalogu z adapterami
+            manifest_path: Ścieżka do pliku manifestu (domyślnie MANIFEST_FILENAME w katalogu)
 
         Returns:
             AdapterManager: Instancja tego menedżera dla łańcuchowania metod
@@ -65,46 +130,88 @@ class AdapterManager:
         if not os.path.exists(directory) or not os.path.isdir(directory):
             raise ValueError(f"Directory not found: {directory}")
 
+        directory = os.path.abspath(directory)
+        if manifest_path is None:
+            manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+
+        manifest = load_manifest(manifest_path)
+        entries = {}
+        changed = False
+
         # Przeszukaj katalog
-        for filename in os.listdir(directory):
+        for filename in sorted(os.listdir(directory)):
             # Tylko pliki .py
             if not filename.endswith('.py') or filename == '__init__.py':
                 continue
 
+            # Zbuduj pełną ścieżkę do modułu
+            module_path = os.path.join(directory, filename)
+
             try:
-                # Utwórz nazwę modułu
-                module_name = filename[:-3]  # Usuń rozszerzenie .py
+                stat = os.stat(module_path)
+                entry = manifest['files'].get(filename)
+
+                if entry is not None and (entry.get('mtime_ns'), entry.get('size')) != (stat.st_mtime_ns, stat.st_size):
+                    # Zmieniony czas modyfikacji (np. po skopiowaniu do obrazu) - porównaj zawartość
+                    if entry.get('sha256') == _file_hash(module_path):
+                        entry = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                    else:
+                        entry = None
+                    changed = True
+
+                if entry is None:
+                    entry = self._scan_adapter_file(module_path, stat)
+                    changed = True
+                else:
+                    # Plik zgodny z manifestem - moduł zostanie wykonany przy pierwszym użyciu
+                    for adapter_id, class_name in entry['adapters'].items():
+                        self.adapters.register(adapter_id, f"{module_path}:{class_name}")
+                        print(f"Registered adapter: {adapter_id}")
 
-                # Zbuduj pełną ścieżkę do modułu
-                module_path = os.path.join(directory, filename)
+                entries[filename] = entry
 
-                # Załaduj moduł
-                spec = importlib.util.spec_from_file_location(module_name, module_path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
+            except Exception as e:
+                print(f"Error loading adapter from {filename}: {e}")
 
-                # Znajdź wszystkie klasy dziedziczące po BaseAdapter
-                for name, obj in inspect.getmembers(module):
-                    if (inspect.isclass(obj) and
-                            issubclass(obj, BaseAdapter) and
-                            obj != BaseAdapter):
+        # Usunięte pliki znikają z manifestu
+        if changed or set(entries) != set(manifest['files']):
+            save_manifest({'version': MANIFEST_VERSION, 'files': entries}, manifest_path)
 
-                        # Utwórz ID adaptera
-                        adapter_id = module_name
-                        if adapter_id.endswith('_adapter'):
-                            adapter_id = adapter_id[:-8]  # Usuń '_adapter'
+        return self
 
-                        # Utwórz instancję adaptera
-                        adapter_instance = obj(adapter_id)
+    def _scan_adapter_file(self, module_path, stat):
+        """
+        Wykonuje plik adaptera, rejestruje znalezione adaptery i zwraca wpis manifestu.
 
-                        # Zarejestruj adapter
-                        self.register_adapter(adapter_id, adapter_instance)
-                        print(f"Registered adapter: {adapter_id}")
+        Returns:
+            dict: Wpis manifestu {'mtime_ns', 'size', 'sha256', 'adapters': {id: klasa}}
+        """
+        # Utwórz nazwę modułu
+        module_name = os.path.basename(module_path)[:-3]  # Usuń rozszerzenie .py
 
-            except Exception as e:
-                print(f"Error loading adapter from {filename}: {e}")
+        # Załaduj moduł
+        module = load_file_module(module_path)
+        adapters = {}
 
-        return self
+        # Znajdź wszystkie klasy dziedziczące po BaseAdapter
+        for name, obj in inspect.getmembers(module):
+            if (inspect.isclass(obj) and
+                    issubclass(obj, BaseAdapter) and
+                    obj != BaseAdapter):
+
+                adapter_id = _adapter_id(module_name)
+                adapters[adapter_id] = name
+
+                # Zarejestruj klasę - instancja powstanie przy pierwszym użyciu
+                self.adapters.register(adapter_id, obj)
+                print(f"Registered adapter: {adapter_id}")
+
+        return {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': _file_hash(module_path),
+            'adapters': adapters
+        }
 
     def load_adapters_from_module(self, module_name):
         """
@@ -135,6 +242,6 @@ class AdapterManager:
         Zwraca wszystkie zarejestrowane adaptery.
 
         Returns:
-            dict: Słownik adapterów (id -> instancja)
+            LazyAdapterRegistry: Słownik adapterów (id -> instancja, ładowana przy pierwszym odczycie)
         """
         return self.adapters
\ No newline at end of file
@@ -0,0 +1,362 @@
+# Asynchroniczne silniki wykonania
+"""
+async_engine.py
+"""
+
+"""
+Asynchroniczne silniki wykonujące pipeline'y i workflow na jednej pętli zdarzeń.
+Adaptery z natywnym execute_async() działają bezpośrednio na pętli,
+blokujące adaptery trafiają do ograniczonej puli wątków.
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from adapters import ADAPTERS, ADAPTER_POOL
+from adapters.cancellation import OperationCancelled, current_token, use_token
+from .pipeline_engine import PipelineEngine
+from .plan import PIPELINE_FLIGHTS
+from .singleflight import plan_key
+from .workflow_engine import WorkflowEngine, WorkflowRun, FOREACH_ITEM_KEY, FOREACH_INDEX_KEY
+from .incremental import DEFAULT_STATE_DIR
+from .checkpoint import DEFAULT_CHECKPOINT_DIR
+from .result_cache import DEFAULT_CACHE_DIR
+from .tracing import StepSpan
+
+# Domyślna liczba kroków oczekujących równolegle na pętli zdarzeń
+DEFAULT_MAX_CONCURRENCY = 1000
+
+async def execute_adapter_async(adapter, input_data=None, executor=None):
+    """
+    Wykonuje skonfigurowany adapter bez blokowania pętli zdarzeń.
+
+    Wykonania adapterów z thread_safe = False są serializowane blokadą puli
+    adapterów (ADAPTER_POOL.execution_lock), wspólną z silnikami wątkowymi.
+
+    Args:
+        adapter: Instancja adaptera
+        input_data: Dane wejściowe
+        executor: Pula wątków dla blokujących adapterów (None - domyślna pula pętli)
+
+    Returns:
+        Wynik wykonania adaptera
+    """
+    lock = ADAPTER_POOL.execution_lock(adapter)
+
+    if adapter.supports_async:
+        if lock is None:
+            return await adapter.execute_async(input_data)
+
+        await _acquire_async(lock)
+        try:
+            return await adapter.execute_async(input_data)
+        finally:
+            lock.release()
+
+    loop = asyncio.get_running_loop()
+    # Wątek puli widzi token anulowania bieżącego zadania
+    context = contextvars.copy_context()
+    if lock is None:
+        return await loop.run_in_executor(executor, context.run, adapter.execute, input_data)
+
+    # Blokadę trzyma wątek puli - anulowanie zadania nie zwalnia jej przed końcem wykonania
+    return await loop.run_in_executor(executor, context.run, _execute_locked, lock, adapter, input_data)
+
+
+async def _acquire_async(lock):
+    """Czeka na blokadę wątkową w wątku domyślnej puli pętli, nie wstrzymując pętli zdarzeń."""
+    if lock.acquire(blocking=False):
+        return
+
+    future = asyncio.get_running_loop().run_in_executor(None, lock.acquire)
+    try:
+        await asyncio.shield(future)
+    except asyncio.CancelledError:
+        # Wątek puli i tak uzyska blokadę - zwalniamy ją, gdy to nastąpi
+        future.add_done_callback(lambda _: lock.release())
+        raise
+
+
+def _execute_locked(lock, adapter, input_data):
+    with lock:
+        return adapter.execute(input_data)
+
+
+class AsyncPipelineEngine:
+    """Asynchroniczny odpowiednik PipelineEngine."""
+
+    def __init__(self, max_workers=None):
+        """
+        Inicjalizacja silnika.
+
+        Args:
+            max_workers: Rozmiar puli wątków dla blokujących adapterów
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='pipeline-async')
+
+    async def execute_adapter_call(self, adapter_call, input_data=None):
+        """Wykonuje pojedyncze wywołanie adaptera."""
+        adapter_name = adapter_call['adapter']
+
+        if adapter_name not in ADAPTERS:
+            raise ValueError(f"Unknown adapter: {adapter_name}")
+
+        # Każde wykonanie dostaje własną instancję adaptera z puli
+        adapter = ADAPTER_POOL.acquire(adapter_name)
+
+        try:
+            # Zastosuj wszystkie metody
+            for method in adapter_call['methods']:
+                getattr(adapter, method['name'])(method['value'])
+
+            return await execute_adapter_async(adapter, input_data, self._executor)
+        except asyncio.CancelledError:
+            # Wątek puli może nadal używać instancji - nie wraca ona do puli
+            adapter = None
+            raise
+        finally:
+            if adapter is not None:
+                ADAPTER_POOL.release(adapter_name, adapter)
+
+    async def execute_pipeline(self, pipeline, initial_input=None):
+        """Wykonuje sekwencję kroków pipeline'a."""
+        result = initial_input
+
+        for adapter_call in pipeline:
+            result = await self.execute_adapter_call(adapter_call, result)
+
+        return result
+
+    async def execute_plan(self, plan, initial_input=None, coalesce=False):
+        """Wykonuje skompilowany plan (coalesce - łączenie z identycznym trwającym wykonaniem)."""
+        if coalesce:
+            return await PIPELINE_FLIGHTS.do_async(plan_key(plan, initial_input), self._run_plan,
+                                                   plan, initial_input)
+        return await self._run_plan(plan, initial_input)
+
+    async def _run_plan(self, plan, initial_input):
+        result = initial_input
+
+        for step in plan.steps:
+            adapter_call = {
+                'adapter': step.adapter,
+                'methods': [{'name': name, 'value': value} for name, value in step.methods]
+            }
+            result = await self.execute_adapter_call(adapter_call, result)
+
+        return result
+
+    async def execute_from_dot_notation(self, expression, initial_input=None, coalesce=False):
+        """Wykonuje pipeline z wyrażenia w notacji kropkowej."""
+        plan = PipelineEngine.compile(expression)
+        return await self.execute_plan(plan, initial_input, coalesce)
+
+    def shutdown(self, wait=True):
+        """Zamyka pulę wątków silnika."""
+        self._executor.shutdown(wait=wait)
+
+
+class AsyncWorkflowEngine(WorkflowEngine):
+    """Silnik workflow wykonujący kroki jako zadania asyncio."""
+
+    def __init__(self, max_parallel=None, max_processes=None, max_concurrency=None,
+                 result_cache=None, state_dir=DEFAULT_STATE_DIR,
+                 checkpoint_dir=DEFAULT_CHECKPOINT_DIR, broker=None, cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Inicjalizacja silnika.
+
+        Args:
+            max_parallel: Rozmiar puli wątków dla blokujących adapterów
+            max_processes: Rozmiar puli procesów dla kroków 'executor: process'
+            max_concurrency: Limit kroków wykonywanych równolegle na pętli zdarzeń
+            result_cache: Pamięć podręczna wyników kroków (ResultCache)
+            state_dir: Katalog odcisków kroków dla wykonania przyrostowego
+            checkpoint_dir: Katalog dzienników punktów kontrolnych
+            broker: Broker kroków 'executor: remote' (core/distributed.py)
+            cache_dir: Katalog dyskowego poziomu pamięci podręcznej wyników (None - tylko pamięć)
+        """
+        super().__init__(max_parallel, max_processes, result_cache, state_dir, checkpoint_dir, broker, cache_dir)
+        self.max_concurrency = max_concurrency or DEFAULT_MAX_CONCURRENCY
+
+    async def execute_workflow_async(self, workflow_id, inputs=None, incremental=False,
+                                     checkpoint=None, run_id=None):
+        """Asynchronicznie wykonuje workflow o podanym ID."""
+        workflow, context, log = self._start_run(workflow_id, inputs, checkpoint, run_id)
+        return await self._execute_async(workflow, context, incremental, log)
+
+    async def resume_async(self, run_id, incremental=False):
+        """Asynchronicznie wznawia przerwane wykonanie workflow."""
+        workflow, context, log = self._resume_run(run_id)
+        return await self._execute_async(workflow, context, incremental, log)
+
+    async def _execute_async(self, workflow, context, incremental=False, log=None):
+        """Wykonuje kroki workflow jako zadania asyncio."""
+        run = WorkflowRun(self, workflow, context, incremental, log)
+        limit = max(1, min(int(workflow.get('max_parallel') or self.max_concurrency),
+                           self.max_concurrency))
+
+        try:
+            while run.active:
+                run.check_deadline()
+
+                for step_id, step in run.launchable(limit):
+                    token, span = run.step_token(step)
+                    task = asyncio.ensure_future(
+                        self._run_step_with_token_async(token, step, run.step_context(step_id), run.state, span)
+                    )
+                    run.started(task, step_id, token, span)
+
+                if not run.running:
+                    continue
+
+                done, _ = await asyncio.wait(run.running, timeout=run.next_expiry(),
+                                             return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    run.step_done(task)
+
+                run.expire_steps()
+
+            run.finished = True
+        finally:
+            run.close()
+
+        return run.result()
+
+    async def _run_step_with_token_async(self, token, step, context, state=None, span=None):
+        """Asynchronicznie wykonuje krok z ustawionym tokenem anulowania (w kontekście zadania)."""
+        with use_token(token):
+            token.raise_if_cancelled()
+            return await self._run_step_async(step, context, state, span)
+
+    async def _run_step_async(self, step, context, state=None, span=None):
+        """Asynchronicznie wykonuje krok (lub pobiera jego wynik z zapisu)."""
+        span = (span or StepSpan(step['id'], step.get('adapter'))).start()
+
+        try:
+            record = await self._run_step_traced_async(step, context, state, span)
+        except Exception as e:
+            span.finish('error', e)
+            raise
+
+        span.finish('ok')
+        return record
+
+    async def _run_step_traced_async(self, step, context, state, span):
+        """Asynchronicznie wykonuje krok, zapisując czasy faz w spanie."""
+        if 'foreach' in step:
+            with span.phase('execute'):
+                record = await self._run_foreach_async(step, context)
+            span.set_output(record['output'])
+            return record
+
+        with span.phase('resolve'):
+            call, record = self._prepare_step(step, context, state)
+        span.executor = call['executor']
+
+        if record is not None:
+            span.cache = 'up_to_date' if record.get('up_to_date') else 'hit'
+            span.set_output(record['output'])
+            return record
+
+        with span.phase('execute'):
+            output = await self._call_step_adapter_async(step, call)
+
+        record = self._finish_step(step, call, output, state)
+        span.cache = 'miss' if 'cached' in record else None
+        span.set_output(output)
+        return record
+
+    async def _run_foreach_async(self, step, context):
+        """Asynchronicznie wykonuje krok 'foreach' (semantyka jak w _run_foreach)."""
+        items = self._resolve_foreach_items(step, context)
+        limit = max(1, min(int(step.get('concurrency') or self.max_concurrency), self.max_concurrency))
+        allow_partial = step.get('allow_partial', False)
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run_item(index, item):
+            item_context = dict(context, **{FOREACH_ITEM_KEY: item, FOREACH_INDEX_KEY: index})
+            async with semaphore:
+                call, record = self._prepare_step(step, item_context)
+                if record is not None:
+                    return record['output']
+
+                output = await self._call_step_adapter_async(step, call)
+                return self._finish_step(step, call, output)['output']
+
+        tasks = [asyncio.ensure_future(run_item(index, item)) for index, item in enumerate(items)]
+
+        try:
+            outcomes = await asyncio.gather(*tasks, return_exceptions=allow_partial)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        results = []
+        errors = []
+        for index, outcome in enumerate(outcomes):
+            if isinstance(outcome, Exception):
+                errors.append({'index': index, 'error': str(outcome)})
+                results.append(None)
+            else:
+                results.append(outcome)
+
+        return {'output': results, 'success': True, 'errors': errors, 'partial': bool(errors)}
+
+    async def _call_step_adapter_async(self, step, call):
+        """Asynchronicznie wykonuje adapter kroku, łącząc identyczne równoczesne wykonania."""
+        key = self._step_flight_key(step, call)
+        if key is None:
+            return await self._call_adapter_async(call['adapter'], call['executor'], call['methods'],
+                                                  call['input'], call['locality'])
+
+        return await self.step_flights.do_async(key, self._call_adapter_shared_async, call)
+
+    async def _call_adapter_shared_async(self, call):
+        output = await self._call_adapter_async(call['adapter'], call['executor'], call['methods'],
+                                                call['input'], call['locality'])
+        return self.payloads.finalize(output)
+
+    async def _call_adapter_async(self, adapter_name, executor, methods, input_data, locality=None):
+        """Konfiguruje i asynchronicznie wykonuje adapter."""
+        # Kroki rozsyłane do węzłów roboczych (core/distributed.py)
+        if executor == 'remote':
+            token = current_token()
+            future = self.remote_executor.submit(adapter_name, methods, self.payloads.resolve(input_data),
+                                                 locality, token.remaining())
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), token.remaining())
+            except asyncio.TimeoutError:
+                raise OperationCancelled(token.reason or "Deadline exceeded")
+
+        # Kroki CPU-bound trafiają do puli procesów
+        if executor == 'process':
+            future = self._submit_process_step(adapter_name, methods, input_data)
+            token = current_token()
+            try:
+                output = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), token.remaining())
+            except asyncio.TimeoutError:
+                self._abandon_process_step(future)
+                raise OperationCancelled(token.reason or "Deadline exceeded")
+            except asyncio.CancelledError:
+                self._abandon_process_step(future)
+                raise
+            return self.payloads.adopt(output)
+
+        # Każdy krok dostaje własną instancję adaptera z puli
+        adapter = ADAPTER_POOL.acquire(adapter_name)
+
+        try:
+            for method_name, method_value in methods:
+                getattr(adapter, method_name)(method_value)
+
+            return await execute_adapter_async(adapter, self.payloads.resolve(input_data),
+                                               self._get_executor())
+        except asyncio.CancelledError:
+            # Wątek puli może nadal używać instancji - nie wraca ona do puli
+            adapter = None
+            raise
+        finally:
+            if adapter is not None:
+                ADAPTER_POOL.release(adapter_name, adapter)
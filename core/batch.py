@@ -0,0 +1,106 @@
+# Wsadowe wykonanie pipeline'ów
+"""
+batch.py
+"""
+
+"""
+Wykonanie jednego planu dla wielu danych wejściowych.
+
+Plan jest wykonywany krok po kroku dla całej paczki. Adapter z metodą
+execute_many(inputs) dostaje wszystkie dane kroku naraz (np. jedna predykcja
+modelu, jedno połączenie z bazą); pozostałe adaptery są wykonywane równolegle
+dla każdego elementu na osobnych instancjach z puli.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from adapters import ADAPTER_POOL
+
+# Domyślna liczba elementów paczki wykonywanych równolegle
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# Największa liczba elementów paczki wykonywanych równolegle (liczba wątków puli)
+MAX_BATCH_CONCURRENCY = 64
+
+
+def _configure(adapter, step):
+    """Stosuje metody kroku planu do instancji adaptera."""
+    for method_name, method_value in step.methods:
+        getattr(adapter, method_name)(method_value)
+    return adapter
+
+
+def _execute_item(step, input_data):
+    """Wykonuje krok planu dla jednego elementu."""
+    with ADAPTER_POOL.adapter(step.adapter) as adapter:
+        return _configure(adapter, step).execute(input_data)
+
+
+def _execute_step(step, values, executor, return_exceptions):
+    """Wykonuje krok planu dla listy danych wejściowych."""
+    # Sprawdzamy klasę - __getattr__ adapterów zwraca settery dla dowolnych nazw
+    if getattr(step.adapter_class, 'execute_many', None) is not None:
+        try:
+            with ADAPTER_POOL.adapter(step.adapter) as adapter:
+                results = list(_configure(adapter, step).execute_many(values))
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return [e] * len(values)
+
+        if len(results) != len(values):
+            raise RuntimeError(
+                f"Adapter {step.adapter} returned {len(results)} results for {len(values)} inputs"
+            )
+        return results
+
+    futures = [executor.submit(_execute_item, step, value) for value in values]
+
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            if not return_exceptions:
+                for pending in futures:
+                    pending.cancel()
+                raise
+            results.append(e)
+
+    return results
+
+
+def execute_batch(plan, inputs, concurrency=None, return_exceptions=False):
+    """
+    Wykonuje plan dla każdego elementu listy danych wejściowych.
+
+    Args:
+        plan: PipelinePlan
+        inputs: Lista danych wejściowych
+        concurrency: Liczba elementów wykonywanych równolegle (adaptery bez execute_many),
+                     ograniczana do MAX_BATCH_CONCURRENCY
+        return_exceptions: Zwróć wyjątki jako wyniki błędnych elementów zamiast je zgłaszać
+
+    Returns:
+        list: Wyniki w kolejności danych wejściowych
+    """
+    results = list(inputs)
+    if not results:
+        return results
+
+    workers = min(max(1, int(concurrency or DEFAULT_BATCH_CONCURRENCY)), MAX_BATCH_CONCURRENCY, len(results))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pipeline-batch') as executor:
+        for step in plan.steps:
+            # Elementy zakończone błędem nie trafiają do kolejnych kroków
+            active = [index for index, value in enumerate(results)
+                      if not isinstance(value, Exception)]
+            if not active:
+                break
+
+            step_results = _execute_step(step, [results[index] for index in active],
+                                         executor, return_exceptions)
+
+            for index, value in zip(active, step_results):
+                results[index] = value
+
+    return results
@@ -0,0 +1,142 @@
+# Punkty kontrolne wykonania workflow
+"""
+checkpoint.py
+"""
+
+"""
+Dziennik punktów kontrolnych wykonania workflow.
+
+Dziennik jest plikiem tylko do dopisywania: nagłówek uruchomienia, a po nim
+wpisy kolejnych zakończonych kroków (pickle). Zapis kroku nie przepisuje
+całego kontekstu, a urwany ostatni wpis (np. po awarii procesu) jest pomijany
+przy odczycie.
+"""
+
+import os
+import pickle
+import time
+
+# Domyślny katalog dzienników punktów kontrolnych
+DEFAULT_CHECKPOINT_DIR = os.path.join('data', 'checkpoints')
+
+
+class CheckpointLog:
+    """Dziennik punktów kontrolnych jednego uruchomienia workflow."""
+
+    def __init__(self, run_id, directory=DEFAULT_CHECKPOINT_DIR, fsync=False):
+        """
+        Inicjalizacja dziennika.
+
+        Args:
+            run_id: ID uruchomienia
+            directory: Katalog dzienników
+            fsync: Czy wymuszać zapis na dysk po każdym wpisie
+        """
+        self.run_id = run_id
+        self.path = os.path.join(directory, f"{run_id}.log")
+        self.fsync = fsync
+        self._file = None
+        self._valid_size = None
+
+    def exists(self):
+        """Sprawdza, czy dziennik uruchomienia istnieje."""
+        return os.path.exists(self.path)
+
+    def start(self, workflow_id, inputs, timestamp):
+        """Tworzy dziennik z nagłówkiem uruchomienia."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._append(('run', {
+            'workflow_id': workflow_id,
+            'inputs': inputs,
+            'timestamp': timestamp
+        }))
+
+    def reopen(self):
+        """Otwiera istniejący dziennik do dopisywania (wznowienie)."""
+        if self._valid_size is None:
+            self.load()
+
+        self._file = open(self.path, 'r+b')
+        # Odetnij urwany wpis, żeby kolejne wpisy dało się odczytać
+        self._file.truncate(self._valid_size)
+        self._file.seek(self._valid_size)
+
+    def append_step(self, step_id, record):
+        """
+        Dopisuje wpis zakończonego kroku.
+
+        Returns:
+            bool: False jeśli wpisu nie da się zserializować (krok wykona się ponownie)
+        """
+        try:
+            data = pickle.dumps(('step', step_id, record), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+
+        self._write(data)
+        return True
+
+    def finish(self, status):
+        """Zapisuje status zakończenia i zamyka dziennik."""
+        if self._file is None:
+            return
+
+        try:
+            self._append(('status', status, time.time()))
+        finally:
+            self.close()
+
+    def close(self):
+        """Zamyka dziennik."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def load(self):
+        """
+        Odczytuje dziennik.
+
+        Returns:
+            tuple: (nagłówek lub None, wpisy kroków wg ID, ostatni status lub None)
+        """
+        header = None
+        steps = {}
+        status = None
+        self._valid_size = 0
+
+        if not self.exists():
+            return header, steps, status
+
+        with open(self.path, 'rb') as f:
+            while True:
+                try:
+                    entry = pickle.load(f)
+                except EOFError:
+                    break
+                except Exception:
+                    # Urwany ostatni wpis - wszystko przed nim jest poprawne
+                    break
+
+                if entry[0] == 'run':
+                    header = entry[1]
+                elif entry[0] == 'step':
+                    steps[entry[1]] = entry[2]
+                elif entry[0] == 'status':
+                    status = entry[1]
+
+                self._valid_size = f.tell()
+
+        return header, steps, status
+
+    def _append(self, entry):
+        """Dopisuje dowolny wpis."""
+        self._write(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _write(self, data):
+        """Zapisuje dane na końcu dziennika."""
+        self._file.write(data)
+        self._file.flush()
+
+        if self.fsync:
+            os.fsync(self._file.fileno())
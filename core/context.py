@@ -12,6 +12,7 @@ import os
 import json
 from datetime import datetime
 import uuid
+from .tracing import format_summary, write_chrome_trace
 
 
 class ExecutionContext:
@@ -30,6 +31,8 @@ class ExecutionContext:
         self.input = input_data or {}
         self.results = {}
         self.errors = []
+        # Spany wykonanych kroków (core/tracing.py)
+        self.trace = []
         self.start_time = time.time()
         self.metadata = {
             'id': str(uuid.uuid4()),
@@ -56,6 +59,19 @@ class ExecutionContext:
         })
         return self
 
+    def add_span(self, span):
+        """Dodaje span kroku (słownik z StepSpan.to_dict) do kontekstu."""
+        self.trace.append(span)
+        return self
+
+    def trace_summary(self):
+        """Zwraca tabelę czasów kroków i adapterów jako tekst."""
+        return format_summary(self.trace)
+
+    def export_trace(self, file_path):
+        """Zapisuje spany kroków jako Chrome trace JSON."""
+        write_chrome_trace(self.trace, file_path, self.metadata['id'])
+
     def get_duration(self):
         """Zwraca czas wykonania w sekundach."""
         return time.time() - self.start_time
@@ -130,6 +146,7 @@ class ExecutionContext:
             'input': self.input,
             'results': self.results,
             'errors': self.errors,
+            'trace': self.trace,
             'metadata': {
                 **self.metadata,
                 'duration': self.get_duration()
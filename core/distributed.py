@@ -0,0 +1,1158 @@
+# Rozproszone wykonywanie kroków
+"""
+distributed.py
+"""
+
+"""
+Wykonywanie kroków workflow na zdalnych węzłach roboczych przez broker.
+
+Krok z 'executor: remote' jest wysyłany przez koordynatora (RemoteStepExecutor
+w WorkflowEngine) do kolejki brokera, wykonywany przez węzeł roboczy (Worker)
+i jego wynik wraca do kolejki odpowiedzi koordynatora. Węzły co chwilę
+ogłaszają w brokerze swoją pojemność, liczbę wykonywanych kroków i znaczniki
+lokalności (nazwa hosta oraz np. podłączona kamera lub drukarka, lokalny
+zbiór danych). Koordynator kieruje krok do najmniej obciążonego węzła
+spełniającego 'locality' kroku; gdy wszystkie są zajęte (a krok nie wymaga
+lokalności), krok trafia do kolejki wspólnej i wykonuje go pierwszy wolny węzeł.
+Gdy w brokerze nie ogłasza się żaden węzeł, krok od razu kończy się błędem.
+
+    - id: render_labels
+      adapter: zpl
+      executor: remote
+      locality: printer-hall-2     # tylko węzły z tym znacznikiem
+
+Brokery:
+    memory://                  InProcessBroker - węzły jako wątki tego procesu (testy)
+    tcp://host:7781            TcpBroker - lokalny serwer brokera (python -m core.distributed broker)
+    redis://host:6379/0        RedisBroker
+    rabbitmq://host            MessageQueueBroker (backend adaptera message_queue)
+    kafka://host:9092          MessageQueueBroker (backend adaptera message_queue)
+
+Węzeł roboczy:
+    python -m core.distributed worker --broker tcp://host:7781 --capacity 4 --locality camera-1
+
+Serwer brokera TCP przyjmuje tylko ramki JSON (dane binarne w base64)
+o ograniczonym rozmiarze i nie deserializuje treści wiadomości. Kroki i ich
+wyniki są serializowane przez pickle między koordynatorem a węzłami, więc
+wspólny sekret (zmienna środowiskowa BROKER_SECRET) chroni oba końce:
+    - wiadomości są podpisywane HMAC-SHA256, a podpis jest sprawdzany przed
+      deserializacją - wiadomości bez poprawnego podpisu są odrzucane,
+    - serwer brokera TCP wymaga od klientów odpowiedzi na wyzwanie HMAC
+      i bez sekretu odmawia nasłuchu na adresie innym niż pętla zwrotna.
+
+    BROKER_SECRET=... python -m core.distributed broker --host 0.0.0.0
+    BROKER_SECRET=... python -m core.distributed worker --broker tcp://host:7781
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import ipaddress
+import itertools
+import json
+import math
+import os
+import pickle
+import socket
+import socketserver
+import struct
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from urllib.parse import urlparse
+from adapters import ADAPTER_POOL
+from adapters.cancellation import CancellationToken, use_token
+
+# Prefiks nazw kolejek i kluczy w brokerze
+DEFAULT_QUEUE_PREFIX = '2print'
+
+# Kolejka wspólna - kroki bez przypisanego węzła wykonuje pierwszy wolny węzeł
+SHARED_TASK_QUEUE = 'tasks'
+
+# Odstęp ogłoszeń węzła w brokerze (w sekundach)
+HEARTBEAT_INTERVAL = 2.0
+
+# Czas, po którym węzeł bez ogłoszenia jest uznawany za niedostępny (w sekundach)
+WORKER_TTL = 3 * HEARTBEAT_INTERVAL
+
+# Czas jednego oczekiwania na wiadomość - co tyle sprawdzane jest zatrzymanie pętli (w sekundach)
+POLL_TIMEOUT = 1.0
+
+# Odstęp odpytywania brokerów bez blokującego odbioru (w sekundach)
+POLL_INTERVAL = 0.05
+
+# Domyślny port serwera brokera TCP
+DEFAULT_BROKER_PORT = 7781
+
+# Nagłówek ramki protokołu brokera TCP: długość danych
+FRAME_HEADER = struct.Struct('!I')
+
+# Największy dopuszczalny rozmiar ramki protokołu brokera TCP (w bajtach)
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+# Klucz obiektu JSON z danymi binarnymi (base64) w ramkach brokera TCP
+BYTES_KEY = '$bytes'
+
+# Zmienna środowiskowa ze wspólnym sekretem koordynatorów, węzłów i serwera brokera
+SECRET_ENV = 'BROKER_SECRET'
+
+# Algorytm podpisu wiadomości i odpowiedzi na wyzwanie serwera brokera
+SIGNATURE_DIGEST = hashlib.sha256
+
+# Długość podpisu wiadomości (w bajtach)
+SIGNATURE_SIZE = SIGNATURE_DIGEST().digest_size
+
+# Długość wyzwania uwierzytelniającego serwera brokera TCP (w bajtach)
+CHALLENGE_SIZE = 32
+
+
+def default_secret():
+    """Zwraca wspólny sekret ze zmiennej środowiskowej BROKER_SECRET (None, jeśli nie ustawiono)."""
+    return os.environ.get(SECRET_ENV) or None
+
+
+def _secret_bytes(secret):
+    if secret is None or isinstance(secret, bytes):
+        return secret
+    return secret.encode('utf-8')
+
+
+def _signature(secret, data):
+    return hmac.new(_secret_bytes(secret), data, SIGNATURE_DIGEST).digest()
+
+
+def encode(message, secret=None):
+    """Serializuje wiadomość brokera (krok lub wynik kroku), z sekretem poprzedzając ją podpisem HMAC."""
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    if secret is None:
+        return data
+    return _signature(secret, data) + data
+
+
+def decode(data, secret=None):
+    """
+    Deserializuje wiadomość brokera (krok lub wynik kroku).
+
+    Z sekretem podpis jest sprawdzany przed deserializacją.
+
+    Raises:
+        ValueError: Brak lub niepoprawny podpis wiadomości
+    """
+    if secret is not None:
+        signature, data = data[:SIGNATURE_SIZE], data[SIGNATURE_SIZE:]
+        if not hmac.compare_digest(signature, _signature(secret, data)):
+            raise ValueError("Invalid broker message signature")
+    return pickle.loads(data)
+
+
+def is_loopback(host):
+    """Czy adres nasłuchu jest adresem pętli zwrotnej (dostępnym tylko z tego hosta)."""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _node_id():
+    """Zwraca unikalny identyfikator węzła (host, proces, losowy sufiks)."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def worker_queue(worker_id):
+    """Zwraca nazwę kolejki kroków przypisanych do węzła."""
+    return f"tasks.{worker_id}"
+
+
+def _as_tags(locality):
+    """Zamienia 'locality' kroku (tekst, lista lub None) na zbiór znaczników."""
+    if not locality:
+        return set()
+    if isinstance(locality, str):
+        return {locality}
+    return set(locality)
+
+
+class Broker:
+    """
+    Interfejs brokera: kolejki wiadomości (bajty) i rejestr żywych węzłów.
+    """
+
+    def push(self, queue, message):
+        """Dodaje wiadomość na koniec kolejki."""
+        raise NotImplementedError("Subclasses must implement push()")
+
+    def pop(self, queues, timeout=None):
+        """
+        Pobiera pierwszą wiadomość z pierwszej niepustej kolejki.
+
+        Args:
+            queues: Nazwy kolejek w kolejności pierwszeństwa
+            timeout: Najdłuższy czas oczekiwania (0 - bez czekania, None - bez limitu)
+
+        Returns:
+            bytes: Wiadomość lub None po upływie czasu
+        """
+        raise NotImplementedError("Subclasses must implement pop()")
+
+    def announce(self, worker_id, info, ttl=WORKER_TTL):
+        """Ogłasza węzeł (słownik info) na ttl sekund."""
+        raise NotImplementedError("Subclasses must implement announce()")
+
+    def withdraw(self, worker_id):
+        """Usuwa ogłoszenie węzła."""
+        raise NotImplementedError("Subclasses must implement withdraw()")
+
+    def members(self):
+        """Zwraca żywe węzły: {worker_id: info}."""
+        raise NotImplementedError("Subclasses must implement members()")
+
+    def close(self):
+        """Zamyka połączenia brokera."""
+
+
+class InProcessBroker(Broker):
+    """Broker w pamięci procesu - dla węzłów uruchomionych jako wątki (testy, jeden host)."""
+
+    def __init__(self):
+        self._queues = {}
+        # Ogłoszenia węzłów: worker_id -> (czas wygaśnięcia, info)
+        self._members = {}
+        self._condition = threading.Condition()
+
+    def push(self, queue, message):
+        with self._condition:
+            self._queues.setdefault(queue, deque()).append(message)
+            self._condition.notify_all()
+
+    def pop(self, queues, timeout=None):
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        with self._condition:
+            while True:
+                for queue in queues:
+                    messages = self._queues.get(queue)
+                    if messages:
+                        return messages.popleft()
+
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def announce(self, worker_id, info, ttl=WORKER_TTL):
+        with self._condition:
+            self._members[worker_id] = (time.monotonic() + ttl, info)
+
+    def withdraw(self, worker_id):
+        with self._condition:
+            self._members.pop(worker_id, None)
+
+    def members(self):
+        now = time.monotonic()
+        with self._condition:
+            return {worker_id: info for worker_id, (expires, info) in self._members.items() if expires > now}
+
+
+# Metody brokera dostępne przez protokół TCP
+BROKER_METHODS = ('push', 'pop', 'announce', 'withdraw', 'members')
+
+
+def _to_wire(value):
+    """Zamienia wartość na postać JSON (bajty jako obiekt z base64)."""
+    if isinstance(value, bytes):
+        return {BYTES_KEY: base64.b64encode(value).decode('ascii')}
+    if isinstance(value, dict):
+        return {key: _to_wire(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_wire(item) for item in value]
+    return value
+
+
+def _from_wire(value):
+    """Odwraca _to_wire()."""
+    if isinstance(value, dict):
+        if len(value) == 1 and BYTES_KEY in value:
+            return base64.b64decode(value[BYTES_KEY])
+        return {key: _from_wire(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_from_wire(item) for item in value]
+    return value
+
+
+def _send_frame(sock, value):
+    data = json.dumps(_to_wire(value)).encode('utf-8')
+    if len(data) > MAX_FRAME_SIZE:
+        raise ValueError(f"Broker frame too large ({len(data)} bytes, limit {MAX_FRAME_SIZE})")
+    sock.sendall(FRAME_HEADER.pack(len(data)) + data)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise EOFError("Broker connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _recv_frame(sock):
+    """
+    Odbiera ramkę JSON.
+
+    Raises:
+        ValueError: Ramka przekracza MAX_FRAME_SIZE lub nie jest poprawnym JSON-em
+    """
+    size, = FRAME_HEADER.unpack(_recv_exactly(sock, FRAME_HEADER.size))
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"Broker frame too large ({size} bytes, limit {MAX_FRAME_SIZE})")
+    return _from_wire(json.loads(_recv_exactly(sock, size).decode('utf-8')))
+
+
+class _BrokerRequestHandler(socketserver.BaseRequestHandler):
+    """Obsługuje wywołania metod brokera jednego połączenia."""
+
+    def handle(self):
+        broker = self.server.broker
+        if not self._authenticate():
+            return
+
+        while True:
+            try:
+                request = _recv_frame(self.request)
+            except (EOFError, OSError, ValueError):
+                # Po błędnej ramce strumienia nie da się zsynchronizować - połączenie jest zamykane
+                return
+
+            if not (isinstance(request, list) and len(request) == 2 and isinstance(request[1], list)):
+                reply = (False, "Malformed broker request")
+            elif request[0] not in BROKER_METHODS:
+                reply = (False, f"Unknown broker method: {request[0]}")
+            else:
+                method, args = request
+                try:
+                    reply = (True, getattr(broker, method)(*args))
+                except Exception as e:
+                    reply = (False, str(e))
+
+            try:
+                _send_frame(self.request, reply)
+            except (OSError, ValueError):
+                return
+
+    def _authenticate(self):
+        """Wysyła wyzwanie (None bez sekretu) i sprawdza odpowiedź klienta."""
+        secret = self.server.secret
+        challenge = os.urandom(CHALLENGE_SIZE) if secret is not None else None
+
+        try:
+            _send_frame(self.request, ('hello', challenge))
+            if challenge is None:
+                return True
+
+            response = _recv_frame(self.request)
+            if isinstance(response, bytes) and hmac.compare_digest(response, _signature(secret, challenge)):
+                _send_frame(self.request, (True, None))
+                return True
+
+            _send_frame(self.request, (False, "Broker authentication failed"))
+        except (EOFError, OSError, ValueError):
+            pass
+        return False
+
+
+class BrokerServer(socketserver.ThreadingTCPServer):
+    """Lokalny serwer brokera TCP udostępniający InProcessBroker innym procesom i hostom."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_BROKER_PORT, broker=None, secret=None):
+        """
+        Inicjalizacja serwera.
+
+        Args:
+            host: Adres nasłuchu
+            port: Port nasłuchu
+            broker: Broker obsługujący wywołania (domyślnie nowy InProcessBroker)
+            secret: Wspólny sekret wymagany od klientów (domyślnie BROKER_SECRET)
+
+        Raises:
+            ValueError: Adres inny niż pętla zwrotna bez wspólnego sekretu
+        """
+        secret = secret if secret is not None else default_secret()
+        if secret is None and not is_loopback(host):
+            raise ValueError(f"Refusing to listen on {host} without a shared secret "
+                             f"(set {SECRET_ENV} or bind to 127.0.0.1)")
+
+        super().__init__((host, port), _BrokerRequestHandler)
+        self.broker = broker or InProcessBroker()
+        self.secret = secret
+
+    @property
+    def url(self):
+        """Adres brokera dla broker_from_url()."""
+        host, port = self.server_address[:2]
+        return f"tcp://{host}:{port}"
+
+    def start(self):
+        """Uruchamia serwer w wątku w tle."""
+        threading.Thread(target=self.serve_forever, name='broker-server', daemon=True).start()
+        return self
+
+
+class TcpBroker(Broker):
+    """Klient serwera brokera TCP (osobne połączenie dla każdego wątku)."""
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_BROKER_PORT, secret=None):
+        self.address = (host, port)
+        self.secret = secret if secret is not None else default_secret()
+        self._local = threading.local()
+        self._sockets = []
+        self._lock = threading.Lock()
+
+    def _socket(self):
+        sock = getattr(self._local, 'socket', None)
+        if sock is None:
+            sock = socket.create_connection(self.address)
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self._authenticate(sock)
+            except BaseException:
+                sock.close()
+                raise
+            self._local.socket = sock
+            with self._lock:
+                self._sockets.append(sock)
+        return sock
+
+    def _authenticate(self, sock):
+        """Odpowiada na wyzwanie serwera brokera."""
+        _, challenge = _recv_frame(sock)
+        if challenge is None:
+            return
+
+        if self.secret is None:
+            raise RuntimeError(f"Broker requires a shared secret (set {SECRET_ENV})")
+        _send_frame(sock, _signature(self.secret, challenge))
+        ok, error = _recv_frame(sock)
+        if not ok:
+            raise RuntimeError(f"Broker error: {error}")
+
+    def _call(self, method, *args):
+        sock = self._socket()
+        try:
+            _send_frame(sock, (method, args))
+            ok, value = _recv_frame(sock)
+        except (EOFError, OSError, ValueError):
+            # Zerwane połączenie - kolejne wywołanie połączy się ponownie
+            self._local.socket = None
+            sock.close()
+            raise
+
+        if not ok:
+            raise RuntimeError(f"Broker error: {value}")
+        return value
+
+    def push(self, queue, message):
+        self._call('push', queue, message)
+
+    def pop(self, queues, timeout=None):
+        return self._call('pop', list(queues), timeout)
+
+    def announce(self, worker_id, info, ttl=WORKER_TTL):
+        self._call('announce', worker_id, info, ttl)
+
+    def withdraw(self, worker_id):
+        self._call('withdraw', worker_id)
+
+    def members(self):
+        return self._call('members')
+
+    def close(self):
+        with self._lock:
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            sock.close()
+
+
+class RedisBroker(Broker):
+    """Broker na Redisie: listy jako kolejki, klucze z czasem życia jako ogłoszenia węzłów."""
+
+    def __init__(self, host='localhost', port=6379, db=0, prefix=DEFAULT_QUEUE_PREFIX):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("Redis broker requires 'redis' package. Install with: pip install redis")
+
+        self._redis = redis.Redis(host=host, port=port, db=db)
+        self.prefix = prefix
+
+    def _key(self, queue):
+        return f"{self.prefix}:{queue}"
+
+    def push(self, queue, message):
+        self._redis.rpush(self._key(queue), message)
+
+    def pop(self, queues, timeout=None):
+        keys = [self._key(queue) for queue in queues]
+
+        if timeout is not None and timeout <= 0:
+            for key in keys:
+                message = self._redis.lpop(key)
+                if message is not None:
+                    return message
+            return None
+
+        # BLPOP przyjmuje całe sekundy (0 - bez limitu)
+        result = self._redis.blpop(keys, timeout=max(1, math.ceil(timeout)) if timeout is not None else 0)
+        return result[1] if result else None
+
+    def announce(self, worker_id, info, ttl=WORKER_TTL):
+        self._redis.set(self._key(f"workers:{worker_id}"), json.dumps(info), px=int(ttl * 1000))
+
+    def withdraw(self, worker_id):
+        self._redis.delete(self._key(f"workers:{worker_id}"))
+
+    def members(self):
+        keys = list(self._redis.scan_iter(match=self._key('workers:*')))
+        if not keys:
+            return {}
+
+        prefix_length = len(self._key('workers:'))
+        members = {}
+        for key, value in zip(keys, self._redis.mget(keys)):
+            # Klucz mógł wygasnąć między SCAN a MGET
+            if value is not None:
+                members[key.decode('utf-8')[prefix_length:]] = json.loads(value)
+        return members
+
+    def close(self):
+        self._redis.close()
+
+
+class MessageQueueBroker(Broker):
+    """
+    Broker na backendach kolejkowych adaptera message_queue (Redis, RabbitMQ, Kafka).
+
+    Broker utrzymuje jedno połączenie z backendem (współdzielone przez wątki
+    pod blokadą). Wiadomości są przesyłane jako JSON z danymi w base64.
+    Backendy nie mają rejestru kluczy, więc ogłoszenia węzłów trafiają do
+    kolejki 'workers' i odbiera je jeden koordynator - pozostali koordynatorzy
+    kierują kroki do kolejki wspólnej.
+    """
+
+    def __init__(self, queue_type='rabbitmq', prefix=DEFAULT_QUEUE_PREFIX, **params):
+        """
+        Inicjalizacja brokera.
+
+        Args:
+            queue_type: Backend kolejek ('redis', 'rabbitmq', 'kafka')
+            prefix: Prefiks nazw kolejek
+            **params: Parametry połączenia (np. host, port, db, bootstrap_servers, group_id)
+        """
+        if queue_type not in ('redis', 'rabbitmq', 'kafka'):
+            raise ValueError(f"Unsupported queue type: {queue_type}")
+
+        self.queue_type = queue_type
+        self.prefix = prefix
+        self.params = params
+        self._connection = None
+        # RabbitMQ: zadeklarowane kolejki; Kafka: subskrybowane tematy
+        self._queues = set()
+        # Kafka: wiadomości odebrane z tematów, o które nie pytano w danym pop()
+        self._received = {}
+        self._members = {}
+        self._lock = threading.Lock()
+
+    def _name(self, queue):
+        return f"{self.prefix}.{queue}"
+
+    def _connect(self):
+        """Zwraca połączenie z backendem (tworzone przy pierwszym użyciu)."""
+        if self._connection is not None:
+            return self._connection
+
+        if self.queue_type == 'redis':
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("Redis broker requires 'redis' package. Install with: pip install redis")
+            self._connection = redis.Redis(host=self.params.get('host', 'localhost'),
+                                           port=self.params.get('port', 6379),
+                                           db=self.params.get('db', 0))
+
+        elif self.queue_type == 'rabbitmq':
+            try:
+                import pika
+            except ImportError:
+                raise ImportError("RabbitMQ broker requires 'pika' package. Install with: pip install pika")
+            connection = pika.BlockingConnection(pika.ConnectionParameters(host=self.params.get('host', 'localhost')))
+            self._connection = (connection, connection.channel())
+
+        else:
+            try:
+                from kafka import KafkaConsumer, KafkaProducer
+            except ImportError:
+                raise ImportError("Kafka broker requires 'kafka-python' package. Install with: pip install kafka-python")
+            servers = self.params.get('bootstrap_servers', 'localhost:9092')
+            self._connection = (
+                KafkaProducer(bootstrap_servers=servers),
+                KafkaConsumer(bootstrap_servers=servers, group_id=self.params.get('group_id', self.prefix),
+                              auto_offset_reset='earliest')
+            )
+
+        self._queues = set()
+        return self._connection
+
+    def _disconnect(self):
+        """Zamyka połączenie (kolejne wywołanie połączy się ponownie)."""
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+
+        try:
+            if self.queue_type == 'redis':
+                connection.close()
+            elif self.queue_type == 'rabbitmq':
+                connection[0].close()
+            else:
+                connection[0].close()
+                connection[1].close()
+        except Exception:
+            pass
+
+    def _declare(self, channel, name):
+        if name not in self._queues:
+            channel.queue_declare(queue=name, durable=self.params.get('durable', True))
+            self._queues.add(name)
+
+    def _publish(self, name, body):
+        if self.queue_type == 'redis':
+            self._connect().rpush(name, body)
+        elif self.queue_type == 'rabbitmq':
+            _, channel = self._connect()
+            self._declare(channel, name)
+            channel.basic_publish(exchange='', routing_key=name, body=body)
+        else:
+            producer, _ = self._connect()
+            producer.send(name, body)
+            producer.flush()
+
+    def _receive(self, name):
+        """Pobiera wiadomość z kolejki bez czekania (None - kolejka pusta)."""
+        if self.queue_type == 'redis':
+            return self._connect().lpop(name)
+
+        if self.queue_type == 'rabbitmq':
+            _, channel = self._connect()
+            self._declare(channel, name)
+            method_frame, _, body = channel.basic_get(queue=name, auto_ack=True)
+            return body if method_frame else None
+
+        _, consumer = self._connect()
+        if name not in self._queues:
+            self._queues.add(name)
+            consumer.subscribe(sorted(self._queues))
+
+        if not self._received.get(name):
+            for partition, records in consumer.poll(timeout_ms=0).items():
+                self._received.setdefault(partition.topic, deque()).extend(record.value for record in records)
+
+        messages = self._received.get(name)
+        return messages.popleft() if messages else None
+
+    def _with_connection(self, operation, *args):
+        with self._lock:
+            try:
+                return operation(*args)
+            except ImportError:
+                raise
+            except Exception:
+                # Zerwane połączenie - kolejne wywołanie połączy się ponownie
+                self._disconnect()
+                raise
+
+    def push(self, queue, message):
+        body = json.dumps({'data': base64.b64encode(message).decode('ascii')})
+        self._with_connection(self._publish, self._name(queue), body)
+
+    def pop(self, queues, timeout=None):
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        while True:
+            for queue in queues:
+                body = self._with_connection(self._receive, self._name(queue))
+                if body is not None:
+                    return base64.b64decode(json.loads(body)['data'])
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(POLL_INTERVAL)
+
+    def announce(self, worker_id, info, ttl=WORKER_TTL):
+        self.push('workers', json.dumps([worker_id, info, time.time() + ttl]).encode('utf-8'))
+
+    def withdraw(self, worker_id):
+        self.announce(worker_id, None, 0)
+
+    def members(self):
+        while True:
+            message = self.pop(['workers'], timeout=0)
+            if message is None:
+                break
+            worker_id, info, expires = json.loads(message)
+            with self._lock:
+                self._members[worker_id] = (expires, info)
+
+        now = time.time()
+        with self._lock:
+            return {worker_id: info for worker_id, (expires, info) in self._members.items()
+                    if expires > now and info is not None}
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+
+def broker_from_url(url, secret=None):
+    """
+    Tworzy broker z adresu (memory://, tcp://, redis://, rabbitmq://, kafka://).
+
+    secret - wspólny sekret uwierzytelniający klienta brokera TCP (domyślnie BROKER_SECRET).
+
+    Raises:
+        ValueError: Nieobsługiwany schemat adresu
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme
+
+    if scheme == 'memory':
+        return InProcessBroker()
+    if scheme == 'tcp':
+        return TcpBroker(parsed.hostname or '127.0.0.1', parsed.port or DEFAULT_BROKER_PORT, secret)
+    if scheme == 'redis':
+        db = int(parsed.path.strip('/') or 0)
+        return RedisBroker(parsed.hostname or 'localhost', parsed.port or 6379, db)
+    if scheme == 'rabbitmq':
+        return MessageQueueBroker('rabbitmq', host=parsed.hostname or 'localhost')
+    if scheme == 'kafka':
+        return MessageQueueBroker('kafka', bootstrap_servers=parsed.netloc or 'localhost:9092')
+
+    raise ValueError(f"Unsupported broker URL: {url}")
+
+
+def _execute_adapter(adapter_name, methods, input_data):
+    """Konfiguruje i wykonuje adapter z puli węzła."""
+    with ADAPTER_POOL.adapter(adapter_name) as adapter:
+        for method_name, method_value in methods:
+            getattr(adapter, method_name)(method_value)
+
+        return adapter.execute(input_data)
+
+
+class Worker:
+    """Węzeł roboczy wykonujący kroki z kolejek brokera."""
+
+    def __init__(self, broker, worker_id=None, capacity=None, locality=(), secret=None):
+        """
+        Inicjalizacja węzła.
+
+        Args:
+            broker: Broker (Broker)
+            worker_id: Identyfikator węzła (domyślnie host, PID i losowy sufiks)
+            capacity: Liczba kroków wykonywanych równolegle (domyślnie liczba rdzeni)
+            locality: Znaczniki lokalności węzła (nazwa hosta jest dodawana zawsze)
+            secret: Wspólny sekret podpisów wiadomości (domyślnie BROKER_SECRET)
+        """
+        self.broker = broker
+        self.secret = secret if secret is not None else default_secret()
+        self.worker_id = worker_id or _node_id()
+        self.capacity = max(1, int(capacity or os.cpu_count() or 1))
+        self.locality = sorted(set(locality) | {socket.gethostname()})
+        self.running = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def info(self):
+        """Zwraca ogłoszenie węzła."""
+        return {
+            'capacity': self.capacity,
+            'running': self.running,
+            'completed': self.completed,
+            'locality': self.locality
+        }
+
+    def start(self):
+        """Uruchamia wątki wykonujące kroki i ogłaszanie węzła."""
+        self._stop.clear()
+        self.broker.announce(self.worker_id, self.info())
+
+        targets = [self._serve] * self.capacity + [self._heartbeat]
+        for index, target in enumerate(targets):
+            thread = threading.Thread(target=target, name=f"worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        return self
+
+    def stop(self, timeout=None):
+        """Zatrzymuje węzeł (trwające kroki są dokańczane)."""
+        self._stop.set()
+        try:
+            self.broker.withdraw(self.worker_id)
+        except Exception as e:
+            print(f"Error withdrawing worker {self.worker_id}: {e}")
+
+        threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def run(self):
+        """Uruchamia węzeł i działa do przerwania (Ctrl+C)."""
+        self.start()
+        print(f"Worker {self.worker_id} started (capacity {self.capacity}, locality {self.locality})")
+
+        try:
+            while not self._stop.wait(POLL_TIMEOUT):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _heartbeat(self):
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            try:
+                self.broker.announce(self.worker_id, self.info())
+            except Exception as e:
+                # Chwilowa niedostępność brokera nie zatrzymuje węzła
+                print(f"Error announcing worker {self.worker_id}: {e}")
+
+    def _serve(self):
+        # Najpierw kroki przypisane do węzła, potem kolejka wspólna
+        queues = [worker_queue(self.worker_id), SHARED_TASK_QUEUE]
+
+        while not self._stop.is_set():
+            try:
+                message = self.broker.pop(queues, timeout=POLL_TIMEOUT)
+            except Exception as e:
+                print(f"Error receiving task on worker {self.worker_id}: {e}")
+                self._stop.wait(POLL_TIMEOUT)
+                continue
+
+            if message is None:
+                continue
+
+            try:
+                self._run_task(decode(message, self.secret))
+            except Exception as e:
+                # Wiadomość bez poprawnego podpisu lub uszkodzona - bez identyfikatora nie ma komu odpowiedzieć
+                print(f"Error processing task on worker {self.worker_id}: {e}")
+
+    def _run_task(self, task):
+        """Wykonuje krok i odsyła wynik do kolejki odpowiedzi koordynatora."""
+        reply = {'task_id': task['task_id'], 'worker': self.worker_id}
+        token = CancellationToken(task.get('timeout'))
+
+        with self._lock:
+            self.running += 1
+
+        try:
+            with use_token(token):
+                reply['output'] = _execute_adapter(task['adapter'], task['methods'], task['input'])
+        except Exception as e:
+            reply['error'] = str(e)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+        try:
+            data = encode(reply, self.secret)
+        except Exception as e:
+            data = encode({'task_id': task['task_id'], 'worker': self.worker_id,
+                           'error': f"Cannot serialize step output: {e}"}, self.secret)
+
+        try:
+            self.broker.push(task['reply_to'], data)
+        except Exception as e:
+            print(f"Error sending result of task {task['task_id']}: {e}")
+
+
+class RemoteStepExecutor:
+    """
+    Koordynator: rozsyła kroki do węzłów roboczych i zbiera ich wyniki.
+    """
+
+    def __init__(self, broker, coordinator_id=None, secret=None):
+        """
+        Inicjalizacja koordynatora.
+
+        Args:
+            broker: Broker (Broker)
+            coordinator_id: Identyfikator koordynatora (nazwa jego kolejki odpowiedzi)
+            secret: Wspólny sekret podpisów wiadomości (domyślnie BROKER_SECRET)
+        """
+        self.broker = broker
+        self.secret = secret if secret is not None else default_secret()
+        self.coordinator_id = coordinator_id or _node_id()
+        self.reply_queue = f"results.{self.coordinator_id}"
+        # Kroki czekające na wynik: task_id -> (Future, worker_id lub None)
+        self._pending = {}
+        # Kroki wysłane do węzła i jeszcze niezakończone: worker_id -> liczba
+        self._assigned = {}
+        self._members = {}
+        self._members_at = None
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def workers(self):
+        """Zwraca żywe węzły z brokera (odświeżane najwyżej co pół odstępu ogłoszeń)."""
+        now = time.monotonic()
+        if self._members_at is None or now - self._members_at >= HEARTBEAT_INTERVAL / 2:
+            self._members = self.broker.members()
+            self._members_at = now
+        return self._members
+
+    def place(self, locality=None, members=None):
+        """
+        Wybiera węzeł dla kroku.
+
+        Spośród węzłów z wszystkimi znacznikami 'locality' wybierany jest najmniej
+        obciążony (wykonywane kroki względem pojemności). Krok bez wymagań
+        lokalności, dla którego nie ma wolnego węzła, trafia do kolejki wspólnej.
+
+        Args:
+            locality: Wymagane znaczniki lokalności węzła (tekst lub lista)
+            members: Żywe węzły {worker_id: info} (domyślnie workers())
+
+        Returns:
+            str: Identyfikator węzła lub None (kolejka wspólna)
+
+        Raises:
+            RuntimeError: Brak żywych węzłów lub żaden nie spełnia wymagań lokalności
+        """
+        if members is None:
+            members = self.workers()
+        if not members:
+            raise RuntimeError("No live workers")
+
+        required = _as_tags(locality)
+        candidates = {
+            worker_id: info for worker_id, info in members.items()
+            if required <= set(info.get('locality', ()))
+        }
+
+        if not candidates:
+            raise RuntimeError(f"No live worker with locality {sorted(required)}")
+
+        def load(worker_id):
+            info = candidates[worker_id]
+            # Ogłoszenie może nie uwzględniać kroków wysłanych od ostatniego ogłoszenia
+            running = max(info.get('running', 0), self._assigned.get(worker_id, 0))
+            return running / max(1, info.get('capacity', 1))
+
+        worker_id = min(candidates, key=load)
+        if load(worker_id) >= 1 and not required:
+            return None
+        return worker_id
+
+    def submit(self, adapter_name, methods, input_data=None, locality=None, timeout=None):
+        """
+        Wysyła krok do węzła roboczego.
+
+        Args:
+            adapter_name: Nazwa adaptera
+            methods: Lista par (nazwa metody, wartość)
+            input_data: Dane wejściowe (muszą dać się zserializować przez pickle)
+            locality: Wymagane znaczniki lokalności węzła (tekst lub lista)
+            timeout: Limit czasu wykonania kroku na węźle (w sekundach)
+
+        Returns:
+            concurrent.futures.Future: Przyszły wynik wykonania
+
+        Raises:
+            RuntimeError: Brak żywych węzłów (lub węzłów spełniających wymagania lokalności)
+        """
+        self._start()
+
+        task_id = f"{self.coordinator_id}-{next(self._sequence)}"
+        future = Future()
+
+        # Odczyt węzłów z brokera (operacja sieciowa) poza blokadą
+        members = self.workers()
+
+        with self._lock:
+            worker_id = self.place(locality, members)
+            self._pending[task_id] = (future, worker_id)
+            if worker_id is not None:
+                self._assigned[worker_id] = self._assigned.get(worker_id, 0) + 1
+
+        # Anulowanie lub zakończenie zwalnia miejsce węzła
+        future.add_done_callback(lambda _, task_id=task_id: self._forget(task_id))
+
+        task = {
+            'task_id': task_id,
+            'reply_to': self.reply_queue,
+            'adapter': adapter_name,
+            'methods': list(methods),
+            'input': input_data,
+            'timeout': timeout
+        }
+
+        try:
+            self.broker.push(worker_queue(worker_id) if worker_id is not None else SHARED_TASK_QUEUE,
+                             encode(task, self.secret))
+        except Exception as e:
+            future.set_exception(e)
+
+        return future
+
+    def _forget(self, task_id):
+        with self._lock:
+            entry = self._pending.pop(task_id, None)
+            if entry is not None and entry[1] is not None:
+                worker_id = entry[1]
+                self._assigned[worker_id] -= 1
+                if not self._assigned[worker_id]:
+                    del self._assigned[worker_id]
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._collect, name='remote-results', daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        """Odbiera wyniki kroków i kończy kroki węzłów, które przestały się ogłaszać."""
+        checked_at = time.monotonic()
+
+        while not self._stop.is_set():
+            try:
+                message = self.broker.pop([self.reply_queue], timeout=POLL_TIMEOUT)
+            except Exception as e:
+                print(f"Error receiving step results: {e}")
+                self._stop.wait(POLL_TIMEOUT)
+                continue
+
+            if message is not None:
+                try:
+                    self._complete(decode(message, self.secret))
+                except Exception as e:
+                    print(f"Error processing step result: {e}")
+
+            if time.monotonic() - checked_at >= HEARTBEAT_INTERVAL:
+                checked_at = time.monotonic()
+                self._fail_lost_tasks()
+
+    def _complete(self, reply):
+        with self._lock:
+            entry = self._pending.get(reply['task_id'])
+
+        # Wynik kroku anulowanego lub po terminie - nikt na niego nie czeka
+        if entry is None or entry[0].done():
+            return
+
+        future = entry[0]
+        try:
+            if 'error' in reply:
+                future.set_exception(RuntimeError(f"{reply['error']} (worker {reply['worker']})"))
+            else:
+                future.set_result(reply['output'])
+        except Exception:
+            # Future anulowany między sprawdzeniem a ustawieniem wyniku
+            pass
+
+    def _fail_lost_tasks(self):
+        """
+        Kończy błędem kroki przypisane do węzłów, które przestały się ogłaszać,
+        oraz kroki z kolejki wspólnej, gdy nie ogłasza się już żaden węzeł.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            pending = list(self._pending.values())
+
+        try:
+            members = self.broker.members()
+        except Exception:
+            return
+
+        for future, worker_id in pending:
+            if worker_id is not None:
+                lost, error = worker_id not in members, f"Worker {worker_id} stopped responding"
+            else:
+                lost, error = not members, "No live workers"
+
+            if lost and not future.done():
+                try:
+                    future.set_exception(RuntimeError(error))
+                except Exception:
+                    pass
+
+    def shutdown(self, wait=True):
+        """Zatrzymuje odbiór wyników (czekające kroki kończą się błędem)."""
+        self._stop.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+        with self._lock:
+            futures = [future for future, _ in self._pending.values()]
+        for future in futures:
+            if not future.done():
+                try:
+                    future.set_exception(RuntimeError("Remote executor shut down"))
+                except Exception:
+                    pass
+
+
+def main(argv=None):
+    """Uruchamia serwer brokera TCP lub węzeł roboczy."""
+    parser = argparse.ArgumentParser(description='Distributed workflow step execution')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    broker_parser = commands.add_parser('broker', help='Run a local TCP broker')
+    broker_parser.add_argument('--host', default='127.0.0.1',
+                               help=f'Listen address (other than loopback requires {SECRET_ENV})')
+    broker_parser.add_argument('--port', type=int, default=DEFAULT_BROKER_PORT)
+
+    worker_parser = commands.add_parser('worker', help='Run a worker node')
+    worker_parser.add_argument('--broker', default=f"tcp://127.0.0.1:{DEFAULT_BROKER_PORT}",
+                               help='Broker URL (tcp://, redis://, rabbitmq://, kafka://)')
+    worker_parser.add_argument('--capacity', type=int, default=None, help='Steps executed in parallel')
+    worker_parser.add_argument('--locality', action='append', default=[], help='Locality tag (repeatable)')
+    worker_parser.add_argument('--id', dest='worker_id', default=None, help='Worker ID')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'broker':
+        try:
+            server = BrokerServer(args.host, args.port)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Broker listening on {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    else:
+        Worker(broker_from_url(args.broker), args.worker_id, args.capacity, args.locality).run()
+
+
+if __name__ == '__main__':
+    main()
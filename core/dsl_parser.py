@@ -34,12 +34,50 @@ class DotNotationParser:
             # Jeśli nie można sparsować jako literał, zwróć jako string
             return arg_str
 
+    @staticmethod
+    def split_segments(methods_str):
+        """
+        Dzieli wyrażenie po kropkach na segmenty, np. 'metoda(argumenty)'.
+
+        Kropki i nawiasy wewnątrz napisów oraz zagnieżdżonych nawiasów są pomijane.
+        """
+        segments = []
+        current = ""
+        depth = 0
+        quote = None
+
+        for char in methods_str:
+            if quote:
+                current += char
+                if char == quote and not current.endswith('\\' + quote):
+                    quote = None
+            elif char in ('"', "'"):
+                quote = char
+                current += char
+            elif char in '([{':
+                depth += 1
+                current += char
+            elif char in ')]}':
+                depth -= 1
+                current += char
+            elif char == '.' and depth == 0:
+                if current.strip():
+                    segments.append(current.strip())
+                current = ""
+            else:
+                current += char
+
+        if current.strip():
+            segments.append(current.strip())
+
+        return segments
+
     @staticmethod
     def parse(expression):
         """Parsuje wyrażenie w notacji kropkowej."""
         # Regex dla wyrażenia: adapter.method(arg).method2(arg2)
-        adapter_pattern = r'([a-zA-Z0-9_-]+)(?:\.(.*?))?'
-        adapter_match = re.match(adapter_pattern, expression)
+        adapter_pattern = r'\s*([a-zA-Z0-9_-]+)(?:\.(.*))?$'
+        adapter_match = re.match(adapter_pattern, expression, re.DOTALL)
 
         if not adapter_match:
             raise ValueError(f"Invalid syntax: {expression}")
@@ -53,12 +91,15 @@ class DotNotationParser:
                 'methods': []
             }
 
-        # Regex dla metod: method1('arg1').method2(arg2)
-        method_pattern = r'([a-zA-Z0-9_-]+)\s*\(([^)]*)\)'
-        method_matches = re.finditer(method_pattern, adapter_match.group(2))
+        # Regex dla pojedynczej metody: method1('arg1')
+        method_pattern = r'([a-zA-Z0-9_-]+)\s*\((.*)\)$'
 
         methods = []
-        for match in method_matches:
+        for segment in DotNotationParser.split_segments(adapter_match.group(2)):
+            match = re.match(method_pattern, segment, re.DOTALL)
+            if not match:
+                raise ValueError(f"Invalid method call '{segment}' in: {expression}")
+
             method_name = match.group(1)
             arg_str = match.group(2).strip()
 
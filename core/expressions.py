@@ -0,0 +1,393 @@
+# Język wyrażeń warunków
+"""
+expressions.py
+"""
+
+"""
+Bezpieczny język wyrażeń dla warunków workflow i adaptera conditional.
+
+Wyrażenie jest parsowane raz do drzewa domknięć (funkcji przyjmujących
+kontekst) i przechowywane w pamięci podręcznej. Obsługiwane są:
+- literały: liczby, teksty, True/False/None (także true/false/null), listy [...]
+- ścieżki: inputs.name, steps.fetch.output.0, x['klucz'], ${inputs.name}
+- porównania: == != < <= > >= in, not in, is, is not (także łańcuchowe)
+- operatory logiczne: and, or, not
+- wybrane funkcje (len, int, ...) i metody (startswith, lower, get, ...)
+
+Nie ma dostępu do atrybutów obiektów ani do dowolnego kodu Pythona.
+Teksty zawierające ${...} są interpolowane jak szablony workflow.
+"""
+
+import ast
+import operator
+import re
+from functools import lru_cache
+from .templates import compile_template, TEMPLATE_CACHE_SIZE
+
+# Tokeny: liczby, teksty w cudzysłowach, nazwy i operatory
+TOKEN_PATTERN = re.compile(r"""
+    (?:
+        (?P<num>\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)
+      | (?P<str>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<op>==|!=|<=|>=|\$\{|[<>()\[\],.}-])
+    )""", re.VERBOSE)
+
+# Indeks po kropce (np. output.0.name) - bez części ułamkowej
+INDEX_PATTERN = re.compile(r'\d+')
+
+WHITESPACE_PATTERN = re.compile(r'\s*')
+
+# Słowa kluczowe będące literałami
+CONSTANTS = {
+    'True': True, 'False': False, 'None': None,
+    'true': True, 'false': False, 'null': None
+}
+
+KEYWORDS = {'and', 'or', 'not', 'in', 'is'}
+
+# Dozwolone funkcje
+FUNCTIONS = {
+    'len': len, 'str': str, 'int': int, 'float': float, 'bool': bool,
+    'abs': abs, 'min': min, 'max': max, 'any': any, 'all': all
+}
+
+# Dozwolone metody wartości (tekstów, słowników, list)
+METHODS = {
+    'startswith', 'endswith', 'lower', 'upper', 'strip', 'lstrip', 'rstrip',
+    'split', 'replace', 'find', 'count', 'isdigit', 'isalpha',
+    'get', 'keys', 'values', 'items', 'index'
+}
+
+COMPARISONS = {
+    '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le,
+    '>': operator.gt, '>=': operator.ge,
+    'in': lambda a, b: a in b,
+    'not in': lambda a, b: a not in b,
+    'is': operator.is_,
+    'is not': operator.is_not
+}
+
+
+class ExpressionError(ValueError):
+    """Błąd składni lub wykonania wyrażenia."""
+
+
+def _tokenize(text):
+    """Dzieli wyrażenie na tokeny (rodzaj, wartość)."""
+    tokens = []
+    position = 0
+    length = len(text)
+
+    while True:
+        position = WHITESPACE_PATTERN.match(text, position).end()
+        if position >= length:
+            break
+
+        # Po kropce liczba jest indeksem ścieżki, a nie liczbą zmiennoprzecinkową
+        if tokens and tokens[-1] == ('op', '.'):
+            match = INDEX_PATTERN.match(text, position)
+            if match:
+                tokens.append(('index', int(match.group())))
+                position = match.end()
+                continue
+
+        match = TOKEN_PATTERN.match(text, position)
+        if not match:
+            raise ExpressionError(f"Unexpected character at position {position}: {text[position:position + 10]!r}")
+
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+
+    tokens.append(('end', None))
+    return tokens
+
+
+def _get_attribute(value, name):
+    """Zwraca klucz słownika lub dozwoloną metodę wartości."""
+    if isinstance(value, dict) and name in value:
+        return value[name]
+
+    if name in METHODS and hasattr(value, name):
+        return getattr(value, name)
+
+    raise ExpressionError(f"Cannot resolve attribute: {name}")
+
+
+def _get_item(value, key):
+    """Zwraca element słownika, listy lub tekstu."""
+    if isinstance(value, (dict, list, tuple, str)):
+        try:
+            return value[key]
+        except (KeyError, IndexError, TypeError):
+            pass
+
+    raise ExpressionError(f"Cannot resolve item: {key!r}")
+
+
+class _Parser:
+    """Parser zstępujący budujący domknięcia f(context)."""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def parse(self):
+        node = self._or()
+        if self._peek()[0] != 'end':
+            raise ExpressionError(f"Unexpected token {self._peek()[1]!r} in expression: {self.text}")
+        return node
+
+    def _peek(self):
+        return self.tokens[self.position]
+
+    def _next(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def _accept(self, kind, value=None):
+        token = self._peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.position += 1
+            return token
+        return None
+
+    def _expect(self, kind, value=None):
+        token = self._accept(kind, value)
+        if token is None:
+            found = self._peek()[1]
+            raise ExpressionError(f"Expected {value or kind!r}, found {found!r} in expression: {self.text}")
+        return token
+
+    def _or(self):
+        operands = [self._and()]
+        while self._accept('name', 'or'):
+            operands.append(self._and())
+
+        if len(operands) == 1:
+            return operands[0]
+
+        def evaluate_or(context):
+            value = None
+            for operand in operands:
+                value = operand(context)
+                if value:
+                    return value
+            return value
+
+        return evaluate_or
+
+    def _and(self):
+        operands = [self._not()]
+        while self._accept('name', 'and'):
+            operands.append(self._not())
+
+        if len(operands) == 1:
+            return operands[0]
+
+        def evaluate_and(context):
+            value = None
+            for operand in operands:
+                value = operand(context)
+                if not value:
+                    return value
+            return value
+
+        return evaluate_and
+
+    def _not(self):
+        if self._accept('name', 'not'):
+            operand = self._not()
+            return lambda context: not operand(context)
+
+        return self._comparison()
+
+    def _comparison_operator(self):
+        token = self._peek()
+
+        if token[0] == 'op' and token[1] in ('==', '!=', '<', '<=', '>', '>='):
+            self._next()
+            return token[1]
+
+        if token == ('name', 'in'):
+            self._next()
+            return 'in'
+
+        if token == ('name', 'not') and self.tokens[self.position + 1] == ('name', 'in'):
+            self.position += 2
+            return 'not in'
+
+        if token == ('name', 'is'):
+            self._next()
+            return 'is not' if self._accept('name', 'not') else 'is'
+
+        return None
+
+    def _comparison(self):
+        left = self._unary()
+        pairs = []
+
+        while True:
+            name = self._comparison_operator()
+            if name is None:
+                break
+            pairs.append((COMPARISONS[name], self._unary()))
+
+        if not pairs:
+            return left
+
+        def evaluate_comparison(context):
+            # Porównania łańcuchowe jak w Pythonie: a < b < c
+            current = left(context)
+            for compare, operand in pairs:
+                value = operand(context)
+                if not compare(current, value):
+                    return False
+                current = value
+            return True
+
+        return evaluate_comparison
+
+    def _unary(self):
+        if self._accept('op', '-'):
+            operand = self._unary()
+            return lambda context: -operand(context)
+
+        return self._postfix()
+
+    def _postfix(self):
+        node, function_name = self._primary()
+
+        while True:
+            if self._accept('op', '.'):
+                token = self._next()
+                if token[0] == 'index':
+                    node = self._item_node(node, lambda context, key=token[1]: key)
+                elif token[0] == 'name' and token[1] not in KEYWORDS:
+                    if self._accept('op', '('):
+                        node = self._method_node(node, token[1], self._arguments())
+                    else:
+                        node = self._attribute_node(node, token[1])
+                else:
+                    raise ExpressionError(f"Invalid path segment {token[1]!r} in expression: {self.text}")
+            elif self._accept('op', '['):
+                key = self._or()
+                self._expect('op', ']')
+                node = self._item_node(node, key)
+            elif function_name and self._accept('op', '('):
+                node = self._function_node(function_name, self._arguments())
+            else:
+                return node
+
+            function_name = None
+
+    def _primary(self):
+        """Zwraca (domknięcie, nazwa funkcji jeśli węzeł może być wywołaniem funkcji)."""
+        kind, value = self._next()
+
+        if kind == 'num':
+            number = float(value) if any(c in value for c in '.eE') else int(value)
+            return (lambda context: number), None
+
+        if kind == 'str':
+            text = ast.literal_eval(value)
+            template = compile_template(text)
+            if template.is_static:
+                return (lambda context: text), None
+            return template.render, None
+
+        if kind == 'name' and value in CONSTANTS:
+            constant = CONSTANTS[value]
+            return (lambda context: constant), None
+
+        if kind == 'name' and value not in KEYWORDS:
+            def load_name(context):
+                if value in context:
+                    return context[value]
+                raise ExpressionError(f"Unknown name: {value}")
+
+            return load_name, (value if value in FUNCTIONS else None)
+
+        if kind == 'op' and value == '(':
+            node = self._or()
+            self._expect('op', ')')
+            return node, None
+
+        if kind == 'op' and value == '${':
+            # ${...} to odwołanie w stylu szablonów - zawartość jest zwykłym wyrażeniem
+            node = self._or()
+            self._expect('op', '}')
+            return node, None
+
+        if kind == 'op' and value == '[':
+            items = []
+            if not self._accept('op', ']'):
+                items.append(self._or())
+                while self._accept('op', ','):
+                    if self._peek() == ('op', ']'):
+                        break
+                    items.append(self._or())
+                self._expect('op', ']')
+            return (lambda context: [item(context) for item in items]), None
+
+        raise ExpressionError(f"Unexpected token {value!r} in expression: {self.text}")
+
+    def _arguments(self):
+        arguments = []
+        if self._accept('op', ')'):
+            return arguments
+
+        arguments.append(self._or())
+        while self._accept('op', ','):
+            arguments.append(self._or())
+        self._expect('op', ')')
+        return arguments
+
+    @staticmethod
+    def _attribute_node(node, name):
+        return lambda context: _get_attribute(node(context), name)
+
+    @staticmethod
+    def _item_node(node, key):
+        return lambda context: _get_item(node(context), key(context))
+
+    @staticmethod
+    def _method_node(node, name, arguments):
+        if name not in METHODS:
+            raise ExpressionError(f"Method not allowed: {name}")
+
+        def call_method(context):
+            value = node(context)
+            if not hasattr(value, name):
+                raise ExpressionError(f"Cannot call {name}() on {type(value).__name__}")
+            return getattr(value, name)(*[argument(context) for argument in arguments])
+
+        return call_method
+
+    @staticmethod
+    def _function_node(name, arguments):
+        function = FUNCTIONS[name]
+        return lambda context: function(*[argument(context) for argument in arguments])
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_expression(text):
+    """
+    Kompiluje wyrażenie do funkcji przyjmującej kontekst.
+
+    Args:
+        text: Wyrażenie, np. "${inputs.mode} == 'fast' and len(steps) > 0"
+
+    Returns:
+        callable: Funkcja f(context) zwracająca wartość wyrażenia
+    """
+    return _Parser(text).parse()
+
+
+def evaluate(text, context):
+    """Kompiluje (z pamięci podręcznej) i oblicza wyrażenie w kontekście."""
+    return compile_expression(text)(context)
@@ -0,0 +1,111 @@
+# Odciski danych
+"""
+fingerprint.py
+"""
+
+"""
+Deterministyczne odciski (hashe) wartości przekazywanych między krokami.
+
+Odcisk nie zależy od kolejności kluczy w słownikach, a dane binarne
+(bytes, tablice numpy, obrazy) są hashowane bezpośrednio, bez serializacji do JSON.
+Wartości nieznanych typów nie mają odcisku (Unfingerprintable) - ich repr()
+może być skrócony (np. DataFrame) albo zawierać adres obiektu, więc odcisk
+z repr() łączyłby różne dane lub nigdy się nie powtarzał.
+"""
+
+import datetime
+import decimal
+import hashlib
+import pathlib
+import struct
+import uuid
+
+# Typy, których repr() jednoznacznie i powtarzalnie opisuje wartość
+REPR_TYPES = (complex, decimal.Decimal, datetime.date, datetime.time, datetime.timedelta,
+              uuid.UUID, pathlib.PurePath)
+
+
+class Unfingerprintable(TypeError):
+    """Wartości nie da się jednoznacznie odcisnąć."""
+
+
+def _update(hasher, value):
+    """Dopisuje wartość do obiektu hashującego."""
+    if value is None:
+        hasher.update(b'N')
+    elif isinstance(value, bool):
+        hasher.update(b'T' if value else b'F')
+    elif isinstance(value, int):
+        hasher.update(b'i' + str(value).encode() + b';')
+    elif isinstance(value, float):
+        hasher.update(b'f' + struct.pack('<d', value))
+    elif isinstance(value, str):
+        data = value.encode('utf-8', 'surrogatepass')
+        hasher.update(b's' + str(len(data)).encode() + b':')
+        hasher.update(data)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = memoryview(value).cast('B') if isinstance(value, memoryview) else value
+        hasher.update(b'b' + str(len(data)).encode() + b':')
+        hasher.update(data)
+    elif isinstance(value, dict):
+        hasher.update(b'd' + str(len(value)).encode() + b':')
+        # Klucze sortowane po ich odciskach - kolejność wstawiania nie ma znaczenia
+        items = sorted(((fingerprint(k), v) for k, v in value.items()), key=lambda pair: pair[0])
+        for key_digest, item in items:
+            hasher.update(key_digest.encode())
+            _update(hasher, item)
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b'l' + str(len(value)).encode() + b':')
+        for item in value:
+            _update(hasher, item)
+    elif hasattr(value, 'payload_id') and hasattr(value, 'digest'):
+        # Uchwyty dużych danych (core/payloads.py): odcisk zawartości liczony raz na uchwyt
+        hasher.update(b'h' + value.digest().encode())
+    elif isinstance(value, (set, frozenset)):
+        hasher.update(b'S' + str(len(value)).encode() + b':')
+        for item_digest in sorted(fingerprint(item) for item in value):
+            hasher.update(item_digest.encode())
+    elif hasattr(value, 'dtype') and hasattr(value, 'shape') and hasattr(value, 'tobytes'):
+        # Tablice obiektów przechowują wskaźniki, nie dane
+        if getattr(value.dtype, 'hasobject', False):
+            raise Unfingerprintable("Cannot fingerprint array of Python objects")
+        # Tablice numpy: typ, kształt i surowe dane
+        hasher.update(b'a' + str(value.dtype).encode() + str(tuple(value.shape)).encode())
+        hasher.update(value.tobytes())
+    elif hasattr(value, 'mode') and hasattr(value, 'size') and hasattr(value, 'tobytes'):
+        # Obrazy PIL: tryb, rozmiar i piksele
+        hasher.update(b'p' + str(value.mode).encode() + str(tuple(value.size)).encode())
+        hasher.update(value.tobytes())
+    elif isinstance(value, REPR_TYPES):
+        hasher.update(b'r' + type(value).__qualname__.encode() + b':' + repr(value).encode())
+    else:
+        raise Unfingerprintable(f"Cannot fingerprint value of type {type(value).__qualname__}")
+
+
+def fingerprint(*values):
+    """
+    Zwraca odcisk SHA-256 podanych wartości.
+
+    Args:
+        values: Dowolne wartości (słowniki, listy, bytes, tablice numpy, ...)
+
+    Returns:
+        str: Odcisk w postaci szesnastkowej
+
+    Raises:
+        Unfingerprintable: Wartość (lub jej element) nieznanego typu
+    """
+    hasher = hashlib.sha256()
+
+    for value in values:
+        _update(hasher, value)
+
+    return hasher.hexdigest()
+
+
+def fingerprint_or_none(*values):
+    """Zwraca odcisk podanych wartości lub None, jeśli któraś nie ma odcisku."""
+    try:
+        return fingerprint(*values)
+    except Unfingerprintable:
+        return None
@@ -0,0 +1,144 @@
+# Przyrostowe wykonanie workflow
+"""
+incremental.py
+"""
+
+"""
+Stan przyrostowego wykonania workflow (sprawdzanie aktualności w stylu make).
+
+Dla każdego kroku zapisywany jest odcisk: adapter, parametry metod, dane
+wejściowe, odciski kroków nadrzędnych oraz stan (mtime, rozmiar) plików
+zadeklarowanych w 'input_files'. Krok, którego odcisk się nie zmienił, a pliki
+z 'output_files' są nietknięte, nie jest wykonywany ponownie - jego wynik
+jest odczytywany z zapisanego stanu.
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+from .fingerprint import fingerprint_or_none
+
+# Domyślny katalog stanu przyrostowego
+DEFAULT_STATE_DIR = os.path.join('data', 'incremental')
+
+
+def file_state(path):
+    """Zwraca (mtime_ns, rozmiar) pliku lub None, jeśli plik nie istnieje."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class IncrementalState:
+    """Odciski i wyniki kroków jednego workflow, zapisywane między uruchomieniami."""
+
+    def __init__(self, path):
+        """
+        Inicjalizacja stanu.
+
+        Args:
+            path: Ścieżka pliku stanu
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._records = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    self._records = pickle.load(f)
+            except Exception:
+                # Uszkodzony stan oznacza po prostu pełne wykonanie
+                self._records = {}
+
+    @classmethod
+    def for_workflow(cls, workflow_id, state_dir=DEFAULT_STATE_DIR):
+        """Tworzy stan dla workflow o podanym ID."""
+        return cls(os.path.join(state_dir, f"{workflow_id}.pkl"))
+
+    @staticmethod
+    def step_fingerprint(adapter_name, methods, input_data, upstream, input_files=()):
+        """
+        Oblicza odcisk kroku.
+
+        Args:
+            adapter_name: Nazwa adaptera
+            methods: Lista par (metoda, wartość) po interpolacji
+            input_data: Dane wejściowe kroku
+            upstream: Odciski kroków, od których zależy krok
+            input_files: Ścieżki plików wejściowych kroku
+
+        Returns:
+            str: Odcisk kroku lub None (dane bez odcisku - krok jest zawsze wykonywany)
+        """
+        files = [(path, file_state(path)) for path in input_files]
+        return fingerprint_or_none(adapter_name, list(methods), input_data, list(upstream), files)
+
+    def lookup(self, step_id, step_fingerprint):
+        """
+        Sprawdza, czy krok jest aktualny.
+
+        Returns:
+            tuple: (czy aktualny, zapisany wynik)
+        """
+        if step_fingerprint is None:
+            return False, None
+
+        with self._lock:
+            record = self._records.get(step_id)
+
+        if not record or record['fingerprint'] != step_fingerprint:
+            return False, None
+
+        # Pliki wynikowe muszą istnieć i nie mogą być zmienione od ostatniego wykonania
+        for path, state in record['output_files'].items():
+            if file_state(path) != state:
+                return False, None
+
+        return True, pickle.loads(record['output'])
+
+    def record(self, step_id, step_fingerprint, output, output_files=()):
+        """Zapamiętuje odcisk i wynik wykonanego kroku."""
+        if step_fingerprint is None:
+            self.forget(step_id)
+            return
+
+        try:
+            data = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Wyniku nie da się zapisać - krok zawsze będzie wykonywany ponownie
+            self.forget(step_id)
+            return
+
+        with self._lock:
+            self._records[step_id] = {
+                'fingerprint': step_fingerprint,
+                'output': data,
+                'output_files': {path: file_state(path) for path in output_files}
+            }
+
+    def forget(self, step_id):
+        """Usuwa zapis kroku."""
+        with self._lock:
+            self._records.pop(step_id, None)
+
+    def save(self):
+        """Zapisuje stan atomowo (plik tymczasowy + zmiana nazwy)."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._lock:
+            data = pickle.dumps(self._records, protocol=pickle.HIGHEST_PROTOCOL)
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
@@ -0,0 +1,300 @@
+# Kolejka zadań
+"""
+jobs.py
+"""
+
+"""
+Asynchroniczne wykonywanie długich zadań (workflow, pipeline'y) poza wątkiem żądania HTTP.
+
+Zgłoszenie zwraca od razu identyfikator zadania, a zadanie trafia do kolejki
+priorytetowej obsługiwanej przez pulę wątków roboczych. Klient odpytuje stan
+zadania lub czeka na jego zakończenie (wait). Kolejka ma limit oczekujących
+zadań - po jego przekroczeniu submit zgłasza QueueFull, zamiast przyjmować
+pracę, której serwer nie nadąży wykonać.
+
+Zadanie działa z własnym tokenem anulowania (adapters/cancellation.py):
+anulowanie zadania w kolejce usuwa je z kolejki, a anulowanie działającego
+zadania anuluje token, który silniki przekazują krokom i adapterom.
+Zakończone zadania są przechowywane w pamięci (najnowsze max_finished).
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from collections import deque
+from adapters.cancellation import CancellationToken, use_token
+
+# Stany zadania
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+# Stany końcowe - zadanie nie zmieni już stanu
+FINISHED_STATES = frozenset([JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED])
+
+# Domyślna liczba wątków roboczych
+DEFAULT_JOB_WORKERS = 2
+
+# Domyślny limit zadań oczekujących w kolejce
+DEFAULT_MAX_PENDING = 100
+
+# Domyślna liczba przechowywanych zakończonych zadań
+DEFAULT_MAX_FINISHED = 1000
+
+
+class QueueFull(RuntimeError):
+    """Kolejka osiągnęła limit oczekujących zadań."""
+
+
+class Job:
+    """Zadanie w kolejce."""
+
+    def __init__(self, function, args=(), kind='job', priority=0, description=None):
+        """
+        Inicjalizacja zadania.
+
+        Args:
+            function: Funkcja wykonująca zadanie (jej wynik jest wynikiem zadania)
+            args: Argumenty funkcji
+            kind: Rodzaj zadania (np. 'workflow', 'pipeline')
+            priority: Priorytet - zadania o wyższym priorytecie są wykonywane wcześniej
+            description: Opis zadania zwracany w stanie (np. ID workflow)
+        """
+        self.id = uuid.uuid4().hex
+        self.function = function
+        self.args = args
+        self.kind = kind
+        self.priority = priority
+        self.description = description
+        self.status = JOB_QUEUED
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.token = CancellationToken()
+        self._done = threading.Event()
+
+    @property
+    def finished(self):
+        """Czy zadanie zakończyło się (sukcesem, błędem lub anulowaniem)."""
+        return self.status in FINISHED_STATES
+
+    def wait(self, timeout=None):
+        """Czeka na zakończenie zadania najwyżej timeout sekund; zwraca True, jeśli się zakończyło."""
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        """Zwraca stan zadania (wynik tylko dla zakończonych sukcesem)."""
+        job = {
+            'id': self.id,
+            'kind': self.kind,
+            'description': self.description,
+            'priority': self.priority,
+            'status': self.status,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+        if self.status == JOB_COMPLETED:
+            job['result'] = self.result
+        elif self.error is not None:
+            job['error'] = self.error
+
+        return job
+
+
+class JobQueue:
+    """Kolejka priorytetowa zadań z pulą wątków roboczych."""
+
+    def __init__(self, workers=DEFAULT_JOB_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 max_finished=DEFAULT_MAX_FINISHED):
+        """
+        Inicjalizacja kolejki.
+
+        Args:
+            workers: Liczba wątków roboczych (uruchamianych przy pierwszym zgłoszeniu)
+            max_pending: Limit zadań oczekujących w kolejce (None - bez limitu)
+            max_finished: Liczba przechowywanych zakończonych zadań
+        """
+        self.workers = max(1, int(workers))
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        # Kopiec (-priorytet, numer zgłoszenia, zadanie) - przy równym priorytecie kolejność zgłoszeń
+        self._heap = []
+        self._sequence = itertools.count()
+        self._jobs = {}
+        self._finished = deque()
+        self._pending = 0
+        self._running = 0
+        self._threads = []
+        self._stopping = False
+        self._condition = threading.Condition()
+
+    def start(self, workers=None):
+        """Uruchamia wątki robocze (opcjonalnie zmieniając ich liczbę przed startem)."""
+        with self._condition:
+            if workers is not None and not self._threads:
+                self.workers = max(1, int(workers))
+
+            self._stopping = False
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"job-worker-{len(self._threads)}",
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+        return self
+
+    def submit(self, function, *args, kind='job', priority=0, description=None):
+        """
+        Dodaje zadanie do kolejki.
+
+        Returns:
+            Job: Zgłoszone zadanie
+
+        Raises:
+            QueueFull: Gdy w kolejce czeka już max_pending zadań
+        """
+        job = Job(function, args, kind, priority, description)
+
+        with self._condition:
+            if self.max_pending is not None and self._pending >= self.max_pending:
+                raise QueueFull(f"Job queue is full ({self._pending} jobs pending)")
+
+            self._jobs[job.id] = job
+            heapq.heappush(self._heap, (-priority, next(self._sequence), job))
+            self._pending += 1
+            self._condition.notify()
+
+        if not self._threads:
+            self.start()
+
+        return job
+
+    def get(self, job_id):
+        """Zwraca zadanie o podanym ID (None, jeśli nie istnieje lub zostało usunięte)."""
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def jobs(self, status=None):
+        """Zwraca zadania (opcjonalnie tylko w podanym stanie) w kolejności zgłoszeń."""
+        # Migawka pod blokadą - wątki robocze usuwają zakończone zadania ze słownika
+        with self._condition:
+            jobs = list(self._jobs.values())
+
+        jobs.sort(key=lambda job: job.submitted_at)
+        if status is not None:
+            jobs = [job for job in jobs if job.status == status]
+        return jobs
+
+    def wait(self, job_id, timeout=None):
+        """Czeka na zakończenie zadania najwyżej timeout sekund; zwraca zadanie (None, jeśli nie istnieje)."""
+        job = self.get(job_id)
+        if job is not None:
+            job.wait(timeout)
+        return job
+
+    def cancel(self, job_id, reason="Job cancelled"):
+        """
+        Anuluje zadanie: oczekujące jest usuwane z kolejki, działające dostaje anulowany token.
+
+        Returns:
+            Job: Zadanie (None, jeśli nie istnieje)
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+
+            job.token.cancel(reason)
+            if job.status == JOB_QUEUED:
+                # Wpis zostaje w kopcu - wątek roboczy pominie anulowane zadanie
+                self._pending -= 1
+                self._finish(job, JOB_CANCELLED, error=reason)
+
+        return job
+
+    @property
+    def pending(self):
+        """Liczba zadań oczekujących w kolejce."""
+        return self._pending
+
+    @property
+    def running(self):
+        """Liczba wykonywanych zadań."""
+        return self._running
+
+    def shutdown(self, wait=True, cancel_running=False):
+        """Zatrzymuje wątki robocze (oczekujące zadania zostają w kolejce)."""
+        with self._condition:
+            self._stopping = True
+            threads, self._threads = self._threads, []
+            if cancel_running:
+                for job in self._jobs.values():
+                    if job.status == JOB_RUNNING:
+                        job.token.cancel("Job queue shut down")
+            self._condition.notify_all()
+
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _next_job(self):
+        """Pobiera zadanie o najwyższym priorytecie (None przy zatrzymaniu kolejki)."""
+        with self._condition:
+            while True:
+                while self._heap and self._heap[0][2].status != JOB_QUEUED:
+                    heapq.heappop(self._heap)
+
+                if self._stopping:
+                    return None
+
+                if self._heap:
+                    job = heapq.heappop(self._heap)[2]
+                    job.status = JOB_RUNNING
+                    job.started_at = time.time()
+                    self._pending -= 1
+                    self._running += 1
+                    return job
+
+                self._condition.wait()
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+
+            try:
+                with use_token(job.token):
+                    result = job.function(*job.args)
+                status, error = JOB_COMPLETED, None
+            except Exception as e:
+                result = None
+                if job.token.cancelled:
+                    status, error = JOB_CANCELLED, job.token.reason
+                else:
+                    status, error = JOB_FAILED, str(e)
+
+            with self._condition:
+                self._running -= 1
+                self._finish(job, status, result, error)
+
+    def _finish(self, job, status, result=None, error=None):
+        """Oznacza zadanie jako zakończone i usuwa najstarsze zakończone zadania ponad limit."""
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.function = job.args = None
+        job._done.set()
+
+        self._finished.append(job.id)
+        while len(self._finished) > self.max_finished:
+            self._jobs.pop(self._finished.popleft(), None)
@@ -0,0 +1,238 @@
+# Żywotność wyników kroków
+"""
+liveness.py
+"""
+
+"""
+Zwalnianie i zrzucanie na dysk wyników kroków, których nikt już nie przeczyta.
+
+Plan workflow (core/workflow_registry.py) zna czytelników wyniku każdego
+kroku. Gdy zakończy się ostatni z nich, wynik jest usuwany z kontekstu
+(wpis kroku dostaje 'released': true), a jego uchwyty danych zwalniane -
+chyba że wynik jest potrzebny w sekcji 'outputs'. Przy przekroczeniu limitu
+'memory_limit' największe żywe wyniki trafiają do plików pickle i są
+wczytywane przy odczycie. Zużycie pamięci zależy więc od danych żywych,
+a nie od wszystkich danych wyprodukowanych przez workflow.
+
+Workflow włącza mechanizm kluczami:
+
+    release_outputs: true      # zwalniaj wyniki bez czytelników
+    memory_limit: 512MB        # limit żywych wyników w pamięci (zrzut na dysk)
+    spill_dir: data/spill      # katalog zrzutów (domyślnie katalog tymczasowy)
+"""
+
+import os
+import pickle
+import re
+import shutil
+import tempfile
+from .payloads import payload_size
+
+# Jednostki rozmiaru akceptowane w 'memory_limit'
+SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'M': 1024 ** 2, 'MB': 1024 ** 2,
+              'G': 1024 ** 3, 'GB': 1024 ** 3}
+
+# Rozmiar z opcjonalną jednostką, np. 512MB, 1.5 GB
+SIZE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*$', re.IGNORECASE)
+
+
+def parse_size(value):
+    """Zamienia rozmiar (liczba bajtów lub tekst, np. '512MB') na liczbę bajtów."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+
+    match = SIZE_PATTERN.match(str(value))
+    if not match:
+        raise ValueError(f"Invalid size: {value}")
+
+    number, unit = match.groups()
+    return int(float(number) * SIZE_UNITS[unit.upper()])
+
+
+class SpilledRecord(dict):
+    """Wpis kroku z wynikiem zrzuconym na dysk - 'output' jest wczytywany przy każdym odczycie."""
+
+    __slots__ = ('path',)
+
+    def __init__(self, path, record):
+        super().__init__(record)
+        self.path = path
+
+    def load(self):
+        """Wczytuje zrzucony wynik."""
+        with open(self.path, 'rb') as f:
+            return pickle.load(f)
+
+    def __getitem__(self, key):
+        if key == 'output':
+            return self.load()
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        return key == 'output' or super().__contains__(key)
+
+    def get(self, key, default=None):
+        if key == 'output':
+            return self.load()
+        return super().get(key, default)
+
+
+class OutputLiveness:
+    """Śledzi żywe wyniki jednego wykonania workflow."""
+
+    def __init__(self, plan, context, payloads, release=True, memory_limit=None, spill_dir=None,
+                 running=None):
+        """
+        Inicjalizacja.
+
+        Args:
+            plan: Plan workflow (WorkflowPlan)
+            context: Kontekst wykonania (wpisy kroków w context['steps'])
+            payloads: Magazyn uchwytów danych (PayloadStore)
+            release: Czy zwalniać wyniki bez czytelników
+            memory_limit: Limit rozmiaru żywych wyników w pamięci (bajty) lub None
+            spill_dir: Katalog zrzutów (None - katalog tymczasowy)
+            running: Funkcja zwracająca ID kroków zleconych i jeszcze niezakończonych
+        """
+        self.plan = plan
+        self.context = context
+        self.payloads = payloads
+        self.release = release
+        self.memory_limit = memory_limit
+        self.spill_root = spill_dir
+        self._spill_dir = None
+        self._running = running or (lambda: ())
+        self._readers = dict(plan.readers)
+        self._finished = set()
+        # Rozmiary wyników trzymanych w pamięci: step_id -> bajty
+        self._live = {}
+        self.live_bytes = 0
+        self.peak_bytes = 0
+        self.released = 0
+        self.spilled = 0
+
+        # Kroki zakończone przed wznowieniem wykonania
+        for step_id in list(context['steps']):
+            if step_id in plan.steps_by_id:
+                self.step_finished(step_id)
+
+    @classmethod
+    def for_workflow(cls, workflow, plan, context, payloads, running=None):
+        """Tworzy obiekt śledzący, jeśli workflow włącza 'release_outputs' lub 'memory_limit' (w przeciwnym razie None)."""
+        release = bool(workflow.get('release_outputs', False))
+        memory_limit = parse_size(workflow.get('memory_limit'))
+
+        if not release and memory_limit is None:
+            return None
+
+        return cls(plan, context, payloads, release, memory_limit, workflow.get('spill_dir'), running)
+
+    def step_finished(self, step_id):
+        """Rejestruje zakończenie kroku: zapamiętuje jego wynik i zwalnia wyniki, których już nikt nie przeczyta."""
+        self._finished.add(step_id)
+
+        record = self.context['steps'].get(step_id)
+        if record is not None and not isinstance(record, SpilledRecord) and 'output' in record:
+            size = payload_size(record['output'])
+            self._live[step_id] = size
+            self.live_bytes += size
+
+        for source in self.plan.reads.get(step_id, ()):
+            self._readers[source] -= 1
+            self._release_if_dead(source)
+
+        self._release_if_dead(step_id)
+
+        if self.memory_limit is not None and self.live_bytes > self.memory_limit:
+            self._spill()
+
+        # Szczyt po zwolnieniu i zrzucie - wyniki zrzucane na dysk nie są liczone
+        self.peak_bytes = max(self.peak_bytes, self.live_bytes)
+
+    def _release_if_dead(self, step_id):
+        if (self.release and step_id in self._finished and self._readers.get(step_id, 0) <= 0
+                and step_id not in self.plan.retained):
+            self._drop(step_id)
+
+    def _drop(self, step_id):
+        """Usuwa wynik kroku z kontekstu i zwalnia jego uchwyty."""
+        record = self.context['steps'].get(step_id)
+        if record is None or record.get('released') or 'output' not in record:
+            return
+
+        if isinstance(record, SpilledRecord):
+            os.unlink(record.path)
+            output = None
+        else:
+            output = record['output']
+
+        released = {key: value for key, value in dict.items(record) if key != 'output'}
+        released['released'] = True
+        self.context['steps'][step_id] = released
+
+        self.payloads.discard(output)
+        self.live_bytes -= self._live.pop(step_id, 0)
+        self.released += 1
+
+    def _spill(self):
+        """Zrzuca na dysk największe wyniki w pamięci, aż ich rozmiar spadnie poniżej limitu."""
+        # Wyniki czytane przez kroki zlecone (także czekające w kolejce puli) muszą zostać w pamięci
+        in_use = set()
+        for step_id in self._running():
+            in_use.update(self.plan.reads.get(step_id, ()))
+
+        for step_id in sorted(self._live, key=self._live.get, reverse=True):
+            if self.live_bytes <= self.memory_limit:
+                break
+            if step_id not in in_use and self._live[step_id] > 0:
+                self._spill_step(step_id)
+
+    def _spill_step(self, step_id):
+        record = self.context['steps'][step_id]
+        output = record['output']
+
+        if self._spill_dir is None:
+            if self.spill_root:
+                os.makedirs(self.spill_root, exist_ok=True)
+            self._spill_dir = tempfile.mkdtemp(prefix=f"{self.context['run_id']}-", dir=self.spill_root)
+
+        path = os.path.join(self._spill_dir, f"{self.spilled}.pkl")
+        with open(path, 'wb') as f:
+            # Uchwyty danych są serializowane jako same dane
+            pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.context['steps'][step_id] = SpilledRecord(
+            path, {key: value for key, value in record.items() if key != 'output'}
+        )
+
+        self.payloads.discard(output)
+        self.live_bytes -= self._live.pop(step_id)
+        self.spilled += 1
+
+    def close(self):
+        """
+        Kończy śledzenie: zrzucone wyniki potrzebne w 'outputs' (lub wszystkie, gdy
+        'release_outputs' jest wyłączone) wracają do pamięci, pozostałe są zwalniane,
+        a katalog zrzutów usuwany.
+
+        Returns:
+            dict: Statystyki {'peak_bytes', 'released', 'spilled'}
+        """
+        steps = self.context['steps']
+        for step_id, record in list(steps.items()):
+            if not isinstance(record, SpilledRecord):
+                continue
+
+            restored = dict(record)
+            if step_id in self.plan.retained or not self.release:
+                restored['output'] = record.load()
+            else:
+                restored['released'] = True
+                self.released += 1
+            steps[step_id] = restored
+
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+        return {'peak_bytes': self.peak_bytes, 'released': self.released, 'spilled': self.spilled}
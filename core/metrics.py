@@ -0,0 +1,306 @@
+# Metryki operacyjne
+"""
+metrics.py
+"""
+
+"""
+Liczniki, wskaźniki i histogramy w formacie tekstowym Prometheusa.
+
+Każdy wątek zapisuje wartości we własnym fragmencie (shard), więc
+rejestrowanie metryk na gorącej ścieżce nie bierze żadnej blokady.
+Fragmenty są sumowane dopiero przy odczycie (/metrics). Fragmenty
+zakończonych wątków są scalane, żeby serwer tworzący wątek na każde
+żądanie nie gromadził ich bez końca.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Domyślne granice koszyków histogramów czasu (w sekundach)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Typ zawartości odpowiedzi /metrics
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _label_key(labels):
+    """Zwraca niezmienny klucz zestawu etykiet."""
+    if not labels:
+        return ()
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(label_key, extra=None):
+    pairs = list(label_key)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value)
+
+
+class _Metric:
+    """Wspólna część metryk zapisywanych we fragmentach wątków."""
+
+    kind = None
+
+    def __init__(self, registry, name, documentation):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+
+    def _cell(self, labels):
+        """Zwraca komórkę (listę) metryki w fragmencie bieżącego wątku."""
+        shard = self.registry._shard()
+        key = (self.name, _label_key(labels))
+        cell = shard.get(key)
+        if cell is None:
+            cell = shard[key] = self._new_cell()
+        return cell
+
+    def _new_cell(self):
+        return [0.0]
+
+    @staticmethod
+    def _merge(total, cell):
+        for index, value in enumerate(cell):
+            total[index] += value
+
+
+class Counter(_Metric):
+    """Licznik rosnący."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        self._cell(labels)[0] += amount
+
+
+class Gauge(_Metric):
+    """Wskaźnik zmieniany przyrostowo (np. liczba trwających wykonań)."""
+
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        self._cell(labels)[0] += amount
+
+    def dec(self, amount=1, **labels):
+        self._cell(labels)[0] -= amount
+
+    @contextmanager
+    def track(self, **labels):
+        """Zwiększa wskaźnik na czas bloku."""
+        cell = self._cell(labels)
+        cell[0] += 1
+        try:
+            yield
+        finally:
+            cell[0] -= 1
+
+
+class Histogram(_Metric):
+    """Histogram z ustalonymi koszykami."""
+
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_cell(self):
+        # Liczności koszyków (bez kumulacji), koszyk +Inf, suma
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def observe(self, value, **labels):
+        cell = self._cell(labels)
+        buckets = self.buckets
+        index = 0
+        while index < len(buckets) and value > buckets[index]:
+            index += 1
+        cell[index] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Mierzy czas wykonania bloku."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+class MetricsRegistry:
+    """Rejestr metryk z fragmentami per wątek."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._local = threading.local()
+        # Pary (wątek, fragment) żyjących wątków i scalone fragmenty zakończonych
+        self._shards = []
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if existing.kind != metric.kind:
+                    raise ValueError(f"Metric {metric.name} already registered as {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation):
+        """Rejestruje (lub zwraca istniejący) licznik."""
+        return self._register(Counter(self, name, documentation))
+
+    def gauge(self, name, documentation):
+        """Rejestruje (lub zwraca istniejący) wskaźnik."""
+        return self._register(Gauge(self, name, documentation))
+
+    def histogram(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        """Rejestruje (lub zwraca istniejący) histogram."""
+        return self._register(Histogram(self, name, documentation, buckets))
+
+    def register_collector(self, name, documentation, collect, kind='gauge'):
+        """
+        Rejestruje metrykę obliczaną przy odczycie.
+
+        Args:
+            collect: Funkcja zwracająca liczbę lub listę par (etykiety, wartość)
+        """
+        with self._lock:
+            self._collectors.append((name, documentation, kind, collect))
+
+    def _collect_shards(self):
+        """Sumuje fragmenty wątków; fragmenty zakończonych wątków są scalane na stałe."""
+        with self._lock:
+            alive = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    self._merge_into(self._retired, shard)
+            self._shards = alive
+
+            totals = {}
+            self._merge_into(totals, self._retired)
+            for _, shard in alive:
+                self._merge_into(totals, shard)
+
+        return totals
+
+    def _merge_into(self, totals, shard):
+        # list() kopiuje pozycje atomowo względem GIL - wątek może w tym czasie dodawać serie
+        for key, cell in list(shard.items()):
+            total = totals.get(key)
+            if total is None:
+                totals[key] = list(cell)
+            else:
+                self._metrics[key[0]]._merge(total, cell)
+
+    def render(self):
+        """Zwraca wszystkie metryki w formacie tekstowym Prometheusa."""
+        totals = self._collect_shards()
+        series = {}
+        for (name, label_key), cell in totals.items():
+            series.setdefault(name, []).append((label_key, cell))
+
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+
+            for label_key, cell in sorted(series.get(name, [])):
+                if metric.kind != 'histogram':
+                    lines.append(f"{name}{_format_labels(label_key)} {_format_value(cell[0])}")
+                    continue
+
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (math.inf,), cell[:-1]):
+                    cumulative += count
+                    le = ('le', _format_value(float(bound)))
+                    lines.append(f"{name}_bucket{_format_labels(label_key, le)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(label_key)} {_format_value(cell[-1])}")
+                lines.append(f"{name}_count{_format_labels(label_key)} {cumulative}")
+
+        for name, documentation, kind, collect in self._collectors:
+            try:
+                values = collect()
+            except Exception:
+                continue
+
+            if not isinstance(values, list):
+                values = [({}, values)]
+
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in values:
+                lines.append(f"{name}{_format_labels(_label_key(labels))} {_format_value(float(value))}")
+
+        return '\n'.join(lines) + '\n'
+
+
+# Globalny rejestr metryk procesu
+METRICS = MetricsRegistry()
+
+# Metryki silników
+PIPELINE_DURATION = METRICS.histogram('pipeline_duration_seconds', 'Pipeline execution time')
+WORKFLOW_DURATION = METRICS.histogram('workflow_duration_seconds', 'Workflow execution time')
+ADAPTER_DURATION = METRICS.histogram('adapter_execute_seconds', 'Adapter execute time')
+ADAPTER_ERRORS = METRICS.counter('adapter_errors_total', 'Failed adapter executions')
+WORKFLOW_RUNS = METRICS.counter('workflow_runs_total', 'Finished workflow runs by status')
+EXECUTIONS_IN_FLIGHT = METRICS.gauge('executions_in_flight', 'Pipelines and workflows currently executing')
+STEP_CACHE_RESULTS = METRICS.counter('step_cache_total', 'Workflow step cache lookups by result')
+
+
+@contextmanager
+def observe_adapter(adapter_name):
+    """Mierzy czas wykonania adaptera i liczy jego błędy."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        ADAPTER_ERRORS.inc(adapter=adapter_name)
+        raise
+    finally:
+        ADAPTER_DURATION.observe(time.perf_counter() - start, adapter=adapter_name)
+
+
+def observe_span(span):
+    """Rejestruje metryki kroku workflow na podstawie jego spanu (core/tracing.py)."""
+    adapter = span.get('adapter') or 'unknown'
+
+    if span.get('cache'):
+        STEP_CACHE_RESULTS.inc(result=span['cache'])
+
+    if span.get('status') in ('error', 'timeout'):
+        ADAPTER_ERRORS.inc(adapter=adapter)
+
+    # Kroki pominięte i pobrane z pamięci podręcznej nie wykonują adaptera
+    if span.get('execute'):
+        ADAPTER_DURATION.observe(span['execute'], adapter=adapter)
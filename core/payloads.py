@@ -0,0 +1,448 @@
+# Przekazywanie dużych danych między krokami
+"""
+payloads.py
+"""
+
+"""
+Magazyn dużych danych binarnych (klatki wideo, obrazy etykiet, bufory audio)
+przekazywanych między krokami workflow przez uchwyty zamiast kopii.
+
+Wynik kroku trafia do kontekstu workflow jako PayloadHandle: uchwyt trzyma
+referencję do oryginalnego obiektu (bytes, tablica numpy), więc szablony,
+zapis kontekstu i logi widzą jedynie krótki opis, a kolejny krok dostaje
+ten sam obiekt bez kopiowania. Uchwyty mają licznik referencji - dane są
+zwalniane, gdy ostatni właściciel wywoła release().
+
+Do kroków z 'executor: process' dane trafiają przez pamięć współdzieloną
+(multiprocessing.shared_memory): proces roboczy dostaje jedynie nazwę
+segmentu (SharedPayload), a duże wyniki odsyła w ten sam sposób. Segment
+utworzony dla uchwytu jest zapamiętywany, więc kolejne kroki procesowe
+korzystające z tych samych danych nie kopiują ich ponownie.
+"""
+
+import hashlib
+import itertools
+import threading
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+# Minimalny rozmiar danych (w bajtach) przechowywanych jako uchwyt - mniejsze wartości zostają w kontekście
+DEFAULT_INLINE_THRESHOLD = 64 * 1024
+
+
+def _nbytes(value):
+    """Zwraca rozmiar danych binarnych (bytes, tablica numpy) lub None dla innych wartości."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if hasattr(value, 'dtype') and hasattr(value, 'shape') and hasattr(value, 'nbytes'):
+        return value.nbytes
+    return None
+
+
+def payload_size(value):
+    """Zwraca przybliżony rozmiar danych wartości w bajtach (uchwyty, dane binarne i teksty, także zagnieżdżone)."""
+    if isinstance(value, PayloadHandle):
+        return value.nbytes if not value.released else 0
+    if isinstance(value, str):
+        return len(value)
+    nbytes = _nbytes(value)
+    if nbytes is not None:
+        return nbytes
+    if isinstance(value, dict):
+        return sum(payload_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(item) for item in value)
+    return 0
+
+
+def _restore(value):
+    """Odtwarza dane uchwytu po deserializacji (pickle zapisuje same dane)."""
+    return value
+
+
+def _close(shm):
+    """Zamyka mapowanie segmentu (widoki numpy mogą je jeszcze trzymać - wtedy zamknie je GC)."""
+    try:
+        shm.close()
+    except BufferError:
+        pass
+
+
+class SharedPayload:
+    """Odwołanie do danych w pamięci współdzielonej przekazywane między procesami."""
+
+    __slots__ = ('name', 'kind', 'nbytes', 'shape', 'dtype')
+
+    def __init__(self, name, kind, nbytes, shape=None, dtype=None):
+        self.name = name
+        self.kind = kind
+        self.nbytes = nbytes
+        self.shape = shape
+        self.dtype = dtype
+
+    def __getstate__(self):
+        return (self.name, self.kind, self.nbytes, self.shape, self.dtype)
+
+    def __setstate__(self, state):
+        self.name, self.kind, self.nbytes, self.shape, self.dtype = state
+
+    @classmethod
+    def create(cls, value):
+        """
+        Kopiuje dane do nowego segmentu pamięci współdzielonej.
+
+        Returns:
+            tuple: (odwołanie SharedPayload, otwarty segment)
+        """
+        nbytes = _nbytes(value)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            shm.buf[:nbytes] = memoryview(value).cast('B')
+            return cls(shm.name, 'bytes', nbytes), shm
+
+        import numpy as np
+        target = np.ndarray(value.shape, dtype=value.dtype, buffer=shm.buf)
+        target[...] = value
+        return cls(shm.name, 'array', nbytes, tuple(value.shape), value.dtype.str), shm
+
+    def attach(self):
+        """
+        Otwiera segment i zwraca dane bez kopiowania.
+
+        Returns:
+            tuple: (dane - memoryview lub tablica numpy, otwarty segment)
+        """
+        shm = shared_memory.SharedMemory(name=self.name)
+
+        if self.kind == 'bytes':
+            return shm.buf[:self.nbytes], shm
+
+        import numpy as np
+        return np.ndarray(self.shape, dtype=np.dtype(self.dtype), buffer=shm.buf), shm
+
+    def __repr__(self):
+        return f"<SharedPayload {self.name} {self.kind} {self.nbytes} bytes>"
+
+
+class PayloadHandle:
+    """Uchwyt do danych przechowywanych w PayloadStore."""
+
+    __slots__ = ('payload_id', 'kind', 'nbytes', 'shape', 'dtype', '_value', '_shared', '_shm',
+                 '_store', '_digest')
+
+    def __init__(self, store, payload_id, value, shared=None, shm=None):
+        self.payload_id = payload_id
+        self.nbytes = _nbytes(value)
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            self.kind = 'bytes'
+            self.shape = None
+            self.dtype = None
+        else:
+            self.kind = 'array'
+            self.shape = tuple(value.shape)
+            self.dtype = str(value.dtype)
+        self._value = value
+        # Segment pamięci współdzielonej (tworzony przy pierwszym kroku procesowym)
+        self._shared = shared
+        self._shm = shm
+        self._store = store
+        self._digest = None
+
+    @property
+    def released(self):
+        return self._value is None
+
+    def value(self):
+        """Zwraca dane bez kopiowania (oryginalny obiekt lub widok pamięci współdzielonej)."""
+        if self._value is None:
+            raise ValueError(f"Payload {self.payload_id} has been released")
+        return self._value
+
+    def view(self):
+        """Zwraca memoryview danych (bez kopiowania)."""
+        return memoryview(self.value())
+
+    def digest(self):
+        """Zwraca odcisk SHA-256 danych (liczony raz na uchwyt)."""
+        if self._digest is None:
+            value = self.value()
+            if self.kind == 'bytes':
+                data = value
+            else:
+                import numpy as np
+                data = memoryview(np.ascontiguousarray(value)).cast('B')
+            self._digest = hashlib.sha256(data).hexdigest()
+        return self._digest
+
+    def retain(self):
+        """Zwiększa licznik referencji uchwytu."""
+        self._store.retain(self)
+        return self
+
+    def release(self):
+        """Zmniejsza licznik referencji (przy zerze dane są zwalniane)."""
+        self._store.release(self)
+
+    def to_json(self):
+        """Zwraca opis uchwytu (bez danych) do serializacji JSON."""
+        return {'$payload': self.payload_id, 'kind': self.kind, 'nbytes': self.nbytes,
+                'shape': list(self.shape) if self.shape else None, 'dtype': self.dtype}
+
+    def __len__(self):
+        return self.nbytes
+
+    def __repr__(self):
+        return f"<payload {self.payload_id} {self.kind} {self.nbytes} bytes>"
+
+    __str__ = __repr__
+
+    def __reduce__(self):
+        # Zapis trwały (pamięć podręczna, punkty kontrolne) przechowuje same dane
+        value = self.value()
+        if isinstance(value, memoryview):
+            value = value.tobytes()
+        return _restore, (value,)
+
+
+class PayloadStore:
+    """Magazyn uchwytów do dużych danych z licznikami referencji."""
+
+    def __init__(self, threshold=DEFAULT_INLINE_THRESHOLD):
+        """
+        Inicjalizacja magazynu.
+
+        Args:
+            threshold: Minimalny rozmiar danych (w bajtach) zamienianych na uchwyt
+        """
+        self.threshold = threshold
+        # Uchwyty w użyciu: payload_id -> [uchwyt, licznik referencji]
+        self._entries = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def is_large(self, value):
+        """Sprawdza, czy wartość powinna być przekazywana przez uchwyt."""
+        nbytes = _nbytes(value)
+        return nbytes is not None and nbytes >= self.threshold
+
+    def put(self, value, shared=None, shm=None):
+        """Zwraca uchwyt do danych (z licznikiem referencji równym 1); dane nie są kopiowane."""
+        if isinstance(value, PayloadHandle):
+            return value.retain()
+
+        with self._lock:
+            handle = PayloadHandle(self, f"p{next(self._ids)}", value, shared, shm)
+            self._entries[handle.payload_id] = [handle, 1]
+        return handle
+
+    def retain(self, handle):
+        with self._lock:
+            entry = self._entries.get(handle.payload_id)
+            if entry is None:
+                raise ValueError(f"Payload {handle.payload_id} has been released")
+            entry[1] += 1
+
+    def release(self, handle):
+        with self._lock:
+            entry = self._entries.get(handle.payload_id)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._entries[handle.payload_id]
+
+        self._free(handle)
+
+    @staticmethod
+    def _free(handle):
+        handle._value = None
+        handle._shared = None
+        shm, handle._shm = handle._shm, None
+        if shm is not None:
+            _close(shm)
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def wrap(self, value):
+        """Zamienia duże dane w wartości (także w słownikach i listach) na uchwyty."""
+        if isinstance(value, PayloadHandle):
+            return value
+        if self.is_large(value):
+            return self.put(value)
+        if isinstance(value, dict):
+            return {key: self.wrap(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.wrap(item) for item in value]
+        if type(value) is tuple:
+            return tuple(self.wrap(item) for item in value)
+        return value
+
+    @staticmethod
+    def resolve(value):
+        """Zamienia uchwyty w wartości na dane (bez kopiowania danych)."""
+        if isinstance(value, PayloadHandle):
+            return value.value()
+        if isinstance(value, dict):
+            return {key: PayloadStore.resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [PayloadStore.resolve(item) for item in value]
+        if type(value) is tuple:
+            return tuple(PayloadStore.resolve(item) for item in value)
+        return value
+
+    def share(self, value, temporaries):
+        """
+        Przygotowuje wartość dla procesu roboczego: uchwyty i duże dane zamienia na SharedPayload.
+
+        Dane uchwytu są kopiowane do pamięci współdzielonej tylko przy pierwszym użyciu.
+        Duże dane spoza uchwytów dostają uchwyt tymczasowy dopisywany do listy
+        'temporaries' - wywołujący zwalnia go (discard) po zakończeniu procesu roboczego.
+        """
+        if shared_memory is None:
+            return self.resolve(value)
+
+        if isinstance(value, PayloadHandle):
+            if value._shared is None:
+                value._shared, value._shm = SharedPayload.create(value.value())
+            return value._shared
+        if self.is_large(value):
+            handle = self.put(value)
+            temporaries.append(handle)
+            return self.share(handle, temporaries)
+        if isinstance(value, dict):
+            return {key: self.share(item, temporaries) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.share(item, temporaries) for item in value]
+        if type(value) is tuple:
+            return tuple(self.share(item, temporaries) for item in value)
+        return value
+
+    def adopt(self, value):
+        """Zamienia SharedPayload z wyniku procesu roboczego na uchwyty (magazyn przejmuje segmenty)."""
+        if isinstance(value, SharedPayload):
+            data, shm = value.attach()
+            return self.put(data, shared=value, shm=shm)
+        if isinstance(value, dict):
+            return {key: self.adopt(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.adopt(item) for item in value]
+        if type(value) is tuple:
+            return tuple(self.adopt(item) for item in value)
+        return value
+
+    @staticmethod
+    def discard(value):
+        """Zwalnia uchwyty w wartości (bez zwracania danych)."""
+        if isinstance(value, PayloadHandle):
+            value.release()
+        elif isinstance(value, dict):
+            for item in value.values():
+                PayloadStore.discard(item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                PayloadStore.discard(item)
+
+    def finalize(self, value, memo=None):
+        """
+        Zwalnia uchwyty w wartości i zwraca ją z danymi w miejscu uchwytów.
+
+        Dane w pamięci procesu nie są kopiowane; dane z pamięci współdzielonej są
+        kopiowane raz, bo segment jest usuwany.
+        """
+        memo = {} if memo is None else memo
+
+        if isinstance(value, PayloadHandle):
+            if value.payload_id not in memo:
+                data = value.value() if not value.released else None
+                if value._shm is not None and data is not None:
+                    data = data.tobytes() if isinstance(data, memoryview) else data.copy()
+                memo[value.payload_id] = data
+                value.release()
+            return memo[value.payload_id]
+        if isinstance(value, dict):
+            return {key: self.finalize(item, memo) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.finalize(item, memo) for item in value]
+        if type(value) is tuple:
+            return tuple(self.finalize(item, memo) for item in value)
+        return value
+
+    def stats(self):
+        """Zwraca liczbę uchwytów w użyciu i łączny rozmiar ich danych."""
+        with self._lock:
+            handles = [entry[0] for entry in self._entries.values()]
+        return {'payloads': len(handles), 'bytes': sum(handle.nbytes for handle in handles),
+                'shared': sum(1 for handle in handles if handle._shm is not None)}
+
+
+def json_default(value):
+    """
+    Funkcja 'default' dla json.dump: uchwyty i dane binarne są zapisywane jako opis, bez zawartości.
+    """
+    if isinstance(value, PayloadHandle):
+        return value.to_json()
+
+    nbytes = _nbytes(value)
+    if nbytes is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    description = {'$binary': type(value).__name__, 'nbytes': nbytes}
+    if hasattr(value, 'shape'):
+        description['shape'] = list(value.shape)
+        description['dtype'] = str(value.dtype)
+    return description
+
+
+def attach_shared(value, segments):
+    """Zamienia SharedPayload na dane w procesie roboczym (otwarte segmenty trafiają do 'segments')."""
+    if isinstance(value, SharedPayload):
+        data, shm = value.attach()
+        segments.append(shm)
+        return data
+    if isinstance(value, dict):
+        return {key: attach_shared(item, segments) for key, item in value.items()}
+    if isinstance(value, list):
+        return [attach_shared(item, segments) for item in value]
+    if type(value) is tuple:
+        return tuple(attach_shared(item, segments) for item in value)
+    return value
+
+
+def share_output(value, threshold=DEFAULT_INLINE_THRESHOLD):
+    """
+    Kopiuje duże dane z wyniku procesu roboczego do pamięci współdzielonej.
+
+    Własność segmentów przechodzi na proces nadrzędny (PayloadStore.adopt).
+    """
+    if shared_memory is None:
+        return value
+
+    nbytes = _nbytes(value)
+    if nbytes is not None and nbytes >= threshold:
+        # Procesy robocze dzielą resource_tracker z procesem nadrzędnym, więc segment
+        # przetrwa zakończenie zadania - usuwa go proces nadrzędny przy zwolnieniu uchwytu
+        shared, shm = SharedPayload.create(value)
+        _close(shm)
+        return shared
+    if isinstance(value, dict):
+        return {key: share_output(item, threshold) for key, item in value.items()}
+    if isinstance(value, list):
+        return [share_output(item, threshold) for item in value]
+    if type(value) is tuple:
+        return tuple(share_output(item, threshold) for item in value)
+    return value
+
+
+def close_segments(segments):
+    """Zamyka segmenty otwarte w procesie roboczym."""
+    for shm in segments:
+        _close(shm)
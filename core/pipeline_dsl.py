@@ -1,7 +1,7 @@
 # pipeline_dsl.py
 import yaml
 import json
-from adapters import ADAPTERS
+from .plan import compile_pipeline, execute_plan, get_file_plan
 
 
 class PipelineDSL:
@@ -19,40 +19,11 @@ class PipelineDSL:
         if not pipeline_def or not isinstance(pipeline_def, dict):
             raise ValueError("Invalid pipeline definition")
 
-        steps = pipeline_def.get('steps', [])
-        result = initial_input
-
-        for step in steps:
-            adapter_name = step.get('adapter')
-            if not adapter_name or adapter_name not in ADAPTERS:
-                raise ValueError(f"Unknown adapter: {adapter_name}")
-
-            # Pobierz adapter
-            adapter = ADAPTERS[adapter_name]
-            adapter.reset()
-
-            # Zastosuj metody
-            methods = step.get('methods', [])
-            for method in methods:
-                method_name = method.get('name')
-                method_value = method.get('value')
-
-                if not method_name:
-                    continue
-
-                # Wywołaj metodę
-                getattr(adapter, method_name)(method_value)
-
-            # Wykonaj adapter
-            result = adapter.execute(result)
-
-        return result
+        return execute_plan(compile_pipeline(pipeline_def), initial_input)
 
     @staticmethod
-    def run_pipeline_from_file(yaml_path, pipeline_name=None, initial_input=None):
-        """Uruchamia pipeline z pliku YAML."""
-        config = PipelineDSL.load_from_yaml(yaml_path)
-
+    def select_pipeline(config, pipeline_name=None):
+        """Wybiera pipeline z konfiguracji YAML i zwraca parę (nazwa, definicja)."""
         if 'pipelines' not in config:
             raise ValueError("YAML must contain 'pipelines' key")
 
@@ -60,11 +31,17 @@ class PipelineDSL:
         if pipeline_name:
             if pipeline_name not in config['pipelines']:
                 raise ValueError(f"Pipeline '{pipeline_name}' not found")
-            pipeline = config['pipelines'][pipeline_name]
         else:
             # Użyj pierwszego pipeline'a
             pipeline_name = next(iter(config['pipelines']))
-            pipeline = config['pipelines'][pipeline_name]
+
+        return pipeline_name, config['pipelines'][pipeline_name]
+
+    @staticmethod
+    def run_pipeline_from_file(yaml_path, pipeline_name=None, initial_input=None):
+        """Uruchamia pipeline z pliku YAML."""
+        # Plan jest kompilowany ponownie tylko po zmianie pliku
+        plan = get_file_plan(yaml_path, pipeline_name)
 
         # Wykonaj pipeline
-        return PipelineDSL.execute_pipeline(pipeline, initial_input)
\ No newline at end of file
+        return execute_plan(plan, initial_input)
@@ -0,0 +1,146 @@
+# Silnik wykonujący sekwencje adapterów
+"""
+pipeline_engine.py
+"""
+
+"""
+Silnik wykonujący pipeline'y zapisane w notacji kropkowej lub w YAML.
+"""
+
+from .dsl_parser import DotNotationParser, YamlDSLParser
+from .plan import get_expression_plan, execute_plan
+from .streaming import execute_stream, DEFAULT_BUFFER_SIZE
+from .batch import execute_batch
+from adapters import ADAPTERS, ADAPTER_POOL
+
+
+class PipelineEngine:
+    """Silnik wykonujący pipeline'y w DSL."""
+
+    @staticmethod
+    def execute_adapter_call(adapter_call, input_data=None):
+        """Wykonuje pojedyncze wywołanie adaptera."""
+        adapter_name = adapter_call['adapter']
+        methods = adapter_call['methods']
+
+        # Pobierz adapter
+        if adapter_name not in ADAPTERS:
+            raise ValueError(f"Unknown adapter: {adapter_name}")
+
+        # Każde wykonanie dostaje własną, wyczyszczoną instancję adaptera
+        with ADAPTER_POOL.adapter(adapter_name) as adapter:
+            # Zastosuj wszystkie metody
+            for method in methods:
+                method_name = method['name']
+                value = method['value']
+
+                # Wywołaj metodę
+                getattr(adapter, method_name)(value)
+
+            # Wykonaj adapter
+            return adapter.execute(input_data)
+
+    @staticmethod
+    def execute_pipeline(pipeline, initial_input=None):
+        """Wykonuje sekwencję kroków pipeline'a."""
+        result = initial_input
+
+        for step in pipeline:
+            adapter_call = step
+            result = PipelineEngine.execute_adapter_call(adapter_call, result)
+
+        return result
+
+    @staticmethod
+    def split_expression(expression):
+        """
+        Dzieli wyrażenie w notacji kropkowej na wyrażenia poszczególnych kroków.
+
+        Segment bez nawiasów (np. 'python') rozpoczyna nowy krok,
+        segmenty z wywołaniami metod są dołączane do bieżącego kroku.
+        """
+        # Rozdziel wyrażenie po kropkach poza nawiasami i napisami
+        segments = DotNotationParser.split_segments(expression)
+
+        # Pogrupuj segmenty w kroki: adapter.metoda(...).metoda(...)
+        steps = []
+        for segment in segments:
+            if '(' not in segment or not steps:
+                steps.append(segment)
+            else:
+                steps[-1] = f"{steps[-1]}.{segment}"
+
+        return steps
+
+    @staticmethod
+    def compile(expression):
+        """
+        Kompiluje wyrażenie w notacji kropkowej do niezmiennego planu.
+
+        Plany są przechowywane w pamięci podręcznej LRU, więc ponowna
+        kompilacja tego samego wyrażenia nie parsuje go od nowa.
+        """
+        return get_expression_plan(expression)
+
+    @staticmethod
+    def execute_plan(plan, initial_input=None, coalesce=False):
+        """Wykonuje skompilowany plan (coalesce - łączenie z identycznym trwającym wykonaniem)."""
+        return execute_plan(plan, initial_input, coalesce)
+
+    @staticmethod
+    def execute_from_dot_notation(expression, initial_input=None, coalesce=False):
+        """Wykonuje pipeline z wyrażenia w notacji kropkowej."""
+        plan = PipelineEngine.compile(expression)
+        return execute_plan(plan, initial_input, coalesce)
+
+    @staticmethod
+    def execute_batch(plan, inputs, concurrency=None, return_exceptions=False):
+        """
+        Wykonuje plan (lub wyrażenie w notacji kropkowej) dla wielu danych wejściowych.
+
+        Adaptery z execute_many() przetwarzają całą paczkę naraz,
+        pozostałe są wykonywane równolegle dla każdego elementu.
+        """
+        if isinstance(plan, str):
+            plan = PipelineEngine.compile(plan)
+
+        return execute_batch(plan, inputs, concurrency, return_exceptions)
+
+    @staticmethod
+    def execute_stream(plan, source=None, buffer_size=DEFAULT_BUFFER_SIZE):
+        """
+        Wykonuje plan strumieniowo - zwraca generator rekordów wynikowych.
+
+        Kroki działają równolegle i są połączone ograniczonymi kolejkami,
+        więc pamięć nie rośnie z rozmiarem danych wejściowych.
+        """
+        return execute_stream(plan, source, buffer_size)
+
+    @staticmethod
+    def stream_from_dot_notation(expression, source=None, buffer_size=DEFAULT_BUFFER_SIZE):
+        """Wykonuje strumieniowo pipeline z wyrażenia w notacji kropkowej."""
+        plan = PipelineEngine.compile(expression)
+        return execute_stream(plan, source, buffer_size)
+
+    @staticmethod
+    def execute_from_yaml(yaml_def, pipeline_name=None, initial_input=None):
+        """Wykonuje pipeline z definicji YAML."""
+        config = yaml_def
+        if isinstance(yaml_def, str):
+            config = YamlDSLParser.parse(yaml_def)
+
+        if 'pipelines' not in config:
+            raise ValueError("YAML must contain 'pipelines' key")
+
+        # Wybierz pipeline
+        if pipeline_name:
+            if pipeline_name not in config['pipelines']:
+                raise ValueError(f"Pipeline '{pipeline_name}' not found")
+            pipeline = config['pipelines'][pipeline_name]
+        else:
+            # Użyj pierwszego pipeline'a
+            pipeline_name = next(iter(config['pipelines']))
+            pipeline = config['pipelines'][pipeline_name]
+
+        # Wykonaj pipeline
+        return PipelineEngine.execute_pipeline(pipeline['steps'], initial_input)
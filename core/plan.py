@@ -0,0 +1,213 @@
+# Skompilowane plany pipeline'ów
+"""
+plan.py
+"""
+
+"""
+Kompilacja pipeline'ów do niezmiennych planów wykonania.
+
+Plan zawiera rozwiązane klasy adapterów i sparsowane argumenty metod,
+więc koszt parsowania wyrażenia lub pliku YAML jest ponoszony tylko raz.
+Plany są przechowywane w ograniczonej pamięci podręcznej LRU.
+"""
+
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from adapters import ADAPTERS, ADAPTER_POOL
+from .dsl_parser import DotNotationParser
+from .metrics import PIPELINE_DURATION, EXECUTIONS_IN_FLIGHT, observe_adapter
+from .singleflight import SingleFlight, plan_key
+
+# Krok planu: nazwa adaptera, klasa adaptera i krotka par (metoda, wartość)
+PlanStep = namedtuple('PlanStep', ['adapter', 'adapter_class', 'methods'])
+
+# Plan pipeline'u: klucz źródła i krotka kroków
+PipelinePlan = namedtuple('PipelinePlan', ['key', 'steps'])
+
+# Domyślny rozmiar pamięci podręcznej planów
+DEFAULT_PLAN_CACHE_SIZE = 256
+
+
+class PlanCache:
+    """Ograniczona, bezpieczna wątkowo pamięć podręczna LRU."""
+
+    def __init__(self, max_size=DEFAULT_PLAN_CACHE_SIZE):
+        """
+        Inicjalizacja pamięci podręcznej.
+
+        Args:
+            max_size: Maksymalna liczba przechowywanych wpisów
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Pobiera wpis i oznacza go jako ostatnio używany."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key, value):
+        """Dodaje wpis, usuwając najdawniej używane ponad limit."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        """Czyści pamięć podręczną."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Wspólna pamięć podręczna planów
+PLAN_CACHE = PlanCache()
+
+# Trwające wykonania planów - identyczne wykonania z coalesce=True współdzielą jedno
+PIPELINE_FLIGHTS = SingleFlight('pipeline')
+
+
+def _compile_step(adapter_name, methods):
+    """Tworzy krok planu, sprawdzając adapter już na etapie kompilacji."""
+    if not adapter_name or adapter_name not in ADAPTERS:
+        raise ValueError(f"Unknown adapter: {adapter_name}")
+
+    compiled_methods = tuple(
+        (method.get('name'), method.get('value'))
+        for method in methods
+        if method.get('name')
+    )
+
+    return PlanStep(adapter_name, ADAPTERS[adapter_name].__class__, compiled_methods)
+
+
+def compile_expression(expression):
+    """
+    Kompiluje wyrażenie w notacji kropkowej do planu.
+
+    Args:
+        expression: Wyrażenie, np. "file.path('a.txt').python.code('...')"
+
+    Returns:
+        PipelinePlan: Niezmienny plan wykonania
+    """
+    from .pipeline_engine import PipelineEngine
+
+    steps = []
+    for step_expr in PipelineEngine.split_expression(expression):
+        adapter_call = DotNotationParser.parse(step_expr)
+        steps.append(_compile_step(adapter_call['adapter'], adapter_call['methods']))
+
+    return PipelinePlan(expression, tuple(steps))
+
+
+def compile_pipeline(pipeline_def, key=None):
+    """
+    Kompiluje definicję pipeline'u (słownik z 'steps' lub listę kroków) do planu.
+
+    Args:
+        pipeline_def: Definicja pipeline'u z YAML
+        key: Opcjonalny klucz źródła planu
+
+    Returns:
+        PipelinePlan: Niezmienny plan wykonania
+    """
+    if isinstance(pipeline_def, dict):
+        steps_def = pipeline_def.get('steps', [])
+    elif isinstance(pipeline_def, list):
+        steps_def = pipeline_def
+    else:
+        raise ValueError("Invalid pipeline definition")
+
+    steps = tuple(
+        _compile_step(step.get('adapter'), step.get('methods', []))
+        for step in steps_def
+    )
+
+    return PipelinePlan(key, steps)
+
+
+def get_expression_plan(expression, cache=PLAN_CACHE):
+    """Zwraca plan wyrażenia z pamięci podręcznej, kompilując go w razie potrzeby."""
+    key = ('expression', expression)
+    plan = cache.get(key)
+
+    if plan is None:
+        plan = cache.put(key, compile_expression(expression))
+
+    return plan
+
+
+def get_file_plan(yaml_path, pipeline_name=None, cache=PLAN_CACHE):
+    """
+    Zwraca plan pipeline'u z pliku YAML.
+
+    Plan jest kompilowany ponownie tylko po zmianie czasu modyfikacji lub rozmiaru pliku.
+    """
+    from .pipeline_dsl import PipelineDSL
+
+    path = os.path.abspath(yaml_path)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    key = ('file', path, pipeline_name)
+
+    cached = cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    config = PipelineDSL.load_from_yaml(path)
+    pipeline_name, pipeline = PipelineDSL.select_pipeline(config, pipeline_name)
+    plan = compile_pipeline(pipeline, key=(path, pipeline_name))
+
+    cache.put(key, (stamp, plan))
+    return plan
+
+
+def execute_plan(plan, initial_input=None, coalesce=False):
+    """
+    Wykonuje skompilowany plan.
+
+    Args:
+        plan: PipelinePlan
+        initial_input: Dane wejściowe pierwszego kroku
+        coalesce: Czy dołączyć do trwającego wykonania tego samego planu z tymi samymi
+            danymi (wynik jest wtedy wspólny i tylko do odczytu - core/singleflight.py)
+
+    Returns:
+        Wynik ostatniego kroku
+    """
+    if coalesce:
+        return PIPELINE_FLIGHTS.do(plan_key(plan, initial_input), _run_plan, plan, initial_input)
+    return _run_plan(plan, initial_input)
+
+
+def _run_plan(plan, initial_input):
+    result = initial_input
+    pipeline = '.'.join(step.adapter for step in plan.steps)
+
+    with EXECUTIONS_IN_FLIGHT.track(kind='pipeline'), PIPELINE_DURATION.time(pipeline=pipeline):
+        for step in plan.steps:
+            with ADAPTER_POOL.adapter(step.adapter) as adapter:
+                for method_name, method_value in step.methods:
+                    getattr(adapter, method_name)(method_value)
+
+                with observe_adapter(step.adapter):
+                    result = adapter.execute(result)
+
+    return result
@@ -0,0 +1,100 @@
+# Wykonywanie kroków w puli procesów
+"""
+process_executor.py
+"""
+
+"""
+Moduł udostępniający trwałą pulę procesów dla kroków CPU-bound
+(opencv, ml, renderery PCL/ZPL), które blokują GIL w puli wątków.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from .payloads import attach_shared, share_output, close_segments
+
+
+def _init_worker():
+    """Inicjalizuje proces roboczy - importuje adaptery raz na cały czas życia procesu."""
+    import adapters  # noqa: F401
+
+
+def _run_adapter(adapter_name, methods, input_data):
+    """
+    Wykonuje adapter w procesie roboczym.
+
+    Args:
+        adapter_name: Nazwa adaptera z ADAPTERS
+        methods: Lista par (nazwa metody, wartość) z już zinterpolowanymi wartościami
+        input_data: Dane wejściowe kroku (duże dane jako SharedPayload - core/payloads.py)
+
+    Returns:
+        Wynik wykonania adaptera (duże dane jako SharedPayload)
+    """
+    from adapters import ADAPTER_POOL
+
+    # Duże dane wejściowe są widokami pamięci współdzielonej - bez kopiowania i serializacji
+    segments = []
+    input_data = attach_shared(input_data, segments)
+
+    try:
+        # Instancje z puli pozostają w procesie między zadaniami
+        with ADAPTER_POOL.adapter(adapter_name) as adapter:
+            for method_name, method_value in methods:
+                getattr(adapter, method_name)(method_value)
+
+            return share_output(adapter.execute(input_data))
+    finally:
+        input_data = None
+        close_segments(segments)
+
+
+class ProcessStepExecutor:
+    """
+    Trwała pula procesów roboczych wykonujących kroki workflow.
+    """
+
+    def __init__(self, max_workers=None):
+        """
+        Inicjalizacja puli.
+
+        Args:
+            max_workers: Liczba procesów roboczych (domyślnie liczba rdzeni)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        """Zwraca pulę procesów (tworzoną przy pierwszym użyciu)."""
+        with self._lock:
+            if self._pool is None:
+                # 'spawn' - silnik działa wielowątkowo, a fork wątków jest niebezpieczny
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+            return self._pool
+
+    def submit(self, adapter_name, methods, input_data=None):
+        """
+        Zleca wykonanie adaptera w procesie roboczym.
+
+        Args:
+            adapter_name: Nazwa adaptera
+            methods: Lista par (nazwa metody, wartość)
+            input_data: Dane wejściowe (muszą dać się zserializować przez pickle)
+
+        Returns:
+            concurrent.futures.Future: Przyszły wynik wykonania
+        """
+        return self._get_pool().submit(_run_adapter, adapter_name, list(methods), input_data)
+
+    def shutdown(self, wait=True):
+        """Zamyka pulę procesów."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
@@ -0,0 +1,247 @@
+# Pamięć podręczna wyników kroków
+"""
+result_cache.py
+"""
+
+"""
+Pamięć podręczna wyników kroków adresowana zawartością.
+
+Kluczem jest odcisk nazwy adaptera, zinterpolowanych parametrów metod
+i danych wejściowych. Wyniki są przechowywane jako pickle - w pamięci (LRU
+z limitem rozmiaru) i na dysku (domyślnie w katalogu data/step_cache silnika).
+Poziom dyskowy również ma limit rozmiaru: po jego przekroczeniu usuwane są
+wpisy najdawniej używane (odczyt odświeża czas modyfikacji pliku).
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from .fingerprint import fingerprint_or_none
+
+# Domyślny limit pamięci podręcznej w RAM (w bajtach)
+DEFAULT_MAX_MEMORY_BYTES = 128 * 1024 * 1024
+
+# Domyślny katalog poziomu dyskowego
+DEFAULT_CACHE_DIR = os.path.join('data', 'step_cache')
+
+# Domyślny limit poziomu dyskowego (w bajtach)
+DEFAULT_MAX_DISK_BYTES = 1024 * 1024 * 1024
+
+# Część limitu dysku, do której zmniejszany jest poziom dyskowy przy usuwaniu wpisów
+# (zapas, żeby katalog nie był przeglądany przy każdym kolejnym zapisie)
+DISK_EVICTION_TARGET = 0.9
+
+# Rozszerzenie plików wpisów na dysku
+ENTRY_SUFFIX = '.pkl'
+
+
+class ResultCache:
+    """Dwupoziomowa (pamięć + dysk) pamięć podręczna wyników kroków."""
+
+    def __init__(self, max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES, disk_dir=None,
+                 max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        """
+        Inicjalizacja pamięci podręcznej.
+
+        Args:
+            max_memory_bytes: Limit rozmiaru wpisów przechowywanych w pamięci
+            disk_dir: Katalog poziomu dyskowego (None - tylko pamięć); tworzony przy pierwszym zapisie
+            max_disk_bytes: Limit rozmiaru wpisów na dysku
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Rozmiar wpisów na dysku - liczony przy pierwszym zapisie (katalog mógł zostać
+        # z poprzednich uruchomień), potem aktualizowany przy zapisie i usuwaniu
+        self._disk_bytes = None
+        self._disk_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(adapter_name, methods, input_data):
+        """
+        Tworzy klucz wpisu.
+
+        Args:
+            adapter_name: Nazwa adaptera
+            methods: Lista par (metoda, wartość) po interpolacji
+            input_data: Dane wejściowe kroku
+
+        Returns:
+            str: Odcisk SHA-256 lub None (parametry lub dane bez odcisku - wyniku nie można zapamiętać)
+        """
+        return fingerprint_or_none(adapter_name, list(methods), input_data)
+
+    def get(self, key):
+        """
+        Pobiera wynik z pamięci podręcznej.
+
+        Returns:
+            tuple: (czy trafienie, wynik)
+        """
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+
+        if data is None and self.disk_dir:
+            data = self._read_disk(key)
+            if data is not None:
+                # Przenieś wpis z dysku do pamięci
+                self._store_memory(key, data)
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+
+        # Każde trafienie dostaje własną kopię wyniku
+        return True, pickle.loads(data)
+
+    def put(self, key, value):
+        """
+        Zapisuje wynik w pamięci podręcznej.
+
+        Returns:
+            bool: False jeśli wyniku nie da się zserializować
+        """
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+
+        self._store_memory(key, data)
+
+        if self.disk_dir:
+            self._write_disk(key, data)
+
+        return True
+
+    def clear(self):
+        """Czyści poziom pamięciowy."""
+        with self._lock:
+            self._entries.clear()
+            self.memory_bytes = 0
+
+    def hit_ratio(self):
+        """Zwraca udział trafień we wszystkich odczytach."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _store_memory(self, key, data):
+        """Zapisuje wpis w pamięci, usuwając najdawniej używane ponad limit."""
+        if len(data) > self.max_memory_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.memory_bytes -= len(previous)
+
+            self._entries[key] = data
+            self.memory_bytes += len(data)
+
+            while self.memory_bytes > self.max_memory_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.memory_bytes -= len(evicted)
+
+    def disk_bytes(self):
+        """Zwraca rozmiar wpisów na dysku (w bajtach)."""
+        with self._disk_lock:
+            return self._disk_usage()
+
+    def _disk_path(self, key):
+        """Zwraca ścieżkę pliku wpisu na dysku."""
+        return os.path.join(self.disk_dir, key[:2], f"{key}{ENTRY_SUFFIX}")
+
+    def _disk_entries(self):
+        """Zwraca wpisy na dysku jako listę (czas ostatniego użycia, rozmiar, ścieżka)."""
+        entries = []
+        try:
+            shards = list(os.scandir(self.disk_dir))
+        except OSError:
+            return entries
+
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(ENTRY_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def _disk_usage(self):
+        """Zwraca rozmiar wpisów na dysku, przy pierwszym wywołaniu przeglądając katalog (pod _disk_lock)."""
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+        return self._disk_bytes
+
+    def _read_disk(self, key):
+        """Odczytuje wpis z dysku i oznacza go jako ostatnio użyty."""
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def _write_disk(self, key, data):
+        """Zapisuje wpis na dysku atomowo (plik tymczasowy + zmiana nazwy) i pilnuje limitu dysku."""
+        if len(data) > self.max_disk_bytes:
+            return
+
+        path = self._disk_path(key)
+        directory = os.path.dirname(path)
+
+        with self._disk_lock:
+            usage = self._disk_usage()
+            os.makedirs(directory, exist_ok=True)
+
+            try:
+                previous = os.path.getsize(path)
+            except OSError:
+                previous = 0
+
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except OSError:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                return
+
+            self._disk_bytes = usage - previous + len(data)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk(keep=path)
+
+    def _evict_disk(self, keep=None):
+        """Usuwa najdawniej używane wpisy z dysku, aż ich rozmiar spadnie poniżej DISK_EVICTION_TARGET limitu (pod _disk_lock)."""
+        entries = self._disk_entries()
+        self._disk_bytes = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * DISK_EVICTION_TARGET
+
+        for _, size, path in sorted(entries):
+            if self._disk_bytes <= target:
+                break
+            if path == keep:
+                continue
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            self._disk_bytes -= size
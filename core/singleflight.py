@@ -0,0 +1,145 @@
+# Łączenie identycznych równoczesnych wykonań
+"""
+singleflight.py
+"""
+
+"""
+Warstwa "single-flight": identyczne wykonania trwające w tym samym czasie
+współdzielą jedno wykonanie.
+
+Pierwsze wywołanie z danym kluczem (np. plan pipeline'u i odcisk danych
+wejściowych) wykonuje pracę, a kolejne - dopóki ono trwa - czekają na jego
+wynik. Wszyscy czekający dostają ten sam obiekt wyniku (lub ten sam wyjątek),
+więc wynik należy traktować jako tylko do odczytu. Po zakończeniu wykonania
+klucz jest usuwany - to nie jest pamięć podręczna (patrz core/result_cache.py).
+
+Adaptery z efektami ubocznymi lub niedeterministyczne wyłączają łączenie
+atrybutem klasy 'single_flight = False'.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from adapters.cancellation import OperationCancelled, current_token
+from .fingerprint import fingerprint_or_none
+from .metrics import METRICS
+
+# Wykonania obsłużone przez trwające identyczne wykonanie
+SINGLE_FLIGHT_SHARED = METRICS.counter('single_flight_shared_total',
+                                       'Executions served by an identical in-flight execution')
+
+
+def allows_single_flight(adapter_class):
+    """Sprawdza, czy wykonania adaptera mogą być łączone."""
+    return getattr(adapter_class, 'single_flight', True)
+
+
+def plan_key(plan, input_data):
+    """
+    Zwraca klucz wykonania planu pipeline'u (None - wykonania nie można łączyć).
+
+    Plan musi mieć klucz źródła (wyrażenie lub plik), wszystkie jego adaptery
+    muszą dopuszczać łączenie wykonań, a dane wejściowe muszą mieć odcisk.
+    """
+    if plan.key is None or not all(allows_single_flight(step.adapter_class) for step in plan.steps):
+        return None
+
+    input_fingerprint = fingerprint_or_none(input_data)
+    if input_fingerprint is None:
+        return None
+    return ('pipeline', plan.key, input_fingerprint)
+
+
+class SingleFlight:
+    """Grupa wykonań łączonych po kluczu."""
+
+    def __init__(self, kind='pipeline'):
+        """
+        Inicjalizacja.
+
+        Args:
+            kind: Rodzaj wykonań (etykieta metryki single_flight_shared_total)
+        """
+        self.kind = kind
+        # Trwające wykonania: klucz -> Future wyniku
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared = 0
+
+    def _join(self, key):
+        """Zwraca (Future, czy wywołujący wykonuje pracę)."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                SINGLE_FLIGHT_SHARED.inc(kind=self.kind)
+                return future, False
+
+            future = self._calls[key] = Future()
+            # Oczekujący nie mogą anulować wspólnego wyniku
+            future.set_running_or_notify_cancel()
+            self.executions += 1
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            del self._calls[key]
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, function, *args, **kwargs):
+        """
+        Wykonuje function(*args, **kwargs) albo czeka na trwające wykonanie z tym samym kluczem.
+
+        Klucz None wyłącza łączenie - funkcja jest po prostu wykonywana.
+        """
+        if key is None:
+            return function(*args, **kwargs)
+
+        future, leader = self._join(key)
+        if not leader:
+            # Oczekujący respektuje własny termin (token anulowania bieżącego kontekstu)
+            token = current_token()
+            try:
+                return future.result(timeout=token.remaining())
+            except FutureTimeoutError:
+                raise OperationCancelled(token.reason or "Deadline exceeded")
+
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key, function, *args, **kwargs):
+        """Asynchroniczny odpowiednik do() - function zwraca korutynę."""
+        if key is None:
+            return await function(*args, **kwargs)
+
+        future, leader = self._join(key)
+        if not leader:
+            # Wykonanie prowadzące może działać w innym wątku lub pętli zdarzeń
+            token = current_token()
+            try:
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), token.remaining())
+            except asyncio.TimeoutError:
+                raise OperationCancelled(token.reason or "Deadline exceeded")
+
+        try:
+            result = await function(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+
+        self._finish(key, future, result)
+        return result
+
+    def __len__(self):
+        return len(self._calls)
@@ -0,0 +1,147 @@
+# Strumieniowe wykonanie pipeline'ów
+"""
+streaming.py
+"""
+
+"""
+Strumieniowe wykonanie skompilowanych planów.
+
+Każdy krok działa we własnym wątku i przetwarza kolejne rekordy (linie,
+fragmenty, klatki) zamiast jednego zmaterializowanego wyniku. Kroki są
+połączone ograniczonymi kolejkami - szybszy krok czeka na wolniejszy
+(backpressure), więc zużycie pamięci nie zależy od rozmiaru danych,
+a kolejne kroki zaczynają pracę, zanim poprzednie skończą.
+
+Adapter może zaimplementować execute_stream(records) - generator przyjmujący
+iterowalne rekordy (lub None dla pierwszego kroku bez źródła). Adaptery bez
+tej metody są wykonywane osobno dla każdego rekordu.
+"""
+
+import queue
+import threading
+from adapters import ADAPTER_POOL
+
+# Domyślna pojemność kolejki między krokami (w rekordach)
+DEFAULT_BUFFER_SIZE = 64
+
+# Co ile sekund wątki kroków sprawdzają, czy strumień nie został zamknięty
+POLL_INTERVAL = 0.1
+
+# Znacznik końca strumienia
+_END = object()
+
+
+class _StageError:
+    """Wyjątek kroku przekazywany dalej kolejką."""
+
+    __slots__ = ('error',)
+
+    def __init__(self, error):
+        self.error = error
+
+
+def stream_adapter(adapter, records):
+    """
+    Zwraca iterator wyników adaptera dla strumienia rekordów.
+
+    Args:
+        adapter: Skonfigurowana instancja adaptera
+        records: Iterowalne rekordy lub None (pierwszy krok bez źródła)
+    """
+    # Sprawdzamy klasę - __getattr__ adapterów zwraca settery dla dowolnych nazw
+    if getattr(adapter.__class__, 'execute_stream', None) is not None:
+        return adapter.execute_stream(records)
+
+    if records is None:
+        return iter((adapter.execute(None),))
+
+    return (adapter.execute(record) for record in records)
+
+
+def _put(channel, item, stop):
+    """Wstawia element do kolejki; zwraca False, jeśli strumień zamknięto."""
+    while not stop.is_set():
+        try:
+            channel.put(item, timeout=POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _drain(channel, stop):
+    """Zwraca generator elementów kolejki aż do końca strumienia."""
+    while True:
+        try:
+            item = channel.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            if stop.is_set():
+                return
+            continue
+
+        if item is _END:
+            return
+
+        if isinstance(item, _StageError):
+            raise item.error
+
+        yield item
+
+
+def _run_stage(step, records, outbound, stop):
+    """Wykonuje krok planu na strumieniu rekordów (w osobnym wątku)."""
+    try:
+        with ADAPTER_POOL.adapter(step.adapter) as adapter:
+            for method_name, method_value in step.methods:
+                getattr(adapter, method_name)(method_value)
+
+            for record in stream_adapter(adapter, records):
+                if not _put(outbound, record, stop):
+                    return
+    except BaseException as e:
+        _put(outbound, _StageError(e), stop)
+        return
+
+    _put(outbound, _END, stop)
+
+
+def execute_stream(plan, source=None, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Wykonuje plan strumieniowo.
+
+    Args:
+        plan: PipelinePlan
+        source: Iterowalne rekordy wejściowe (None - pierwszy krok sam je tworzy)
+        buffer_size: Pojemność kolejki między krokami
+
+    Yields:
+        Rekordy wynikowe ostatniego kroku
+    """
+    if not plan.steps:
+        if source is not None:
+            yield from source
+        return
+
+    stop = threading.Event()
+    records = iter(source) if source is not None else None
+    threads = []
+
+    for index, step in enumerate(plan.steps):
+        outbound = queue.Queue(maxsize=buffer_size)
+        thread = threading.Thread(
+            target=_run_stage,
+            args=(step, records, outbound, stop),
+            name=f"pipeline-stream-{index}-{step.adapter}",
+            daemon=True
+        )
+        threads.append(thread)
+        records = _drain(outbound, stop)
+
+    for thread in threads:
+        thread.start()
+
+    try:
+        yield from records
+    finally:
+        # Zamknięcie generatora (także przedwczesne) zatrzymuje wszystkie kroki
+        stop.set()
@@ -0,0 +1,162 @@
+# Skompilowane szablony workflow
+"""
+templates.py
+"""
+
+"""
+Kompilacja szablonów ${...} używanych w wartościach kroków workflow.
+
+Szablon jest dzielony raz na listę segmentów: stałe fragmenty tekstu
+i odwołania ze wstępnie podzieloną ścieżką. Wartości bez odwołań są
+oznaczane jako statyczne i nie są w ogóle interpolowane.
+"""
+
+import json
+import re
+from collections import namedtuple
+from functools import lru_cache
+from .payloads import json_default
+
+# Odwołanie w tekście, np. ${inputs.name}
+PLACEHOLDER_PATTERN = re.compile(r'\$\{([^}]+)\}')
+
+# Rozmiar pamięci podręcznej skompilowanych szablonów i ścieżek
+TEMPLATE_CACHE_SIZE = 4096
+
+# Skompilowane wartości kroku: krotka (metoda, wartość, szablon lub None),
+# ścieżka danych wejściowych (lub None) oraz definicja kroku i lista metod, z których powstały
+StepTemplates = namedtuple('StepTemplates', ['methods', 'input_path', 'step', 'methods_def'])
+
+
+class PathAccessor:
+    """Wstępnie podzielona ścieżka do wartości w kontekście, np. steps.fetch.output."""
+
+    __slots__ = ('path', 'parts')
+
+    def __init__(self, path):
+        self.path = path
+        # Indeks listy jest wyliczany raz, przy kompilacji
+        self.parts = tuple(
+            (part, int(part) if part.isdigit() else None)
+            for part in path.split('.')
+        )
+
+    def resolve(self, context):
+        """Zwraca wartość ścieżki w kontekście."""
+        current = context
+
+        for key, index in self.parts:
+            if isinstance(current, dict) and key in current:
+                current = current[key]
+            elif index is not None and isinstance(current, list):
+                current = current[index]
+            else:
+                raise ValueError(f"Cannot resolve path: {self.path}")
+
+        return current
+
+
+class Template:
+    """Tekst z odwołaniami ${...} podzielony na segmenty."""
+
+    __slots__ = ('source', 'segments', 'is_static')
+
+    def __init__(self, source):
+        self.source = source
+        segments = []
+        position = 0
+
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            if match.start() > position:
+                segments.append(source[position:match.start()])
+
+            # Para (ścieżka, oryginalny tekst) - tekst zostaje, gdy ścieżki nie da się rozwiązać
+            segments.append((PathAccessor(match.group(1).strip()), match.group(0)))
+            position = match.end()
+
+        if position < len(source):
+            segments.append(source[position:])
+
+        self.segments = tuple(segments)
+        self.is_static = all(isinstance(segment, str) for segment in segments)
+
+    def render(self, context):
+        """Zwraca tekst z podstawionymi wartościami (słowniki i listy jako JSON)."""
+        if self.is_static:
+            return self.source
+
+        parts = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
+
+            accessor, original = segment
+            try:
+                value = accessor.resolve(context)
+            except Exception:
+                parts.append(original)
+                continue
+
+            if isinstance(value, (dict, list)):
+                parts.append(json.dumps(value, default=json_default))
+            else:
+                parts.append(str(value))
+
+        return ''.join(parts)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(text):
+    """Zwraca skompilowany szablon tekstu."""
+    return Template(text)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_path(path_expr):
+    """
+    Kompiluje wyrażenie ścieżki ${...}.
+
+    Returns:
+        PathAccessor lub None, jeśli tekst nie jest wyrażeniem ścieżki
+    """
+    if not path_expr.startswith('${') or not path_expr.endswith('}'):
+        return None
+
+    return PathAccessor(path_expr[2:-1].strip())
+
+
+def compile_step(step):
+    """
+    Kompiluje wartości metod i dane wejściowe kroku.
+
+    Args:
+        step: Definicja kroku z YAML
+
+    Returns:
+        StepTemplates: Skompilowane wartości kroku
+    """
+    methods = []
+
+    for method in step.get('methods', []):
+        method_name = method.get('name')
+        method_value = method.get('value')
+
+        if not method_name:
+            continue
+
+        template = None
+        if isinstance(method_value, str):
+            template = compile_template(method_value)
+            # Wartości bez odwołań nie wymagają interpolacji
+            if template.is_static:
+                template = None
+
+        methods.append((method_name, method_value, template))
+
+    input_path = None
+    input_value = step.get('input')
+    if isinstance(input_value, str):
+        input_path = compile_path(input_value)
+
+    return StepTemplates(tuple(methods), input_path, step, step.get('methods'))
@@ -0,0 +1,215 @@
+# Śledzenie wykonania kroków
+"""
+tracing.py
+"""
+
+"""
+Rejestrowanie przebiegu wykonania kroków (spanów).
+
+Dla każdego wykonania kroku silnik zapisuje span: czas oczekiwania w kolejce,
+czas przygotowania parametrów, czas wykonania adaptera, rozmiar wyniku,
+wynik pamięci podręcznej i wątek wykonujący. Spany trafiają do kontekstu
+wykonania (lista słowników, więc kontekst pozostaje serializowalny do JSON)
+i mogą być wyeksportowane jako Chrome trace (chrome://tracing, Perfetto)
+lub wypisane jako tabela podsumowania.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+def output_size(output):
+    """Zwraca rozmiar wyniku: bajty, znaki lub liczbę elementów (None dla innych wartości)."""
+    if isinstance(output, (bytes, bytearray, str, list, tuple, dict, set)):
+        return len(output)
+    # Tablice numpy, memoryview i uchwyty dużych danych (core/payloads.py)
+    nbytes = getattr(output, 'nbytes', None)
+    return nbytes if isinstance(nbytes, int) else None
+
+
+class StepSpan:
+    """Pomiar jednego wykonania kroku."""
+
+    __slots__ = ('step_id', 'adapter', 'submitted', 'started', 'finished', 'phases', 'active',
+                 'worker', 'executor', 'cache', 'status', 'output_size', 'error')
+
+    def __init__(self, step_id, adapter=None):
+        self.step_id = step_id
+        self.adapter = adapter
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self.phases = {}
+        # Trwająca faza (nazwa, początek) - liczona też dla kroków przerwanych po terminie
+        self.active = None
+        self.worker = None
+        self.executor = None
+        self.cache = None
+        self.status = None
+        self.output_size = None
+        self.error = None
+
+    def start(self):
+        """Oznacza początek wykonania w wątku roboczym."""
+        self.started = time.perf_counter()
+        self.worker = threading.current_thread().name
+        return self
+
+    @contextmanager
+    def phase(self, name):
+        """Mierzy czas fazy kroku (sumowany przy wielokrotnym wejściu)."""
+        start = time.perf_counter()
+        self.active = (name, start)
+        try:
+            yield self
+        finally:
+            self.active = None
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def set_output(self, output):
+        """Zapisuje rozmiar wyniku kroku."""
+        self.output_size = output_size(output)
+
+    def finish(self, status, error=None):
+        """Kończy pomiar kroku."""
+        if self.finished is None:
+            self.finished = time.perf_counter()
+        self.status = status
+        if error is not None:
+            self.error = str(error)
+        return self
+
+    def to_dict(self, origin):
+        """
+        Zwraca span jako słownik z czasami w sekundach.
+
+        Args:
+            origin: Wartość time.perf_counter() na początku wykonania (czas zero spanów)
+        """
+        finished = self.finished if self.finished is not None else time.perf_counter()
+        started = self.started if self.started is not None else finished
+
+        phases = dict(self.phases)
+        active = self.active
+        if active is not None:
+            name, start = active
+            phases[name] = phases.get(name, 0.0) + max(0.0, finished - start)
+
+        return {
+            'step_id': self.step_id,
+            'adapter': self.adapter,
+            'status': self.status,
+            'start': started - origin,
+            'queue': started - self.submitted,
+            'resolve': phases.get('resolve', 0.0),
+            'execute': phases.get('execute', 0.0),
+            'duration': finished - started,
+            'output_size': self.output_size,
+            'cache': self.cache,
+            'worker': self.worker,
+            'executor': self.executor,
+            'error': self.error
+        }
+
+
+def to_chrome_trace(spans, run_id=None):
+    """
+    Konwertuje spany do formatu Chrome trace-event.
+
+    Każdy krok to zdarzenie 'X' na wątku, który go wykonał, z zagnieżdżonymi
+    fazami resolve i execute; oczekiwanie w kolejce jest osobnym zdarzeniem.
+
+    Returns:
+        dict: Dokument {'traceEvents': [...]} gotowy do zapisania jako JSON
+    """
+    events = []
+    thread_ids = {}
+
+    def thread_id(worker):
+        if worker not in thread_ids:
+            thread_ids[worker] = len(thread_ids) + 1
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': thread_ids[worker],
+                           'args': {'name': worker or 'unknown'}})
+        return thread_ids[worker]
+
+    for span in spans:
+        tid = thread_id(span.get('worker'))
+        start = span['start'] * 1e6
+        args = {key: span.get(key) for key in ('adapter', 'status', 'cache', 'output_size', 'executor', 'error')}
+
+        if span.get('queue'):
+            events.append({'name': f"{span['step_id']} (queue)", 'cat': 'queue', 'ph': 'X', 'pid': 1,
+                           'tid': tid, 'ts': start - span['queue'] * 1e6, 'dur': span['queue'] * 1e6})
+
+        events.append({'name': span['step_id'], 'cat': span.get('adapter') or 'step', 'ph': 'X', 'pid': 1,
+                       'tid': tid, 'ts': start, 'dur': span['duration'] * 1e6, 'args': args})
+
+        # Fazy są rysowane kolejno wewnątrz zdarzenia kroku
+        offset = start
+        for name in ('resolve', 'execute'):
+            if span.get(name):
+                events.append({'name': name, 'cat': name, 'ph': 'X', 'pid': 1, 'tid': tid,
+                               'ts': offset, 'dur': span[name] * 1e6})
+                offset += span[name] * 1e6
+
+    trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+    if run_id:
+        trace['otherData'] = {'run_id': run_id}
+    return trace
+
+
+def write_chrome_trace(spans, file_path, run_id=None):
+    """Zapisuje spany do pliku Chrome trace JSON."""
+    with open(file_path, 'w') as f:
+        json.dump(to_chrome_trace(spans, run_id), f)
+
+
+def summarize_adapters(spans):
+    """
+    Agreguje spany według adaptera.
+
+    Returns:
+        list: Wiersze {'adapter', 'calls', 'execute', 'share', 'cache_hits'} posortowane
+              malejąco według łącznego czasu wykonania
+    """
+    totals = {}
+    for span in spans:
+        row = totals.setdefault(span.get('adapter'), {'adapter': span.get('adapter'), 'calls': 0,
+                                                      'execute': 0.0, 'cache_hits': 0})
+        row['calls'] += 1
+        row['execute'] += span.get('execute') or 0.0
+        if span.get('cache') in ('hit', 'up_to_date'):
+            row['cache_hits'] += 1
+
+    total = sum(row['execute'] for row in totals.values()) or 1.0
+    for row in totals.values():
+        row['share'] = row['execute'] / total
+
+    return sorted(totals.values(), key=lambda row: row['execute'], reverse=True)
+
+
+def format_summary(spans):
+    """Zwraca tabelę podsumowania wykonania (kroki i adaptery) jako tekst."""
+    def ms(value):
+        return f"{value * 1000:.1f}" if value else '-'
+
+    lines = [f"{'step':<24} {'adapter':<14} {'status':<8} {'cache':<10} "
+             f"{'queue ms':>9} {'resolve ms':>10} {'execute ms':>10} {'total ms':>9} {'size':>8}  worker"]
+
+    for span in sorted(spans, key=lambda span: span['start']):
+        size = span.get('output_size')
+        lines.append(
+            f"{str(span['step_id']):<24} {str(span.get('adapter') or '-'):<14} {str(span.get('status') or '-'):<8} "
+            f"{str(span.get('cache') or '-'):<10} {ms(span.get('queue')):>9} {ms(span.get('resolve')):>10} "
+            f"{ms(span.get('execute')):>10} {ms(span.get('duration')):>9} {'-' if size is None else size:>8}  "
+            f"{span.get('worker') or '-'}"
+        )
+
+    lines.append('')
+    lines.append(f"{'adapter':<14} {'calls':>6} {'execute ms':>11} {'share':>7} {'cache hits':>11}")
+    for row in summarize_adapters(spans):
+        lines.append(f"{str(row['adapter'] or '-'):<14} {row['calls']:>6} {row['execute'] * 1000:>11.1f} "
+                     f"{row['share']:>7.1%} {row['cache_hits']:>11}")
+
+    return '\n'.join(lines)
@@ -5,19 +5,310 @@ workflow_engine.py
 
 # workflow_engine.py
 import yaml
-import json
 import time
 import os
 import re
-from adapters import ADAPTERS
-from dsl_parser import YamlDSLParser
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeoutError
+from adapters import ADAPTERS, ADAPTER_POOL
+from adapters.cancellation import CancellationToken, OperationCancelled, NEVER_CANCELLED, current_token, use_token
+from .process_executor import ProcessStepExecutor
+from .distributed import RemoteStepExecutor
+from .result_cache import ResultCache, DEFAULT_CACHE_DIR
+from .incremental import IncrementalState, DEFAULT_STATE_DIR
+from .checkpoint import CheckpointLog, DEFAULT_CHECKPOINT_DIR
+from .templates import compile_template, compile_path, compile_step
+from .expressions import compile_expression
+from .tracing import StepSpan
+from .payloads import PayloadStore
+from .singleflight import SingleFlight, allows_single_flight
+from .liveness import OutputLiveness
+from .workflow_registry import build_plan, step_references
+from .metrics import WORKFLOW_DURATION, WORKFLOW_RUNS, EXECUTIONS_IN_FLIGHT, observe_span
+
+# Domyślna liczba kroków wykonywanych równolegle przez silnik
+DEFAULT_MAX_PARALLEL = min(32, (os.cpu_count() or 1) + 4)
+
+# Dozwolone wartości atrybutu 'executor' kroku
+STEP_EXECUTORS = ('thread', 'process', 'remote')
+
+# Dane elementu kroku 'foreach' dostępne w szablonach: ${item}, ${index}
+FOREACH_ITEM_KEY = 'item'
+FOREACH_INDEX_KEY = 'index'
+
+
+class WorkflowRun:
+    """
+    Stan jednego wykonania workflow: graf gotowych kroków, kroki w toku i ich zakończenie.
+
+    Wspólny dla silnika wątkowego i asynchronicznego - silnik tylko uruchamia kroki
+    (Future lub zadanie asyncio, oba z metodami result() i cancel()) i czeka na nie.
+    """
+
+    def __init__(self, engine, workflow, context, incremental=False, log=None):
+        self.engine = engine
+        self.workflow = workflow
+        self.context = context
+        self.log = log
+        self.workflow_id = context['workflow_id']
+        self.state = IncrementalState.for_workflow(self.workflow_id, engine.state_dir) if incremental else None
+
+        self.plan = engine._get_plan(self.workflow_id, workflow)
+        self.pending_deps = dict(self.plan.pending)
+
+        # Kolejka kroków gotowych do wykonania (w kolejności z pliku YAML)
+        self.ready, self.executed = engine._initial_frontier(self.plan.steps_by_id, self.pending_deps,
+                                                             self.plan.dependents, context['steps'])
+        # Kroki w toku: uchwyt wykonania -> ID kroku (oraz token i span kroku)
+        self.running = {}
+        self.tokens = {}
+        self.spans = {}
+        self.finished = False
+
+        # Zwalnianie wyników bez czytelników i zrzut na dysk (opcjonalne, patrz core/liveness.py)
+        self.liveness = OutputLiveness.for_workflow(workflow, self.plan, context, engine.payloads,
+                                                    running=lambda: list(self.running.values()))
+        self.origin = time.perf_counter()
+
+        # Termin całego workflow - anuluje też tokeny wszystkich kroków
+        self.run_token = engine._create_run_token(workflow)
+
+        EXECUTIONS_IN_FLIGHT.inc(kind='workflow')
+
+    @property
+    def active(self):
+        """Czy są kroki gotowe do uruchomienia lub w toku."""
+        return bool(self.ready or self.running)
+
+    def check_deadline(self):
+        """Przerywa wykonanie po terminie workflow."""
+        if self.run_token.cancelled:
+            raise RuntimeError(f"Workflow {self.workflow_id} exceeded its deadline")
+
+    def launchable(self, limit):
+        """
+        Zwraca kolejne kroki (ID, definicja) do uruchomienia aż do osiągnięcia limitu równoległości.
+
+        Kroki z niespełnionym warunkiem są oznaczane jako pominięte bez uruchamiania.
+        """
+        while self.ready and len(self.running) < limit:
+            step_id = self.ready.popleft()
+            step = self.plan.steps_by_id[step_id]
+
+            # Sprawdź warunek
+            condition = step.get('condition')
+            if condition and not self.engine._evaluate_condition(condition, self.step_context(step_id),
+                                                                 self.plan.conditions.get(step_id)):
+                # Oznacz krok jako wykonany, ale pomijamy jego faktyczne wykonanie
+                self.engine._complete_step(self.context, self.log, step_id, {'skipped': True})
+                self.record_span(StepSpan(step_id, step.get('adapter')).finish('skipped'))
+                self.mark_executed(step_id)
+                continue
+
+            yield step_id, step
+
+    def step_context(self, step_id):
+        """
+        Zwraca kontekst uruchamianego kroku.
+
+        Krok dostaje migawkę wyników jedynie kroków, od których zależy (plan.reads) -
+        koordynator dopisuje kolejne wyniki, a kopia wszystkich byłaby kosztem O(n) na krok.
+        Odciski tych kroków tworzą też odcisk kroku przy wykonaniu przyrostowym.
+        """
+        steps = self.context['steps']
+        return dict(self.context, steps={source: steps[source] for source in self.plan.reads.get(step_id, ())
+                                         if source in steps})
+
+    def step_token(self, step):
+        """Zwraca token anulowania i span dla uruchamianego kroku."""
+        return self.engine._create_step_token(step, self.run_token), StepSpan(step['id'], step.get('adapter'))
+
+    def started(self, handle, step_id, token, span):
+        """Rejestruje uruchomiony krok."""
+        self.running[handle] = step_id
+        self.tokens[handle] = token
+        self.spans[handle] = span
+
+    def next_expiry(self):
+        """Zwraca czas do najbliższego terminu kroków w toku (None - brak terminów)."""
+        return self.engine._next_expiry(self.tokens.values())
+
+    def step_done(self, handle):
+        """Zapisuje wynik (lub błąd) zakończonego kroku."""
+        step_id = self.running.pop(handle)
+        self.tokens.pop(handle)
+        self.record_span(self.spans.pop(handle))
+
+        try:
+            self.engine._complete_step(self.context, self.log, step_id, handle.result())
+        except Exception as e:
+            self.fail_step(step_id, str(e))
+
+        self.mark_executed(step_id)
+
+    def expire_steps(self):
+        """Przerywa kroki po terminie - zwalniają miejsce od razu, bez czekania na adapter."""
+        for handle in [handle for handle in self.running if self.tokens[handle].cancelled]:
+            step_id = self.running.pop(handle)
+            token = self.tokens.pop(handle)
+            self.record_span(self.spans.pop(handle).finish('timeout', token.reason))
+            self._abandon(handle)
+            self.fail_step(step_id, token.reason)
+            self.mark_executed(step_id)
+
+    def _abandon(self, handle):
+        """Anuluje krok w toku; uchwyty wyniku, który mimo to nadejdzie, są zwalniane."""
+        handle.cancel()
+        handle.add_done_callback(self._discard_late_record)
+
+    def _discard_late_record(self, handle):
+        if handle.cancelled() or handle.exception() is not None:
+            return
+        self.engine.payloads.discard(handle.result().get('output'))
+
+    def record_span(self, span):
+        span = span.to_dict(self.origin)
+        self.context['trace'].append(span)
+        observe_span(span)
+
+    def mark_executed(self, step_id):
+        self.executed.add(step_id)
+        for dependent in self.plan.dependents[step_id]:
+            self.pending_deps[dependent] -= 1
+            if self.pending_deps[dependent] == 0 and dependent not in self.executed:
+                self.ready.append(dependent)
+        if self.liveness is not None:
+            self.liveness.step_finished(step_id)
+
+    def fail_step(self, step_id, error):
+        self.context['steps'][step_id] = {'error': error, 'success': False}
+        if self.state is not None:
+            self.state.forget(step_id)
+
+        # Opcjonalnie, możemy przerwać całe wykonanie przy błędzie
+        if not self.workflow.get('continue_on_error', False):
+            raise RuntimeError(f"Step {step_id} failed: {error}")
+
+    def close(self):
+        """Kończy wykonanie (także po błędzie): anuluje kroki w toku, zapisuje stan i metryki."""
+        # Nie uruchamiaj kroków, które czekają jeszcze w puli,
+        # a działające poinformuj o anulowaniu
+        for handle in self.running:
+            self._abandon(handle)
+            self.tokens[handle].cancel("Workflow aborted")
+
+        # Zapisz odciski także po błędzie - udane kroki nie wykonają się ponownie
+        if self.state is not None:
+            self.state.save()
+
+        status = 'completed' if self.finished else 'failed'
+        if self.log is not None:
+            self.log.finish(status)
+
+        if self.liveness is not None:
+            self.context['memory'] = self.liveness.close()
+
+        # Zwolnij uchwyty wykonania - wynik workflow zawiera same dane
+        self.context['steps'] = self.engine.payloads.finalize(self.context['steps'])
+
+        EXECUTIONS_IN_FLIGHT.dec(kind='workflow')
+        WORKFLOW_DURATION.observe(time.perf_counter() - self.origin, workflow=self.workflow_id)
+        WORKFLOW_RUNS.inc(workflow=self.workflow_id, status=status)
+
+    def result(self):
+        """Zwraca kontekst zakończonego wykonania z przetworzonymi wynikami workflow."""
+        # Jeśli nie wszystkie kroki zostały wykonane,
+        # mamy cykl zależności lub brakujące zależności
+        if len(self.executed) != len(self.plan.steps_by_id):
+            remaining = set(self.plan.steps_by_id) - self.executed
+            raise ValueError(f"Cannot resolve dependencies for steps: {remaining}")
+
+        # Przygotowanie wyników
+        self.engine._process_outputs(self.workflow.get('outputs', []), self.context)
+
+        return self.context
 
 
 class WorkflowEngine:
     """Silnik wykonujący workflow zdefiniowany w YAML."""
 
-    def __init__(self):
+    def __init__(self, max_parallel=None, max_processes=None, result_cache=None,
+                 state_dir=DEFAULT_STATE_DIR, checkpoint_dir=DEFAULT_CHECKPOINT_DIR, broker=None,
+                 cache_dir=DEFAULT_CACHE_DIR):
         self.workflows = {}
+        # Skompilowane plany workflow: {workflow_id: WorkflowPlan}
+        self.plans = {}
+        # Skompilowane szablony kroków: {workflow_id: {step_id: StepTemplates}}
+        self.step_templates = {}
+        self.max_parallel = max_parallel or DEFAULT_MAX_PARALLEL
+        self._executor = None
+        # Osobna pula dla elementów kroków 'foreach' - krok czekający na elementy
+        # nie może blokować wątków, na których te elementy miałyby się wykonać
+        self._foreach_executor = None
+        self._executor_lock = threading.Lock()
+        # Pula procesów dla kroków z 'executor: process'
+        self.process_executor = ProcessStepExecutor(max_processes)
+        # Koordynator kroków z 'executor: remote' wykonywanych przez węzły robocze (core/distributed.py)
+        self.remote_executor = RemoteStepExecutor(broker) if broker is not None else None
+        # Pamięć podręczna wyników kroków z 'cache: true' i adapterów deterministycznych
+        # (poziom dyskowy w cache_dir, None - tylko pamięć)
+        self.result_cache = result_cache or ResultCache(disk_dir=cache_dir)
+        # Identyczne kroki wykonywane w tym samym czasie współdzielą jedno wykonanie adaptera
+        self.step_flights = SingleFlight('step')
+        # Duże dane binarne przekazywane między krokami przez uchwyty (core/payloads.py)
+        self.payloads = PayloadStore()
+        # Katalog odcisków kroków dla wykonania przyrostowego
+        self.state_dir = state_dir
+        # Katalog dzienników punktów kontrolnych (wznawianie wykonania)
+        self.checkpoint_dir = checkpoint_dir
+
+    def _get_executor(self):
+        """Zwraca współdzieloną pulę wątków silnika (tworzoną leniwie)."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_parallel,
+                    thread_name_prefix='workflow-step'
+                )
+            return self._executor
+
+    def _get_foreach_executor(self):
+        """Zwraca pulę wątków dla elementów kroków 'foreach' (tworzoną leniwie)."""
+        with self._executor_lock:
+            if self._foreach_executor is None:
+                self._foreach_executor = ThreadPoolExecutor(
+                    max_workers=self.max_parallel,
+                    thread_name_prefix='workflow-foreach'
+                )
+            return self._foreach_executor
+
+    def _get_parallel_limit(self, workflow):
+        """Zwraca limit równoległych kroków dla workflow (nie większy niż limit silnika)."""
+        limit = workflow.get('max_parallel') or self.max_parallel
+        return max(1, min(int(limit), self.max_parallel))
+
+    def queue_depth(self):
+        """Zwraca liczbę kroków i elementów 'foreach' czekających na wolny wątek."""
+        depth = 0
+        for executor in (self._executor, self._foreach_executor):
+            if executor is not None:
+                depth += executor._work_queue.qsize()
+        return depth
+
+    def shutdown(self, wait=True):
+        """Zamyka pule wątków i procesów silnika."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+            if self._foreach_executor is not None:
+                self._foreach_executor.shutdown(wait=wait)
+                self._foreach_executor = None
+        self.process_executor.shutdown(wait=wait)
+        if self.remote_executor is not None:
+            self.remote_executor.shutdown(wait=wait)
 
     def load_workflow(self, yaml_path):
         """Ładuje workflow z pliku YAML."""
@@ -29,84 +320,198 @@ class WorkflowEngine:
                 raise ValueError(f"Invalid workflow file: {yaml_path}")
 
             workflow_id = os.path.splitext(os.path.basename(yaml_path))[0]
-            self.workflows[workflow_id] = config['workflow']
+
+            # Graf, szablony ${...} i warunki kompilujemy raz, przy ładowaniu;
+            # poprzednia wersja workflow działa aż do podmiany planu
+            plan = self.compile_plan(workflow_id, config['workflow'])
+
+            self.plans[workflow_id] = plan
+            self.step_templates[workflow_id] = dict(plan.templates)
+            self.workflows[workflow_id] = plan.definition
 
             return workflow_id
         except Exception as e:
             raise ValueError(f"Error loading workflow: {e}")
 
-    def execute_workflow(self, workflow_id, inputs=None):
-        """Wykonuje workflow o podanym ID."""
+    def unload_workflow(self, workflow_id):
+        """Usuwa workflow (trwające wykonania kończą się normalnie)."""
+        self.workflows.pop(workflow_id, None)
+        self.plans.pop(workflow_id, None)
+        self.step_templates.pop(workflow_id, None)
+
+    def compile_plan(self, workflow_id, workflow):
+        """Kompiluje definicję workflow do niezmiennego planu (core/workflow_registry.py)."""
+        return build_plan(workflow_id, workflow, self._build_dependency_graph(workflow.get('steps', [])))
+
+    def _get_plan(self, workflow_id, workflow):
+        """Zwraca plan wykonywanej definicji workflow (kompilując ją, jeśli nie była załadowana)."""
+        plan = self.plans.get(workflow_id)
+
+        # Definicja mogła zostać podmieniona (przeładowanie) lub zmieniona po załadowaniu
+        if plan is None or plan.definition is not workflow:
+            plan = self.compile_plan(workflow_id, workflow)
+
+        return plan
+
+    def execute_workflow(self, workflow_id, inputs=None, incremental=False, checkpoint=None, run_id=None):
+        """
+        Wykonuje workflow o podanym ID.
+
+        Przy incremental=True pomijane są kroki, których odcisk (dane wejściowe,
+        parametry, pliki 'input_files'/'output_files' i odciski kroków nadrzędnych)
+        nie zmienił się od poprzedniego wykonania - ich wynik jest odtwarzany z zapisu.
+
+        Przy checkpoint=True (lub 'checkpoint: true' w workflow) wyniki zakończonych
+        kroków są dopisywane do dziennika data/checkpoints/<run_id>.log,
+        a przerwane wykonanie można dokończyć metodą resume(run_id). Podanie run_id
+        pozwala poznać identyfikator uruchomienia przed jego ewentualnym przerwaniem.
+        """
+        workflow, context, log = self._start_run(workflow_id, inputs, checkpoint, run_id)
+        return self._execute(workflow, context, incremental, log)
+
+    def resume(self, run_id, incremental=False):
+        """
+        Wznawia przerwane wykonanie workflow z dziennika punktów kontrolnych.
+
+        Kroki zakończone przed przerwaniem nie są wykonywane ponownie.
+        Workflow musi być wcześniej załadowany (load_workflow).
+        """
+        workflow, context, log = self._resume_run(run_id)
+        return self._execute(workflow, context, incremental, log)
+
+    def _get_workflow(self, workflow_id):
+        """Zwraca definicję załadowanego workflow."""
         if workflow_id not in self.workflows:
             raise ValueError(f"Workflow not found: {workflow_id}")
 
-        workflow = self.workflows[workflow_id]
+        return self.workflows[workflow_id]
+
+    def _start_run(self, workflow_id, inputs=None, checkpoint=None, run_id=None):
+        """
+        Przygotowuje nowe uruchomienie workflow.
+
+        Returns:
+            tuple: (definicja workflow, kontekst, dziennik punktów kontrolnych lub None)
+        """
+        workflow = self._get_workflow(workflow_id)
 
         # Kontekst wykonania
-        context = {
-            'inputs': self._process_inputs(workflow.get('inputs', []), inputs or {}),
-            'steps': {},
-            'outputs': {},
-            'timestamp': int(time.time()),
-            'workflow_id': workflow_id
-        }
+        context = self._create_context(workflow_id, workflow, inputs, run_id=run_id)
 
-        # Zbuduj graf zależności
-        dependency_graph = self._build_dependency_graph(workflow.get('steps', []))
+        if checkpoint is None:
+            checkpoint = workflow.get('checkpoint', False)
 
-        # Wykonanie kroków w odpowiedniej kolejności
-        executed_steps = set()
-        all_steps = set(step['id'] for step in workflow.get('steps', []))
+        log = None
+        if checkpoint:
+            log = CheckpointLog(context['run_id'], self.checkpoint_dir)
+            log.start(workflow_id, inputs or {}, context['timestamp'])
 
-        while executed_steps != all_steps:
-            progress_made = False
+        return workflow, context, log
 
-            for step in workflow.get('steps', []):
-                step_id = step['id']
+    def _resume_run(self, run_id):
+        """
+        Odtwarza kontekst przerwanego uruchomienia z dziennika.
 
-                # Sprawdź czy krok został już wykonany
-                if step_id in executed_steps:
-                    continue
+        Returns:
+            tuple: (definicja workflow, kontekst, dziennik punktów kontrolnych)
+        """
+        log = CheckpointLog(run_id, self.checkpoint_dir)
+        header, completed, _ = log.load()
 
-                # Sprawdź czy wszystkie zależności zostały wykonane
-                dependencies = dependency_graph.get(step_id, [])
-                if not all(dep in executed_steps for dep in dependencies):
-                    continue
+        if header is None:
+            raise ValueError(f"Checkpoint not found: {run_id}")
+
+        workflow_id = header['workflow_id']
+        workflow = self._get_workflow(workflow_id)
+
+        context = self._create_context(workflow_id, workflow, header['inputs'],
+                                       run_id=run_id, timestamp=header['timestamp'])
+
+        # Przywróć wyniki kroków, które nadal istnieją w definicji workflow
+        step_ids = {step['id'] for step in workflow.get('steps', [])}
+        context['steps'].update(
+            (step_id, record) for step_id, record in completed.items() if step_id in step_ids
+        )
+
+        log.reopen()
+        return workflow, context, log
+
+    def _execute(self, workflow, context, incremental=False, log=None):
+        """Wykonuje kroki workflow w przygotowanym kontekście."""
+        run = WorkflowRun(self, workflow, context, incremental, log)
+        limit = self._get_parallel_limit(workflow)
+        executor = self._get_executor()
+
+        try:
+            while run.active:
+                run.check_deadline()
+
+                # Uruchom gotowe kroki aż do osiągnięcia limitu równoległości
+                for step_id, step in run.launchable(limit):
+                    token, span = run.step_token(step)
+                    future = executor.submit(self._run_step_with_token, token, step, run.step_context(step_id),
+                                             run.state, span)
+                    run.started(future, step_id, token, span)
 
-                # Sprawdź warunek
-                condition = step.get('condition')
-                if condition and not self._evaluate_condition(condition, context):
-                    # Oznacz krok jako wykonany, ale pomijamy jego faktyczne wykonanie
-                    executed_steps.add(step_id)
-                    context['steps'][step_id] = {'skipped': True}
-                    progress_made = True
+                if not run.running:
                     continue
 
-                # Wykonaj krok
-                try:
-                    result = self._execute_step(step, context)
-                    context['steps'][step_id] = {'output': result, 'success': True}
-                    executed_steps.add(step_id)
-                    progress_made = True
-                except Exception as e:
-                    context['steps'][step_id] = {'error': str(e), 'success': False}
-                    executed_steps.add(step_id)
-                    progress_made = True
-
-                    # Opcjonalnie, możemy przerwać całe wykonanie przy błędzie
-                    if not workflow.get('continue_on_error', False):
-                        raise RuntimeError(f"Step {step_id} failed: {e}")
-
-            # Jeśli nie było postępu, a nie wszystkie kroki zostały wykonane,
-            # mamy cykl zależności lub brakujące zależności
-            if not progress_made and executed_steps != all_steps:
-                remaining = all_steps - executed_steps
-                raise ValueError(f"Cannot resolve dependencies for steps: {remaining}")
+                done, _ = wait(run.running, timeout=run.next_expiry(), return_when=FIRST_COMPLETED)
 
-        # Przygotowanie wyników
-        self._process_outputs(workflow.get('outputs', []), context)
+                for future in done:
+                    run.step_done(future)
+
+                run.expire_steps()
+
+            run.finished = True
+        finally:
+            run.close()
+
+        return run.result()
+
+    def _complete_step(self, context, log, step_id, record):
+        """Zapisuje wpis zakończonego kroku w kontekście i dzienniku punktów kontrolnych."""
+        context['steps'][step_id] = record
+
+        if log is not None:
+            log.append_step(step_id, record)
+
+    def _create_context(self, workflow_id, workflow, inputs=None, run_id=None, timestamp=None):
+        """Tworzy kontekst wykonania workflow."""
+        return {
+            'inputs': self._process_inputs(workflow.get('inputs', []), inputs or {}),
+            'steps': {},
+            'outputs': {},
+            'timestamp': timestamp or int(time.time()),
+            'workflow_id': workflow_id,
+            'run_id': run_id or uuid.uuid4().hex,
+            # Spany wykonanych kroków (core/tracing.py)
+            'trace': []
+        }
+
+    def _initial_frontier(self, steps_by_id, pending_deps, dependents, completed):
+        """
+        Wyznacza kroki gotowe do wykonania, uwzględniając kroki już zakończone.
+
+        Returns:
+            tuple: (kolejka gotowych kroków, zbiór zakończonych kroków)
+        """
+        executed_steps = set()
+
+        for step_id in completed:
+            if step_id not in steps_by_id:
+                continue
 
-        return context
+            executed_steps.add(step_id)
+            for dependent in dependents[step_id]:
+                pending_deps[dependent] -= 1
+
+        ready = deque(
+            step_id for step_id in steps_by_id
+            if pending_deps[step_id] == 0 and step_id not in executed_steps
+        )
+
+        return ready, executed_steps
 
     def _process_inputs(self, input_specs, provided_inputs):
         """Przetwarza dane wejściowe na podstawie specyfikacji."""
@@ -139,7 +544,13 @@ class WorkflowEngine:
             if isinstance(dependencies, str):
                 dependencies = [dependencies]
 
-            graph[step_id] = dependencies
+            graph[step_id] = list(dependencies)
+
+        # Odwołania do wyników (${steps.<id>}, steps.<id> w warunkach, także w zagnieżdżonych
+        # wartościach) są niejawnymi zależnościami - bez nich kroki wykonywane równolegle
+        # mogłyby czytać brakujące wyniki
+        for step_id, references in step_references(steps).items():
+            graph[step_id].extend(sorted(references - set(graph[step_id])))
 
         # Sprawdź, czy nie ma cykli zależności
         visited = set()
@@ -167,60 +578,384 @@ class WorkflowEngine:
 
         return graph
 
-    def _evaluate_condition(self, condition, context):
-        """Ewaluuje warunek z interpolacją zmiennych."""
+    def _evaluate_condition(self, condition, context, compiled=None):
+        """Oblicza warunek skompilowanym wyrażeniem (bez eval); compiled - wyrażenie z planu workflow."""
         # Jeśli warunek jest już wartością logiczną
-        if isinstance(condition, bool):
-            return condition
+        if not isinstance(condition, str):
+            return bool(condition)
 
-        # Interpoluj zmienne w warunku
-        interpolated_condition = self._interpolate_string(condition, context)
-
-        # Ewaluuj warunek
         try:
-            # Bezpieczniejsza ewaluacja
-            result = eval(interpolated_condition, {"__builtins__": {}}, context)
-            return bool(result)
+            return bool((compiled or compile_expression(condition))(context))
         except Exception as e:
             raise ValueError(f"Error evaluating condition '{condition}': {e}")
 
-    def _execute_step(self, step, context):
-        """Wykonuje pojedynczy krok workflow."""
+    def _get_step_adapter(self, step):
+        """Sprawdza krok i zwraca parę (nazwa adaptera, rodzaj executora)."""
         adapter_name = step.get('adapter')
-        methods = step.get('methods', [])
+        executor = step.get('executor', 'thread')
 
         if not adapter_name or adapter_name not in ADAPTERS:
             raise ValueError(f"Unknown adapter: {adapter_name}")
 
-        # Pobierz adapter
-        adapter = ADAPTERS[adapter_name]
-        adapter.reset()
+        if executor not in STEP_EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}' for step {step.get('id')}")
+
+        if executor == 'remote' and self.remote_executor is None:
+            raise ValueError(f"Step {step.get('id')} uses executor 'remote', but the engine has no broker")
+
+        return adapter_name, executor
+
+    def _prepare_step(self, step, context, state=None):
+        """
+        Przygotowuje wywołanie kroku.
+
+        Returns:
+            tuple: (słownik wywołania, gotowy wpis kroku lub None jeśli trzeba wykonać adapter)
+        """
+        adapter_name, executor = self._get_step_adapter(step)
+
+        call = {
+            'adapter': adapter_name,
+            'executor': executor,
+            # Przygotuj dane wejściowe
+            'input': self._resolve_input_data(step, context),
+            # Interpoluj zmienne w wartościach metod
+            'methods': self._resolve_methods(step, context),
+            # Wymagane znaczniki lokalności węzła roboczego (executor: remote)
+            'locality': step.get('locality'),
+            'cache_key': None,
+            'fingerprint': None,
+            'output_files': []
+        }
 
-        # Przygotuj dane wejściowe
-        input_data = self._resolve_input_data(step, context)
+        if state is not None:
+            input_files = self._resolve_files(step.get('input_files'), context)
+            call['output_files'] = self._resolve_files(step.get('output_files'), context)
+
+            # Kontekst kroku zawiera wyniki dokładnie tych kroków, które krok czyta (plan.reads)
+            upstream = [
+                (dep, context['steps'][dep].get('fingerprint'))
+                for dep in sorted(context['steps'])
+            ]
+            call['fingerprint'] = state.step_fingerprint(
+                adapter_name, call['methods'], call['input'], upstream, input_files
+            )
+
+            up_to_date, output = state.lookup(step['id'], call['fingerprint'])
+            if up_to_date:
+                output = self.payloads.wrap(output)
+                return call, {'output': output, 'success': True, 'up_to_date': True,
+                              'fingerprint': call['fingerprint']}
+
+        # Dane bez odcisku (core/fingerprint.py) nie mają klucza - wynik nie jest zapamiętywany
+        if self._is_cacheable(step, adapter_name):
+            call['cache_key'] = self.result_cache.make_key(adapter_name, call['methods'], call['input'])
+
+        if call['cache_key'] is not None:
+            hit, output = self.result_cache.get(call['cache_key'])
+            if hit:
+                record = {'output': output, 'success': True, 'cached': True}
+                return call, self._finish_step(step, call, output, state, record)
+
+        return call, None
+
+    def _finish_step(self, step, call, output, state=None, record=None):
+        """Zapisuje wynik wykonanego kroku (pamięć podręczna, odciski) i zwraca wpis kroku."""
+        # Duże dane zostają w kontekście jako uchwyty (zapis trwały przechowuje same dane)
+        output = self.payloads.wrap(output)
+
+        if record is None:
+            record = {'output': output, 'success': True}
+
+            if call['cache_key'] is not None:
+                self.result_cache.put(call['cache_key'], output)
+                record['cached'] = False
+        else:
+            record['output'] = output
+
+        if state is not None:
+            state.record(step['id'], call['fingerprint'], output, call['output_files'])
+            record['fingerprint'] = call['fingerprint']
+
+        return record
+
+    def _create_run_token(self, workflow):
+        """
+        Tworzy token anulowania wykonania z terminem 'deadline' workflow (w sekundach).
+
+        Token dziedziczy anulowanie po tokenie bieżącego kontekstu (np. zadania z core/jobs.py).
+        """
+        deadline = workflow.get('deadline')
+        parent = current_token()
+        return CancellationToken(float(deadline) if deadline is not None else None,
+                                 parent=parent if parent is not NEVER_CANCELLED else None)
+
+    def _create_step_token(self, step, run_token):
+        """Tworzy token anulowania kroku z limitem 'timeout' kroku (w sekundach)."""
+        timeout = step.get('timeout')
+        return CancellationToken(float(timeout) if timeout is not None else None, parent=run_token)
+
+    @staticmethod
+    def _next_expiry(tokens):
+        """Zwraca czas do najbliższego terminu spośród tokenów (None - brak terminów)."""
+        remaining = [token.remaining() for token in tokens if token.deadline is not None]
+        return min(remaining) if remaining else None
+
+    def _run_step_with_token(self, token, step, context, state=None, span=None):
+        """Wykonuje krok z ustawionym tokenem anulowania."""
+        with use_token(token):
+            token.raise_if_cancelled()
+            return self._run_step(step, context, state, span)
+
+    def _run_step(self, step, context, state=None, span=None):
+        """Wykonuje krok (lub pobiera jego wynik z zapisu) i zwraca wpis kroku."""
+        span = (span or StepSpan(step['id'], step.get('adapter'))).start()
 
-        # Zastosuj metody
-        for method in methods:
-            method_name = method.get('name')
-            method_value = method.get('value')
+        try:
+            record = self._run_step_traced(step, context, state, span)
+        except Exception as e:
+            span.finish('error', e)
+            raise
+
+        span.finish('ok')
+        return record
+
+    def _run_step_traced(self, step, context, state, span):
+        """Wykonuje krok, zapisując czasy faz w spanie."""
+        if 'foreach' in step:
+            with span.phase('execute'):
+                record = self._run_foreach(step, context)
+            span.set_output(record['output'])
+            return record
+
+        with span.phase('resolve'):
+            call, record = self._prepare_step(step, context, state)
+        span.executor = call['executor']
+
+        if record is not None:
+            span.cache = 'up_to_date' if record.get('up_to_date') else 'hit'
+            span.set_output(record['output'])
+            return record
+
+        with span.phase('execute'):
+            output = self._call_step_adapter(step, call)
+
+        record = self._finish_step(step, call, output, state)
+        span.cache = 'miss' if 'cached' in record else None
+        span.set_output(output)
+        return record
+
+    def _run_foreach(self, step, context):
+        """
+        Wykonuje adapter kroku dla każdego elementu listy 'foreach'.
+
+        Najwyżej 'concurrency' elementów działa równolegle, wyniki zachowują
+        kolejność elementów. Przy 'allow_partial: true' błędy elementów są
+        zbierane w 'errors' (a ich wyniki to None), w przeciwnym razie
+        pierwszy błąd przerywa krok.
+        """
+        items = self._resolve_foreach_items(step, context)
+        limit = self._get_foreach_limit(step, len(items))
+        allow_partial = step.get('allow_partial', False)
+        executor = self._get_foreach_executor()
+
+        results = [None] * len(items)
+        errors = []
+        pending = deque(enumerate(items))
+        running = {}
+        # Elementy dziedziczą token kroku
+        token = current_token()
 
-            if not method_name:
-                continue
+        try:
+            while pending or running:
+                token.raise_if_cancelled()
+
+                while pending and len(running) < limit:
+                    index, item = pending.popleft()
+                    item_context = dict(context, **{FOREACH_ITEM_KEY: item, FOREACH_INDEX_KEY: index})
+                    future = executor.submit(self._run_foreach_item, step, item_context, token)
+                    running[future] = index
+
+                done, _ = wait(running, timeout=token.remaining(), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        if not allow_partial:
+                            raise RuntimeError(f"Item {index} failed: {e}")
+                        errors.append({'index': index, 'error': str(e)})
+        finally:
+            for future in running:
+                future.cancel()
+
+        errors.sort(key=lambda error: error['index'])
+        return {'output': results, 'success': True, 'errors': errors, 'partial': bool(errors)}
+
+    def _run_foreach_item(self, step, context, token=None):
+        """Wykonuje krok 'foreach' dla jednego elementu i zwraca jego wynik."""
+        with use_token(token or current_token()):
+            call, record = self._prepare_step(step, context)
+            if record is not None:
+                return record['output']
+
+            output = self._call_step_adapter(step, call)
+            return self._finish_step(step, call, output)['output']
+
+    def _resolve_foreach_items(self, step, context):
+        """Zwraca listę elementów kroku 'foreach' (wartość lub odwołanie ${...})."""
+        items = self._resolve_path(step['foreach'], context)
+
+        if not isinstance(items, (list, tuple)):
+            raise ValueError(f"'foreach' of step {step['id']} must resolve to a list")
+
+        return list(items)
+
+    def _get_foreach_limit(self, step, item_count):
+        """Zwraca liczbę elementów 'foreach' wykonywanych równolegle."""
+        limit = step.get('concurrency') or self.max_parallel
+        return max(1, min(int(limit), self.max_parallel, item_count or 1))
 
-            # Interpoluj zmienne w wartości metody
-            if isinstance(method_value, str):
-                method_value = self._interpolate_string(method_value, context)
+    def _execute_step(self, step, context):
+        """Wykonuje pojedynczy krok workflow."""
+        return self._run_step(step, context)['output']
+
+    def _is_cacheable(self, step, adapter_name):
+        """Sprawdza, czy wynik kroku można zapamiętać ('cache' kroku lub deterministyczny adapter)."""
+        if 'cache' in step:
+            return bool(step['cache'])
 
-            # Wywołaj metodę
-            getattr(adapter, method_name)(method_value)
+        return getattr(ADAPTERS[adapter_name].__class__, 'deterministic', False)
 
-        # Wykonaj adapter
-        return adapter.execute(input_data)
+    def _step_flight_key(self, step, call):
+        """
+        Zwraca klucz łączenia równoczesnych wykonań kroku (None - krok wykonuje się samodzielnie).
+
+        Łączone są kroki z kluczem pamięci podręcznej (jednoczesne chybienia tego samego
+        wpisu) i kroki z 'coalesce: true'. Łączenie wyłączają 'coalesce: false' kroku
+        i adaptery z single_flight = False.
+        """
+        coalesce = step.get('coalesce')
+        if coalesce is False or not allows_single_flight(ADAPTERS[call['adapter']].__class__):
+            return None
+
+        if call['cache_key'] is not None:
+            return call['cache_key']
+        if coalesce:
+            return self.result_cache.make_key(call['adapter'], call['methods'], call['input'])
+        return None
+
+    def _call_step_adapter(self, step, call):
+        """Wykonuje adapter kroku, łącząc identyczne równoczesne wykonania (core/singleflight.py)."""
+        key = self._step_flight_key(step, call)
+        if key is None:
+            return self._call_adapter(call['adapter'], call['executor'], call['methods'], call['input'],
+                                      call['locality'])
+
+        return self.step_flights.do(key, self._call_adapter_shared, call)
+
+    def _call_adapter_shared(self, call):
+        """Wykonuje adapter kroku dla kilku wykonań - wynik nie trzyma uchwytów żadnego z nich."""
+        output = self._call_adapter(call['adapter'], call['executor'], call['methods'], call['input'],
+                                    call['locality'])
+        return self.payloads.finalize(output)
+
+    def _call_adapter(self, adapter_name, executor, methods, input_data, locality=None):
+        """Konfiguruje i wykonuje adapter w wybranym executorze."""
+        # Kroki rozsyłane do węzłów roboczych - dane wejściowe są przesyłane jako same dane
+        if executor == 'remote':
+            token = current_token()
+            future = self.remote_executor.submit(adapter_name, methods, self.payloads.resolve(input_data),
+                                                 locality, token.remaining())
+            try:
+                return future.result(timeout=token.remaining())
+            except FutureTimeoutError:
+                future.cancel()
+                raise OperationCancelled(token.reason or "Deadline exceeded")
+
+        # Kroki CPU-bound trafiają do puli procesów
+        if executor == 'process':
+            future = self._submit_process_step(adapter_name, methods, input_data)
+            token = current_token()
+            try:
+                return self.payloads.adopt(future.result(timeout=token.remaining()))
+            except FutureTimeoutError:
+                self._abandon_process_step(future)
+                raise OperationCancelled(token.reason or "Deadline exceeded")
+
+        # Każdy krok dostaje własną instancję adaptera z puli
+        with ADAPTER_POOL.adapter(adapter_name) as adapter:
+            # Zastosuj metody
+            for method_name, method_value in methods:
+                getattr(adapter, method_name)(method_value)
+
+            # Wykonaj adapter (uchwyty zamienione na dane bez kopiowania)
+            return adapter.execute(self.payloads.resolve(input_data))
+
+    def _submit_process_step(self, adapter_name, methods, input_data):
+        """
+        Zleca krok procesowy - duże dane trafiają do procesu przez pamięć współdzieloną.
+
+        Segmenty tymczasowe danych wejściowych są zwalniane po zakończeniu procesu
+        roboczego, także gdy nikt nie czeka już na wynik kroku.
+        """
+        temporaries = []
+        try:
+            future = self.process_executor.submit(adapter_name, methods,
+                                                  self.payloads.share(input_data, temporaries))
+        except BaseException:
+            self.payloads.discard(temporaries)
+            raise
+
+        future.add_done_callback(lambda _: self.payloads.discard(temporaries))
+        return future
+
+    def _abandon_process_step(self, future):
+        """Anuluje krok procesowy po terminie; segmenty jego późnego wyniku zostaną usunięte."""
+        future.cancel()
+        future.add_done_callback(self._discard_process_output)
+
+    def _discard_process_output(self, future):
+        if not future.cancelled() and future.exception() is None:
+            self.payloads.discard(self.payloads.adopt(future.result()))
+
+    def _get_step_templates(self, step, context):
+        """Zwraca skompilowane szablony kroku (kompilując je, jeśli krok zmieniono po załadowaniu)."""
+        workflow_templates = self.step_templates.setdefault(context['workflow_id'], {})
+        templates = workflow_templates.get(step['id'])
+
+        if (templates is None or templates.step is not step
+                or templates.methods_def is not step.get('methods')):
+            templates = workflow_templates[step['id']] = compile_step(step)
+
+        return templates
+
+    def _resolve_methods(self, step, context):
+        """Zwraca listę par (metoda, wartość) kroku z zinterpolowanymi wartościami."""
+        return [
+            (method_name, method_value if template is None else template.render(context))
+            for method_name, method_value, template in self._get_step_templates(step, context).methods
+        ]
+
+    def _resolve_files(self, paths, context):
+        """Zwraca listę zinterpolowanych ścieżek plików z atrybutu kroku."""
+        if not paths:
+            return []
+
+        if isinstance(paths, str):
+            paths = [paths]
+
+        return [self._interpolate_string(str(path), context) for path in paths]
 
     def _resolve_input_data(self, step, context):
         """Rozwiązuje dane wejściowe dla kroku workflow."""
         # Domyślnie, użyj danych z poprzedniego kroku
         if 'input' not in step:
+            # Element kroku 'foreach' jest jego danymi wejściowymi
+            if 'foreach' in step and FOREACH_ITEM_KEY in context:
+                return context[FOREACH_ITEM_KEY]
+
             # Znajdź poprzedni krok na podstawie zależności
             depends_on = step.get('depends_on', [])
 
@@ -236,14 +971,13 @@ class WorkflowEngine:
             # W przeciwnym razie, zwróć None
             return None
 
-        # Jeśli podano bezpośrednio dane wejściowe
-        input_value = step['input']
-
         # Jeśli to referencja do wyniku innego kroku
-        if isinstance(input_value, str) and input_value.startswith('${'):
-            return self._resolve_path(input_value, context)
+        input_path = self._get_step_templates(step, context).input_path
+        if input_path is not None:
+            return input_path.resolve(context)
 
-        return input_value
+        # Dane wejściowe podane bezpośrednio
+        return step['input']
 
     def _process_outputs(self, output_specs, context):
         """Przetwarza wyniki workflow na podstawie specyfikacji."""
@@ -269,38 +1003,15 @@ class WorkflowEngine:
         if not isinstance(text, str):
             return text
 
-        # Znajdź wszystkie wystąpienia ${...}
-        pattern = r'\$\{([^}]+)\}'
-
-        def replace_var(match):
-            path = match.group(1)
-            try:
-                value = self._resolve_path(f"${{{path}}}", context)
-                if isinstance(value, (dict, list)):
-                    return json.dumps(value)
-                return str(value)
-            except Exception as e:
-                return f"${{{path}}}"
-
-        return re.sub(pattern, replace_var, text)
+        return compile_template(text).render(context)
 
     def _resolve_path(self, path_expr, context):
         """Rozwiązuje wyrażenie ścieżki ${...}."""
-        if not isinstance(path_expr, str) or not path_expr.startswith('${') or not path_expr.endswith('}'):
+        if not isinstance(path_expr, str):
             return path_expr
 
-        # Wyciągnij ścieżkę
-        path = path_expr[2:-1].strip()
-        parts = path.split('.')
-
-        # Rozwiąż ścieżkę
-        current = context
-        for part in parts:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
-            elif isinstance(current, list) and part.isdigit():
-                current = current[int(part)]
-            else:
-                raise ValueError(f"Cannot resolve path: {path}")
+        accessor = compile_path(path_expr)
+        if accessor is None:
+            return path_expr
 
-        return current
\ No newline at end of file
+        return accessor.resolve(context)
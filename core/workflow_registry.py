@@ -0,0 +1,304 @@
+# Rejestr skompilowanych workflow
+"""
+workflow_registry.py
+"""
+
+"""
+Skompilowane plany workflow i ich przeładowywanie bez restartu serwera.
+
+Plan powstaje raz, przy ładowaniu pliku YAML: graf zależności (sprawdzony
+pod kątem cykli), kolejność topologiczna, skompilowane szablony ${...},
+warunki kroków i żywotność wyników (którzy czytelnicy muszą się zakończyć,
+zanim wynik kroku można zwolnić - core/liveness.py). Wykonanie workflow
+kopiuje jedynie liczniki zależności, więc żądania nie płacą za budowę grafu.
+
+WorkflowRegistry sprawdza czasy modyfikacji plików w katalogu workflow
+i przeładowuje zmienione pliki. Nowy plan zastępuje poprzedni jednym
+przypisaniem - trwające wykonania kończą się na starym planie, a plik
+z błędem nie zastępuje działającej wersji.
+"""
+
+import os
+import re
+import threading
+from collections import namedtuple, deque
+from types import MappingProxyType
+from .templates import compile_step
+from .expressions import compile_expression
+
+# Rozszerzenia plików workflow
+WORKFLOW_EXTENSIONS = ('.yaml', '.yml')
+
+# Domyślny odstęp sprawdzania zmian w katalogu workflow (w sekundach)
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Odwołania do wyników kroków w szablonach i wyrażeniach: steps.<id> lub steps['<id>']
+OUTPUT_REFERENCE_PATTERN = re.compile(r"""\bsteps(?:\.([\w\-]+)|\[\s*['"]([^'"]+)['"]\s*\])""")
+
+# Odwołanie do całego słownika kroków (np. len(steps)) - krok może czytać dowolny wynik
+ALL_STEPS_PATTERN = re.compile(r'\bsteps\b(?!\s*[.\[])')
+
+# Klucze kroku, które nie są interpolowane ani obliczane - nie zawierają odwołań do wyników
+UNEVALUATED_STEP_KEYS = ('id', 'depends_on', 'description')
+
+# Niezmienny plan workflow: definicja, kroki wg ID, liczniki niespełnionych zależności,
+# kroki zależne, kolejność topologiczna, szablony kroków, skompilowane warunki oraz
+# dane żywotności wyników: kroki, których wyniki czyta krok, liczba czytelników wyniku
+# i kroki, których wyniki są potrzebne do końca (sekcja 'outputs')
+WorkflowPlan = namedtuple('WorkflowPlan', ['workflow_id', 'definition', 'steps_by_id', 'pending',
+                                           'dependents', 'order', 'templates', 'conditions',
+                                           'reads', 'readers', 'retained'])
+
+
+def topological_order(steps_by_id, pending, dependents):
+    """Zwraca kroki w kolejności topologicznej (przy remisie - w kolejności z pliku YAML)."""
+    remaining = dict(pending)
+    ready = deque(step_id for step_id in steps_by_id if remaining[step_id] == 0)
+    order = []
+
+    while ready:
+        step_id = ready.popleft()
+        order.append(step_id)
+        for dependent in dependents[step_id]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+
+    return tuple(order)
+
+
+def _referenced_steps(value, step_ids, all_steps=None):
+    """
+    Zwraca zbiór kroków, których wyniki mogą być czytane przez wartość (przeszukuje zagnieżdżone struktury).
+
+    Odwołanie do całego słownika kroków (np. len(steps)) oznacza kroki all_steps (domyślnie wszystkie).
+    """
+    if isinstance(value, str):
+        if 'steps' not in value:
+            return set()
+        references = {dotted or quoted for dotted, quoted in OUTPUT_REFERENCE_PATTERN.findall(value)} & step_ids
+        if ALL_STEPS_PATTERN.search(value):
+            references |= set(step_ids if all_steps is None else all_steps)
+        return references
+
+    references = set()
+    if isinstance(value, dict):
+        for item in value.values():
+            references |= _referenced_steps(item, step_ids, all_steps)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            references |= _referenced_steps(item, step_ids, all_steps)
+    return references
+
+
+def step_references(steps):
+    """
+    Wyznacza kroki, których wyniki czyta każdy krok przez odwołania w swoich wartościach.
+
+    Przeszukuje wszystkie wartości kroku (także zagnieżdżone wartości metod) - szablony
+    ${steps.<id>}, wyrażenia steps.<id> i steps['<id>']. Krok czytający cały słownik
+    kroków (np. len(steps)) czyta wyniki kroków wcześniejszych w pliku, tak jak przy
+    wykonaniu sekwencyjnym.
+
+    Returns:
+        dict: {step_id: zbiór ID kroków} (bez samego kroku)
+    """
+    step_ids = {step['id'] for step in steps}
+
+    references = {}
+    preceding = []
+    for step in steps:
+        step_id = step['id']
+        values = [value for key, value in step.items() if key not in UNEVALUATED_STEP_KEYS]
+        references[step_id] = _referenced_steps(values, step_ids, preceding) - {step_id}
+        preceding.append(step_id)
+
+    return references
+
+
+def output_liveness(steps, dependency_graph, output_specs):
+    """
+    Wyznacza, które kroki czytają wynik każdego kroku.
+
+    Krok czyta wyniki swoich zależności (także niejawne dane wejściowe z jedynej
+    zależności) i kroków, do których odwołują się jego wartości (step_references). Wynik można zwolnić, gdy zakończą się wszyscy jego
+    czytelnicy - chyba że odwołuje się do niego sekcja 'outputs'.
+
+    Returns:
+        tuple: (kroki czytane przez krok, liczba czytelników wyniku, kroki potrzebne do końca)
+    """
+    step_ids = {step['id'] for step in steps}
+    references = step_references(steps)
+
+    reads = {}
+    for step in steps:
+        step_id = step['id']
+        sources = (set(dependency_graph.get(step_id, [])) & step_ids) | references[step_id]
+        sources.discard(step_id)
+        reads[step_id] = tuple(sorted(sources))
+
+    readers = {step_id: 0 for step_id in step_ids}
+    for sources in reads.values():
+        for source in sources:
+            readers[source] += 1
+
+    retained = frozenset(_referenced_steps(output_specs, step_ids))
+    return reads, readers, retained
+
+
+def build_plan(workflow_id, workflow, dependency_graph):
+    """
+    Kompiluje workflow do niezmiennego planu.
+
+    Args:
+        workflow_id: Identyfikator workflow
+        workflow: Definicja workflow (sekcja 'workflow' pliku YAML)
+        dependency_graph: Graf zależności kroków {step_id: [zależności]} bez cykli
+
+    Returns:
+        WorkflowPlan: Plan workflow
+    """
+    steps = workflow.get('steps', [])
+    steps_by_id = {step['id']: step for step in steps}
+
+    # Liczniki niespełnionych zależności i listy kroków zależnych
+    pending = {}
+    dependents = {step_id: [] for step_id in steps_by_id}
+    for step_id in steps_by_id:
+        dependencies = set(dependency_graph.get(step_id, []))
+        pending[step_id] = len(dependencies)
+        for dep in dependencies:
+            if dep in dependents:
+                dependents[dep].append(step_id)
+
+    # Warunki kompilujemy przy ładowaniu - błąd składni odrzuca plik, a nie żądanie
+    conditions = {}
+    for step in steps:
+        condition = step.get('condition')
+        if isinstance(condition, str) and condition:
+            try:
+                conditions[step['id']] = compile_expression(condition)
+            except Exception as e:
+                raise ValueError(f"Error compiling condition '{condition}' of step {step['id']}: {e}")
+
+    dependents = {step_id: tuple(children) for step_id, children in dependents.items()}
+    reads, readers, retained = output_liveness(steps, dependency_graph, workflow.get('outputs', []))
+
+    return WorkflowPlan(
+        workflow_id=workflow_id,
+        definition=workflow,
+        steps_by_id=MappingProxyType(steps_by_id),
+        pending=MappingProxyType(pending),
+        dependents=MappingProxyType(dependents),
+        order=topological_order(steps_by_id, pending, dependents),
+        templates=MappingProxyType({step['id']: compile_step(step) for step in steps}),
+        conditions=MappingProxyType(conditions),
+        reads=MappingProxyType(reads),
+        readers=MappingProxyType(readers),
+        retained=retained
+    )
+
+
+class WorkflowRegistry:
+    """Ładuje workflow z katalogu i przeładowuje pliki zmienione po starcie."""
+
+    def __init__(self, engine, directory, poll_interval=DEFAULT_POLL_INTERVAL):
+        """
+        Inicjalizacja rejestru.
+
+        Args:
+            engine: Silnik workflow (WorkflowEngine), do którego trafiają plany
+            directory: Katalog z plikami workflow
+            poll_interval: Odstęp sprawdzania zmian w sekundach
+        """
+        self.engine = engine
+        self.directory = directory
+        self.poll_interval = poll_interval
+        # Stan plików z ostatniego przeglądu: nazwa pliku -> (mtime_ns, rozmiar)
+        self._files = {}
+        # Błędy ładowania: nazwa pliku -> komunikat (działa poprzednia wersja workflow)
+        self.errors = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _workflow_files(self):
+        """Zwraca stan plików workflow w katalogu: nazwa pliku -> (mtime_ns, rozmiar)."""
+        files = {}
+        if not os.path.isdir(self.directory):
+            return files
+
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(WORKFLOW_EXTENSIONS):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, filename))
+            except OSError:
+                # Plik usunięty w trakcie przeglądu
+                continue
+            files[filename] = (stat.st_mtime_ns, stat.st_size)
+
+        return files
+
+    def scan(self):
+        """
+        Ładuje nowe i zmienione pliki workflow oraz usuwa workflow usuniętych plików.
+
+        Returns:
+            dict: Zmiany {'loaded': [...], 'removed': [...], 'failed': [...]} (identyfikatory workflow)
+        """
+        changes = {'loaded': [], 'removed': [], 'failed': []}
+
+        with self._lock:
+            files = self._workflow_files()
+
+            for filename in sorted(files):
+                if self._files.get(filename) == files[filename]:
+                    continue
+
+                workflow_path = os.path.join(self.directory, filename)
+                try:
+                    workflow_id = self.engine.load_workflow(workflow_path)
+                    self.errors.pop(filename, None)
+                    changes['loaded'].append(workflow_id)
+                    print(f"Loaded workflow: {workflow_id}")
+                except Exception as e:
+                    self.errors[filename] = str(e)
+                    changes['failed'].append(os.path.splitext(filename)[0])
+                    print(f"Error loading workflow {filename}: {e}")
+
+            for filename in set(self._files) - set(files):
+                workflow_id = os.path.splitext(filename)[0]
+                self.engine.unload_workflow(workflow_id)
+                self.errors.pop(filename, None)
+                changes['removed'].append(workflow_id)
+                print(f"Removed workflow: {workflow_id}")
+
+            self._files = files
+
+        return changes
+
+    def start(self):
+        """Uruchamia wątek sprawdzający zmiany w katalogu workflow."""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name='workflow-reload', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Zatrzymuje wątek sprawdzający zmiany."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.scan()
+            except Exception as e:
+                # Błąd jednego przeglądu nie może zatrzymać przeładowywania
+                print(f"Error scanning workflows in {self.directory}: {e}")
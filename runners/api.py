@@ -10,11 +10,18 @@ Serwer API dla systemu emulatorów drukarek.
 import os
 import json
 import time
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, g
 import tempfile
 from core.pipeline_engine import PipelineEngine
 from core.workflow_engine import WorkflowEngine
-from adapters import ADAPTERS
+from core.workflow_registry import WorkflowRegistry
+from core.jobs import JobQueue, QueueFull, JOB_QUEUED, JOB_RUNNING, DEFAULT_JOB_WORKERS
+from core.distributed import RemoteStepExecutor, broker_from_url
+from core.plan import PLAN_CACHE, execute_plan
+from core.batch import MAX_BATCH_CONCURRENCY
+from core.singleflight import SingleFlight, allows_single_flight, plan_key
+from core.metrics import METRICS, CONTENT_TYPE
+from adapters import ADAPTERS, ADAPTER_POOL
 from werkzeug.utils import secure_filename
 
 app = Flask(__name__)
@@ -22,17 +29,76 @@ app = Flask(__name__)
 # Inicjalizacja silników
 workflow_engine = WorkflowEngine()
 
-# Ładowanie workflow
+# Ładowanie workflow - zmienione pliki są przeładowywane w trakcie działania serwera
 workflow_dir = os.path.join(os.getcwd(), 'workflows')
-if os.path.exists(workflow_dir):
-    for filename in os.listdir(workflow_dir):
-        if filename.endswith('.yaml') or filename.endswith('.yml'):
-            try:
-                workflow_path = os.path.join(workflow_dir, filename)
-                workflow_id = workflow_engine.load_workflow(workflow_path)
-                print(f"Loaded workflow: {workflow_id}")
-            except Exception as e:
-                print(f"Error loading workflow {filename}: {e}")
+workflow_registry = WorkflowRegistry(workflow_engine, workflow_dir)
+workflow_registry.scan()
+
+# Kolejka zadań asynchronicznych (?async=1) - wątki robocze startują przy pierwszym zgłoszeniu
+job_queue = JobQueue()
+
+# Najdłuższy czas oczekiwania na zakończenie zadania w jednym żądaniu (long-poll, w sekundach)
+MAX_JOB_WAIT = 30.0
+
+# Największa liczba danych wejściowych w jednym żądaniu /api/execute_batch
+MAX_BATCH_INPUTS = 1000
+
+# Identyczne równoczesne żądania (/api/execute, /api/emulate/zpl) współdzielą jedno wykonanie
+request_flights = SingleFlight('request')
+
+# Metryki żądań HTTP
+HTTP_REQUESTS = METRICS.counter('http_requests_total', 'HTTP requests by route, method and status')
+HTTP_DURATION = METRICS.histogram('http_request_duration_seconds', 'HTTP request handling time')
+HTTP_IN_FLIGHT = METRICS.gauge('http_requests_in_flight', 'HTTP requests currently being handled')
+
+
+def _cache_ratio(cache):
+    """Zwraca udział trafień pamięci podręcznej z licznikami hits/misses."""
+    total = cache.hits + cache.misses
+    return cache.hits / total if total else 0.0
+
+
+METRICS.register_collector('cache_hit_ratio', 'Cache hit ratio by cache', lambda: [
+    ({'cache': 'step_results'}, _cache_ratio(workflow_engine.result_cache)),
+    ({'cache': 'plans'}, _cache_ratio(PLAN_CACHE))
+])
+METRICS.register_collector('workflow_queue_depth', 'Workflow steps waiting for a worker thread',
+                           workflow_engine.queue_depth)
+METRICS.register_collector('jobs_in_queue', 'Asynchronous jobs by state', lambda: [
+    ({'state': JOB_QUEUED}, job_queue.pending),
+    ({'state': JOB_RUNNING}, job_queue.running)
+])
+
+
+def _route_label():
+    """Zwraca szablon trasy żądania (nie pełną ścieżkę - ogranicza liczbę serii)."""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+
+
+@app.after_request
+def record_request_metrics(response):
+    route = _route_label()
+    HTTP_REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+    HTTP_DURATION.observe(time.perf_counter() - g.request_start, route=route)
+    return response
+
+
+@app.teardown_request
+def finish_request(exception=None):
+    if 'request_start' in g:
+        HTTP_IN_FLIGHT.dec()
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Zwraca metryki w formacie tekstowym Prometheusa."""
+    return Response(METRICS.render(), content_type=CONTENT_TYPE)
 
 
 @app.route('/api/adapters', methods=['GET'])
@@ -40,19 +106,68 @@ def list_adapters():
     """Zwraca listę dostępnych adapterów."""
     adapters = []
 
-    for adapter_id, adapter in ADAPTERS.items():
+    # Lista nie importuje adapterów - są ładowane dopiero przy pierwszym użyciu
+    for adapter_id in ADAPTERS:
+        adapter = ADAPTERS[adapter_id] if ADAPTERS.is_loaded(adapter_id) else None
         adapters.append({
             'id': adapter_id,
-            'name': adapter.name or adapter_id,
-            'type': adapter.__class__.__name__
+            'name': (adapter.name if adapter is not None else None) or adapter_id,
+            'type': ADAPTERS.class_name(adapter_id)
         })
 
     return jsonify(adapters)
 
 
+def _wants_async(data=None):
+    """Sprawdza, czy klient prosi o wykonanie w tle (?async=1 lub 'async': true w ciele)."""
+    if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return isinstance(data, dict) and bool(data.get('async'))
+
+
+def _submit_job(function, *args, kind, description, priority=None):
+    """Zgłasza zadanie do kolejki i zwraca odpowiedź 202 z adresem stanu zadania."""
+    try:
+        priority = int(priority if priority is not None else request.args.get('priority', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Priority must be an integer'}), 400
+
+    try:
+        job = job_queue.submit(function, *args, kind=kind, priority=priority, description=description)
+    except QueueFull as e:
+        # Przeciążenie - klient powinien ponowić zgłoszenie później
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
+    location = f"/api/jobs/{job.id}"
+    return jsonify({'job_id': job.id, 'status': job.status, 'location': location}), 202, {'Location': location}
+
+
+def run_pipeline(pipeline_expr, input_data):
+    """
+    Wykonuje pipeline i zapisuje obraz z wyniku do pliku tymczasowego.
+
+    Identyczne równoczesne wywołania (ten sam plan i te same dane) dostają wynik
+    jednego wykonania - z tym samym plikiem tymczasowym.
+    """
+    plan = PipelineEngine.compile(pipeline_expr)
+    return request_flights.do(plan_key(plan, input_data), _run_pipeline_plan, plan, input_data)
+
+
+def _run_pipeline_plan(plan, input_data):
+    result = execute_plan(plan, input_data)
+
+    # Jeśli wynik zawiera dane binarne, zapisz je do pliku tymczasowego
+    if not save_binary_result(result):
+        raise RuntimeError('No image data found in result')
+
+    return result
+
+
 @app.route('/api/execute', methods=['POST'])
 def execute_pipeline():
-    """Wykonuje pipeline z ciała żądania."""
+    """Wykonuje pipeline z ciała żądania (w tle, jeśli klient o to prosi)."""
     data = request.json
 
     if not data:
@@ -65,66 +180,167 @@ def execute_pipeline():
     if not pipeline_expr:
         return jsonify({'error': 'Pipeline expression not provided'}), 400
 
+    if _wants_async(data):
+        return _submit_job(run_pipeline, pipeline_expr, input_data, kind='pipeline',
+                           description=pipeline_expr, priority=data.get('priority'))
+
     try:
-        # Wykonanie pipeline'a
-        result = PipelineEngine.execute_from_dot_notation(pipeline_expr, input_data)
-
-        # Jeśli wynik zawiera dane binarne, zapisz je do pliku tymczasowego
-        if isinstance(result, dict) and ('image_data' in result or 'image' in result):
-            # Dane binarne w result['image_data'] lub obiekt PIL w result['image']
-            image_data = result.get('image_data')
-            image = result.get('image')
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as tmp:
-                if image_data:
-                    tmp.write(image_data)
-                elif image:
-                    image.save(tmp.name)
-                else:
-                    return jsonify({'error': 'No image data found in result'}), 500
+        return jsonify(run_pipeline(pipeline_expr, input_data))
 
-                # Dodaj ścieżkę do pliku w wyniku
-                result['temp_file'] = tmp.name
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        return jsonify(result)
+
+@app.route('/api/execute_batch', methods=['POST'])
+def execute_pipeline_batch():
+    """Wykonuje jeden pipeline dla listy danych wejściowych."""
+    data = request.json
+
+    if not data:
+        return jsonify({'error': 'No JSON data provided'}), 400
+
+    pipeline_expr = data.get('pipeline')
+    inputs = data.get('inputs')
+    concurrency = data.get('concurrency')
+
+    if not pipeline_expr:
+        return jsonify({'error': 'Pipeline expression not provided'}), 400
+
+    if not isinstance(inputs, list):
+        return jsonify({'error': "'inputs' must be a list"}), 400
+
+    if len(inputs) > MAX_BATCH_INPUTS:
+        return jsonify({'error': f"Too many inputs (limit {MAX_BATCH_INPUTS})"}), 400
+
+    if concurrency is not None:
+        # bool to podklasa int - true/false nie jest liczbą wątków
+        if not isinstance(concurrency, int) or isinstance(concurrency, bool) or concurrency < 1:
+            return jsonify({'error': "'concurrency' must be a positive integer"}), 400
+        concurrency = min(concurrency, MAX_BATCH_CONCURRENCY)
+
+    try:
+        # Błąd jednego elementu nie przerywa całej paczki
+        results = PipelineEngine.execute_batch(pipeline_expr, inputs, concurrency,
+                                               return_exceptions=True)
+
+        response = []
+        for result in results:
+            if isinstance(result, Exception):
+                response.append({'error': str(result)})
+            elif not save_binary_result(result):
+                response.append({'error': 'No image data found in result'})
+            else:
+                response.append(result)
+
+        return jsonify({'results': response})
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def save_binary_result(result):
+    """
+    Zapisuje obraz z wyniku do pliku tymczasowego i dodaje jego ścieżkę jako 'temp_file'.
+
+    Returns:
+        bool: False jeśli wynik ma klucz obrazu, ale bez danych
+    """
+    if not isinstance(result, dict) or ('image_data' not in result and 'image' not in result):
+        return True
+
+    # Dane binarne w result['image_data'] lub obiekt PIL w result['image']
+    image_data = result.get('image_data')
+    image = result.get('image')
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as tmp:
+        if image_data:
+            tmp.write(image_data)
+        elif image:
+            image.save(tmp.name)
+        else:
+            return False
+
+        # Dodaj ścieżkę do pliku w wyniku
+        result['temp_file'] = tmp.name
+
+    return True
+
+
+def run_workflow(workflow_id, input_data):
+    """Wykonuje workflow i zwraca jego wyniki z metadanymi."""
+    context = workflow_engine.execute_workflow(workflow_id, input_data)
+
+    return {
+        'outputs': context.get('outputs', {}),
+        'metadata': {
+            'workflow_id': workflow_id,
+            'execution_time': time.time(),
+            'step_count': len(context.get('steps', {}))
+        }
+    }
+
+
 @app.route('/api/workflow/<workflow_id>', methods=['POST'])
 def execute_workflow(workflow_id):
-    """Wykonuje workflow o podanym ID."""
+    """Wykonuje workflow o podanym ID (w tle, jeśli klient o to prosi)."""
     if workflow_id not in workflow_engine.workflows:
         return jsonify({'error': f'Workflow not found: {workflow_id}'}), 404
 
     # Pobierz dane wejściowe
     input_data = request.json or {}
 
+    if _wants_async():
+        return _submit_job(run_workflow, workflow_id, input_data, kind='workflow', description=workflow_id)
+
     try:
-        # Wykonaj workflow
-        context = workflow_engine.execute_workflow(workflow_id, input_data)
-
-        # Zwróć wyniki
-        return jsonify({
-            'outputs': context.get('outputs', {}),
-            'metadata': {
-                'workflow_id': workflow_id,
-                'execution_time': time.time(),
-                'step_count': len(context.get('steps', {}))
-            }
-        })
+        # Wykonaj workflow i zwróć wyniki
+        return jsonify(run_workflow(workflow_id, input_data))
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """Zwraca zadania asynchroniczne bez wyników (opcjonalnie tylko w stanie ?status=...)."""
+    jobs = job_queue.jobs(request.args.get('status'))
+    return jsonify([
+        {key: value for key, value in job.to_dict().items() if key != 'result'}
+        for job in jobs
+    ])
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Zwraca stan zadania; z ?wait=<sekundy> czeka na jego zakończenie (long-poll)."""
+    try:
+        timeout = min(float(request.args.get('wait', 0)), MAX_JOB_WAIT)
+    except ValueError:
+        return jsonify({'error': 'Wait must be a number of seconds'}), 400
+
+    job = job_queue.wait(job_id, timeout) if timeout > 0 else job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Job not found: {job_id}'}), 404
+
+    return jsonify(job.to_dict())
+
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Anuluje zadanie (oczekujące lub działające)."""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return jsonify({'error': f'Job not found: {job_id}'}), 404
+
+    return jsonify(job.to_dict())
+
+
 @app.route('/api/workflows', methods=['GET'])
 def list_workflows():
     """Zwraca listę dostępnych workflow."""
     workflows = []
 
-    for workflow_id, workflow in workflow_engine.workflows.items():
+    for workflow_id, workflow in list(workflow_engine.workflows.items()):
         workflows.append({
             'id': workflow_id,
             'name': workflow.get('name', workflow_id),
@@ -135,6 +351,20 @@ def list_workflows():
     return jsonify(workflows)
 
 
+@app.route('/api/workflows/reload', methods=['POST'])
+def reload_workflows():
+    """Natychmiast przeładowuje zmienione pliki workflow."""
+    changes = workflow_registry.scan()
+    changes['errors'] = dict(workflow_registry.errors)
+    return jsonify(changes)
+
+
+def render_zpl(zpl_code, dpi, width, height):
+    """Renderuje etykietę ZPL adapterem 'zpl'."""
+    with ADAPTER_POOL.adapter('zpl') as zpl:
+        return zpl.render_mode('labelary').dpi(dpi).width(width).height(height).execute(zpl_code)
+
+
 @app.route('/api/emulate/zpl', methods=['POST'])
 def emulate_zpl():
     """Emuluje wydruk kodu ZPL."""
@@ -146,8 +376,9 @@ def emulate_zpl():
     height = request.args.get('height', 6, type=float)
 
     try:
-        # Wykonaj emulację
-        result = ADAPTERS['zpl'].render_mode('labelary').dpi(dpi).width(width).height(height).execute(zpl_code)
+        # Wykonaj emulację - identyczne równoczesne żądania czekają na jedno renderowanie
+        key = ('zpl', dpi, width, height, zpl_code) if allows_single_flight(ADAPTERS['zpl'].__class__) else None
+        result = request_flights.do(key, render_zpl, zpl_code, dpi, width, height)
 
         # Zwróć obraz jako odpowiedź
         if 'image_data' in result:
@@ -177,7 +408,8 @@ def emulate_escpos():
 
     try:
         # Wykonaj emulację
-        result = ADAPTERS['escpos'].width(width).dpi(dpi).execute(escpos_data)
+        with ADAPTER_POOL.adapter('escpos') as escpos:
+            result = escpos.width(width).dpi(dpi).execute(escpos_data)
 
         # Zwróć obraz jako odpowiedź
         if 'image' in result:
@@ -242,19 +474,18 @@ def upload_file():
             width = request.form.get('width', 4, type=float)
             height = request.form.get('height', 6, type=float)
 
-            # Wykonaj emulację
-            adapter = ADAPTERS[emulator_type]
-
-            # Skonfiguruj adapter
-            if emulator_type == 'zpl':
-                adapter.render_mode('labelary').dpi(dpi).width(width).height(height)
-            elif emulator_type == 'escpos':
-                adapter.width(width).dpi(dpi)
-            elif emulator_type == 'pcl':
-                adapter.mode('ghostscript').dpi(dpi)
+            # Wykonaj emulację na własnej instancji adaptera
+            with ADAPTER_POOL.adapter(emulator_type) as adapter:
+                # Skonfiguruj adapter
+                if emulator_type == 'zpl':
+                    adapter.render_mode('labelary').dpi(dpi).width(width).height(height)
+                elif emulator_type == 'escpos':
+                    adapter.width(width).dpi(dpi)
+                elif emulator_type == 'pcl':
+                    adapter.mode('ghostscript').dpi(dpi)
 
-            # Wykonaj emulację
-            result = adapter.execute(file_data)
+                # Wykonaj emulację
+                result = adapter.execute(file_data)
 
             # Utwórz plik wynikowy
             output_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
@@ -282,9 +513,19 @@ def upload_file():
             os.unlink(temp_file.name)
 
 
-def run_server(host='0.0.0.0', port=5000):
-    """Uruchamia serwer API."""
-    app.run(host=host, port=port)
+def run_server(host='0.0.0.0', port=5000, job_workers=DEFAULT_JOB_WORKERS, broker_url=None):
+    """Uruchamia serwer API (broker_url - broker kroków 'executor: remote', np. redis://host:6379/0)."""
+    if broker_url:
+        workflow_engine.remote_executor = RemoteStepExecutor(broker_from_url(broker_url))
+
+    # Zmiany w katalogu workflow nie wymagają restartu serwera
+    workflow_registry.start()
+
+    # Zadania asynchroniczne nie zajmują wątków obsługujących żądania
+    job_queue.start(job_workers)
+
+    # Silniki pobierają izolowane instancje adapterów, więc żądania mogą działać równolegle
+    app.run(host=host, port=port, threaded=True)
 
 
 if __name__ == '__main__':
@@ -8,35 +8,52 @@ import argparse
 import json
 import sys
 import os
+import uuid
 from datetime import datetime
-from workflow_engine import WorkflowEngine
+from core.workflow_engine import WorkflowEngine
+from core.tracing import format_summary, write_chrome_trace
+from core.payloads import json_default
+from adapters import ADAPTERS
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Execute workflow pipelines')
-    parser.add_argument('command', choices=['run', 'list', 'info', 'validate'],
+    parser.add_argument('command', choices=['run', 'resume', 'list', 'info', 'validate'],
                         help='Command to execute')
     parser.add_argument('--workflow', '-w', help='Workflow file path')
     parser.add_argument('--input', '-i', help='Input data JSON file or string')
     parser.add_argument('--output', '-o', help='Output file path for results')
     parser.add_argument('--param', '-p', action='append', help='Parameters (format: key=value)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Skip steps whose inputs, parameters and files are unchanged since the last run')
+    parser.add_argument('--checkpoint', action='store_true',
+                        help='Record completed steps so an interrupted run can be resumed')
+    parser.add_argument('--run-id', help='Run ID to resume')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='Save per-step timings as Chrome trace JSON and print a timing summary')
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Inicjalizacja silnika workflow
     engine = WorkflowEngine()
 
     # Obsługa poleceń
-    if args.command == 'list':
-        list_workflows()
-    elif args.command == 'info':
-        show_workflow_info(args.workflow, engine)
-    elif args.command == 'validate':
-        validate_workflow(args.workflow, engine)
-    elif args.command == 'run':
-        run_workflow(args.workflow, args.input, args.output, args.param, engine)
-    else:
-        parser.print_help()
+    try:
+        if args.command == 'list':
+            list_workflows()
+        elif args.command == 'info':
+            show_workflow_info(args.workflow, engine)
+        elif args.command == 'validate':
+            validate_workflow(args.workflow, engine)
+        elif args.command == 'run':
+            run_workflow(args.workflow, args.input, args.output, args.param, engine, args.incremental,
+                         args.checkpoint or None, args.trace)
+        elif args.command == 'resume':
+            resume_workflow(args.workflow, args.run_id, args.output, engine, args.incremental, args.trace)
+        else:
+            parser.print_help()
+    finally:
+        engine.shutdown()
 
 
 def list_workflows():
@@ -167,7 +184,17 @@ def validate_workflow(workflow_path, engine):
         sys.exit(1)
 
 
-def run_workflow(workflow_path, input_path, output_path, params, engine):
+def save_trace(result, trace_path):
+    """Wypisuje podsumowanie czasów kroków i zapisuje Chrome trace."""
+    print("\nStep timings:")
+    print(format_summary(result['trace']))
+
+    write_chrome_trace(result['trace'], trace_path, result['run_id'])
+    print(f"\nTrace saved to: {trace_path}")
+
+
+def run_workflow(workflow_path, input_path, output_path, params, engine, incremental=False,
+                 checkpoint=None, trace_path=None):
     """Uruchamia workflow z podanymi parametrami."""
     if not workflow_path:
         print("Error: Workflow path not specified")
@@ -213,13 +240,33 @@ def run_workflow(workflow_path, input_path, output_path, params, engine):
         print(f"Executing workflow: {workflow_id}")
         start_time = datetime.now()
 
+        # ID uruchomienia z punktami kontrolnymi jest potrzebne do wznowienia, także po błędzie
+        run_id = None
+        if checkpoint or engine.workflows[workflow_id].get('checkpoint', False):
+            run_id = uuid.uuid4().hex
+            print(f"Run ID: {run_id} (checkpointed)")
+
         # Wykonaj workflow
-        result = engine.execute_workflow(workflow_id, inputs)
+        try:
+            result = engine.execute_workflow(workflow_id, inputs, incremental=incremental,
+                                             checkpoint=checkpoint, run_id=run_id)
+        except Exception:
+            if run_id:
+                print(f"Resume with: resume --workflow {workflow_path} --run-id {run_id}")
+            raise
 
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
 
         print(f"Workflow execution completed in {duration:.2f} seconds")
+        print(f"Run ID: {result['run_id']}")
+
+        if incremental:
+            up_to_date = [step_id for step_id, step in result['steps'].items() if step.get('up_to_date')]
+            print(f"Up-to-date steps skipped: {len(up_to_date)}/{len(result['steps'])}")
+
+        if trace_path:
+            save_trace(result, trace_path)
 
         # Wyświetl wyniki
         if 'outputs' in result and result['outputs']:
@@ -230,7 +277,7 @@ def run_workflow(workflow_path, input_path, output_path, params, engine):
         # Zapisz wyniki do pliku
         if output_path:
             with open(output_path, 'w') as f:
-                json.dump(result, f, indent=2)
+                json.dump(result, f, indent=2, default=json_default)
             print(f"\nFull results saved to: {output_path}")
 
         return result
@@ -242,5 +289,42 @@ def run_workflow(workflow_path, input_path, output_path, params, engine):
         sys.exit(1)
 
 
+def resume_workflow(workflow_path, run_id, output_path, engine, incremental=False, trace_path=None):
+    """Wznawia przerwane wykonanie workflow z punktu kontrolnego."""
+    if not workflow_path or not run_id:
+        print("Error: Workflow path and --run-id are required")
+        sys.exit(1)
+
+    try:
+        engine.load_workflow(workflow_path)
+
+        print(f"Resuming run: {run_id}")
+        start_time = datetime.now()
+
+        result = engine.resume(run_id, incremental=incremental)
+
+        duration = (datetime.now() - start_time).total_seconds()
+        print(f"Workflow execution completed in {duration:.2f} seconds")
+
+        if trace_path:
+            save_trace(result, trace_path)
+
+        if 'outputs' in result and result['outputs']:
+            print("\nOutputs:")
+            for key, value in result['outputs'].items():
+                print(f"  - {key}: {value}")
+
+        if output_path:
+            with open(output_path, 'w') as f:
+                json.dump(result, f, indent=2, default=json_default)
+            print(f"\nFull results saved to: {output_path}")
+
+        return result
+
+    except Exception as e:
+        print(f"Error resuming workflow: {e}")
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
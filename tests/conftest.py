@@ -0,0 +1,76 @@
+# tests/conftest.py
+"""
+Shared fixtures: a configurable test adapter and engines with isolated state directories
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from adapters import ADAPTERS
+from adapters.base import BaseAdapter
+from adapters.cancellation import current_token
+
+
+class StepAdapter(BaseAdapter):
+    """
+    Test adapter driven by its parameters:
+    sleep - seconds to wait (cooperatively cancellable), value - result (default: input data),
+    fail - error message to raise.
+    """
+
+    deterministic = True
+
+    # Parameters of every execution, in call order
+    calls = []
+    _calls_lock = threading.Lock()
+
+    def execute(self, input_data=None):
+        with self._calls_lock:
+            self.calls.append(dict(self._params))
+
+        token = current_token()
+        end = time.monotonic() + float(self._params.get('sleep', 0))
+        while time.monotonic() < end:
+            token.raise_if_cancelled()
+            time.sleep(0.005)
+
+        if self._params.get('fail'):
+            raise RuntimeError(self._params['fail'])
+        return self._params.get('value', input_data)
+
+
+class UnsafeStepAdapter(StepAdapter):
+    """StepAdapter whose executions must be serialized (thread_safe = False)."""
+
+    thread_safe = False
+
+
+@pytest.fixture(autouse=True)
+def step_adapter():
+    """Registers the test adapters as 'step' and 'unsafe_step'."""
+    StepAdapter.calls = []
+    ADAPTERS['step'] = StepAdapter('step')
+    ADAPTERS['unsafe_step'] = UnsafeStepAdapter('unsafe_step')
+    yield StepAdapter
+    del ADAPTERS['step']
+    del ADAPTERS['unsafe_step']
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """WorkflowEngine keeping its state, checkpoints and result cache under tmp_path."""
+    from core.workflow_engine import WorkflowEngine
+    from core.result_cache import ResultCache
+
+    engine = WorkflowEngine(max_parallel=8, result_cache=ResultCache(),
+                            state_dir=str(tmp_path / 'state'), checkpoint_dir=str(tmp_path / 'checkpoints'))
+    yield engine
+    engine.shutdown()
@@ -0,0 +1,83 @@
+# tests/test_cancellation.py
+"""
+Tests for cancellation tokens, step timeouts and workflow deadlines (adapters/cancellation.py)
+"""
+
+import time
+
+import pytest
+
+from adapters.cancellation import (
+    NEVER_CANCELLED, CancellationToken, OperationCancelled, current_token, use_token
+)
+
+
+def test_token_deadline():
+    token = CancellationToken(timeout=0.05)
+
+    assert not token.cancelled
+    assert 0 < token.remaining() <= 0.05
+    assert token.wait(1) is True
+    assert token.reason == 'Deadline exceeded'
+    with pytest.raises(OperationCancelled, match='Deadline exceeded'):
+        token.raise_if_cancelled()
+
+
+def test_cancel_runs_callbacks_once():
+    token = CancellationToken()
+    calls = []
+    token.add_callback(lambda: calls.append('first'))
+    removed = lambda: calls.append('removed')
+    token.add_callback(removed)
+    token.remove_callback(removed)
+
+    token.cancel('stop')
+    token.cancel('again')
+    token.add_callback(lambda: calls.append('late'))
+
+    assert calls == ['first', 'late']
+    assert token.reason == 'stop'
+
+
+def test_child_inherits_parent_deadline_and_cancellation():
+    parent = CancellationToken(timeout=10)
+    child = CancellationToken(timeout=60, parent=parent)
+
+    assert child.deadline == parent.deadline
+
+    parent.cancel('shutdown')
+    assert child.cancelled and child.reason == 'shutdown'
+
+
+def test_current_token_is_scoped():
+    token = CancellationToken()
+
+    assert current_token() is NEVER_CANCELLED
+    with use_token(token):
+        assert current_token() is token
+    assert current_token() is NEVER_CANCELLED
+
+
+def sleeping_step(step_id, sleep, **extra):
+    return dict(extra, id=step_id, adapter='step', methods=[{'name': 'sleep', 'value': sleep},
+                                                             {'name': 'value', 'value': step_id}])
+
+
+def test_step_timeout_cancels_step(engine):
+    engine.workflows['wf'] = {'steps': [sleeping_step('slow', 5, timeout=0.1)]}
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match='Step slow failed: Deadline exceeded'):
+        engine.execute_workflow('wf')
+
+    assert time.monotonic() - start < 2
+
+
+def test_workflow_deadline_stops_run(engine):
+    engine.workflows['wf'] = {'deadline': 0.2, 'steps': [sleeping_step('a', 0.05), sleeping_step('b', 5)]}
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match='Step b failed: Deadline exceeded'):
+        engine.execute_workflow('wf')
+
+    assert time.monotonic() - start < 2
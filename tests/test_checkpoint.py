@@ -0,0 +1,85 @@
+# tests/test_checkpoint.py
+"""
+Tests for the append-only checkpoint log and resuming workflow runs (core/checkpoint.py)
+"""
+
+import pytest
+
+from core.checkpoint import CheckpointLog
+
+
+def test_log_round_trip(tmp_path):
+    log = CheckpointLog('run1', str(tmp_path))
+    log.start('wf', {'name': 'x'}, 100)
+    log.append_step('a', {'output': 1, 'success': True})
+    log.append_step('b', {'output': [2], 'success': True})
+    log.finish('completed')
+
+    header, steps, status = CheckpointLog('run1', str(tmp_path)).load()
+
+    assert header == {'workflow_id': 'wf', 'inputs': {'name': 'x'}, 'timestamp': 100}
+    assert steps == {'a': {'output': 1, 'success': True}, 'b': {'output': [2], 'success': True}}
+    assert status == 'completed'
+
+
+def test_truncated_entry_is_dropped_and_log_can_be_extended(tmp_path):
+    log = CheckpointLog('run1', str(tmp_path))
+    log.start('wf', {}, 100)
+    log.append_step('a', {'output': 1})
+    log.close()
+
+    # Simulate a crash in the middle of writing the next entry
+    with open(log.path, 'ab') as f:
+        f.write(b'\x80\x05\x95garbage')
+
+    resumed = CheckpointLog('run1', str(tmp_path))
+    assert resumed.load()[1] == {'a': {'output': 1}}
+
+    resumed.reopen()
+    resumed.append_step('b', {'output': 2})
+    resumed.close()
+
+    assert CheckpointLog('run1', str(tmp_path)).load()[1] == {'a': {'output': 1}, 'b': {'output': 2}}
+
+
+def test_unpicklable_record_is_skipped(tmp_path):
+    log = CheckpointLog('run1', str(tmp_path))
+    log.start('wf', {}, 100)
+
+    assert log.append_step('a', {'output': lambda: None}) is False
+    log.close()
+    assert log.load()[1] == {}
+
+
+def test_missing_log(tmp_path):
+    log = CheckpointLog('missing', str(tmp_path))
+
+    assert not log.exists()
+    assert log.load() == (None, {}, None)
+
+
+def workflow(*extra_methods):
+    """Two-step workflow; extra_methods are added to the second step."""
+    return {'steps': [
+        {'id': 'a', 'adapter': 'step', 'methods': [{'name': 'value', 'value': 'A'}]},
+        {'id': 'b', 'adapter': 'step', 'methods': [{'name': 'value', 'value': '${steps.a.output}B'},
+                                                   *extra_methods]},
+    ]}
+
+
+def test_resume_skips_completed_steps(engine, step_adapter):
+    engine.workflows['wf'] = workflow({'name': 'fail', 'value': 'broken'})
+    with pytest.raises(RuntimeError, match='broken'):
+        engine.execute_workflow('wf', checkpoint=True, run_id='run1')
+
+    engine.workflows['wf'] = workflow()
+    context = engine.resume('run1')
+
+    assert context['run_id'] == 'run1'
+    assert context['steps']['b']['output'] == 'AB'
+    assert [call['value'] for call in step_adapter.calls] == ['A', 'AB', 'AB']
+
+
+def test_resume_unknown_run(engine):
+    with pytest.raises(ValueError, match='Checkpoint not found'):
+        engine.resume('missing')
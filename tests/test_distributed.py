@@ -0,0 +1,177 @@
+# tests/test_distributed.py
+"""
+Tests for remote step execution through a broker (core/distributed.py)
+"""
+
+import pickle
+import time
+
+import pytest
+
+from core.distributed import (
+    SHARED_TASK_QUEUE, BrokerServer, InProcessBroker, Worker,
+    broker_from_url, decode, encode, is_loopback
+)
+from core.result_cache import ResultCache
+from core.workflow_engine import WorkflowEngine
+
+SECRET = 'test-secret'
+
+# Side effects of unpickling Exploit
+EXECUTED = []
+
+
+def record(value):
+    EXECUTED.append(value)
+
+
+class Exploit:
+    """Payload that runs code as soon as it is unpickled."""
+
+    def __reduce__(self):
+        return record, ('unpickled',)
+
+
+@pytest.fixture(autouse=True)
+def no_environment_secret(monkeypatch):
+    monkeypatch.delenv('BROKER_SECRET', raising=False)
+    EXECUTED.clear()
+
+
+@pytest.fixture
+def cluster(tmp_path, monkeypatch):
+    """Starts an engine and two workers sharing a broker and the BROKER_SECRET secret."""
+    monkeypatch.setenv('BROKER_SECRET', SECRET)
+    # Workers notice stop() sooner
+    monkeypatch.setattr('core.distributed.POLL_TIMEOUT', 0.1)
+    started = []
+
+    def start(broker=None):
+        broker = broker or InProcessBroker()
+        workers = [Worker(broker, 'w1', capacity=2, locality=['camera']).start(),
+                   Worker(broker, 'w2', capacity=2).start()]
+        engine = WorkflowEngine(broker=broker, result_cache=ResultCache(),
+                                state_dir=str(tmp_path / 'state'), checkpoint_dir=str(tmp_path / 'checkpoints'))
+        started.append((engine, workers))
+        return engine, workers
+
+    yield start
+
+    for engine, workers in started:
+        engine.shutdown()
+        for worker in workers:
+            worker.stop()
+
+
+def remote_step(step_id, value, **extra):
+    step = {'id': step_id, 'adapter': 'step', 'executor': 'remote', 'cache': False,
+            'methods': [{'name': 'value', 'value': value}]}
+    step.update(extra)
+    return step
+
+
+def test_signed_messages_round_trip_and_reject_tampering():
+    data = encode({'task_id': 1}, SECRET)
+
+    assert decode(data, SECRET) == {'task_id': 1}
+    with pytest.raises(ValueError, match='signature'):
+        decode(data, 'other-secret')
+    with pytest.raises(ValueError, match='signature'):
+        decode(data.replace(b'task_id', b'task_ix'), SECRET)
+    with pytest.raises(ValueError, match='signature'):
+        decode(pickle.dumps(Exploit()), SECRET)
+    assert EXECUTED == []
+
+
+def test_remote_steps_run_on_workers(cluster):
+    engine, workers = cluster()
+    engine.workflows['wf'] = {'steps': [
+        remote_step('a', 'A'),
+        remote_step('b', 'B', locality='camera'),
+        remote_step('c', 'C', methods=[{'name': 'fail', 'value': 'broken'}]),
+    ]}
+
+    with pytest.raises(RuntimeError, match='broken'):
+        engine.execute_workflow('wf')
+
+    engine.workflows['wf']['steps'].pop()
+    context = engine.execute_workflow('wf')
+
+    assert context['steps']['a']['output'] == 'A'
+    assert context['steps']['b']['output'] == 'B'
+    assert sum(worker.completed for worker in workers) >= 4
+
+
+def test_worker_rejects_unsigned_messages_and_keeps_serving(cluster):
+    broker = InProcessBroker()
+    engine, workers = cluster(broker)
+
+    broker.push(SHARED_TASK_QUEUE, pickle.dumps(Exploit()))
+    broker.push(SHARED_TASK_QUEUE, b'not a pickle')
+    engine.workflows['wf'] = {'steps': [remote_step('a', 'A')]}
+
+    assert engine.execute_workflow('wf')['steps']['a']['output'] == 'A'
+    assert EXECUTED == []
+
+
+def test_coordinator_survives_malformed_replies(cluster):
+    broker = InProcessBroker()
+    engine, _ = cluster(broker)
+    executor = engine.remote_executor
+
+    future = executor.submit('step', [('value', 'first')])
+    assert future.result(5) == 'first'
+
+    broker.push(executor.reply_queue, pickle.dumps(Exploit()))
+    broker.push(executor.reply_queue, encode({'unexpected': True}, SECRET))
+
+    assert executor.submit('step', [('value', 'second')]).result(5) == 'second'
+    assert executor._thread.is_alive()
+    assert EXECUTED == []
+
+
+@pytest.mark.parametrize('host, loopback', [
+    ('127.0.0.1', True), ('localhost', True), ('::1', True), ('0.0.0.0', False), ('', False), ('10.1.2.3', False),
+])
+def test_is_loopback(host, loopback):
+    assert is_loopback(host) is loopback
+
+
+def test_broker_server_refuses_public_address_without_secret(monkeypatch):
+    with pytest.raises(ValueError, match='without a shared secret'):
+        BrokerServer('0.0.0.0', 0)
+
+    monkeypatch.setenv('BROKER_SECRET', SECRET)
+    BrokerServer('0.0.0.0', 0).server_close()
+
+
+@pytest.fixture
+def tcp_server():
+    server = BrokerServer(port=0, secret=SECRET).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_tcp_broker_requires_the_shared_secret(tcp_server):
+    for secret in (None, 'wrong-secret'):
+        client = broker_from_url(tcp_server.url, secret)
+        with pytest.raises((RuntimeError, OSError, EOFError)):
+            client.members()
+        client.close()
+
+    client = broker_from_url(tcp_server.url, SECRET)
+    client.push('queue', b'data')
+    assert client.pop(['queue'], timeout=0) == b'data'
+    client.close()
+
+
+def test_remote_steps_over_tcp_broker(cluster, tcp_server):
+    engine, _ = cluster(broker_from_url(tcp_server.url))
+    engine.workflows['wf'] = {'steps': [remote_step('a', 'A'), remote_step('b', '${steps.a.output}B')]}
+
+    start = time.monotonic()
+    context = engine.execute_workflow('wf')
+
+    assert context['steps']['b']['output'] == 'AB'
+    assert time.monotonic() - start < 5
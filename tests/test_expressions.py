@@ -0,0 +1,62 @@
+# tests/test_expressions.py
+"""
+Tests for the compiled condition language (core/expressions.py)
+"""
+
+import pytest
+
+from core.expressions import ExpressionError, compile_expression, evaluate
+
+CONTEXT = {
+    'inputs': {'mode': 'fast', 'count': 3, 'tags': ['a', 'b']},
+    'steps': {'fetch': {'output': [{'name': 'first'}, {'name': 'second'}]}},
+}
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ("${inputs.mode} == 'fast'", True),
+    ("inputs.count > 2 and not inputs.count > 5", True),
+    ("1 < inputs.count <= 3", True),
+    ("steps.fetch.output.1.name", 'second'),
+    ("steps['fetch'].output[0].name in ['first', 'other']", True),
+    ("'c' not in inputs.tags", True),
+    ("len(steps) == 1 and max(inputs.count, 7) == 7", True),
+    ("inputs.mode.startswith('f') and inputs.mode.upper() == 'FAST'", True),
+    ("inputs.get('missing') is None", True),
+    ("true and null is None", True),
+    ("-inputs.count", -3),
+    ("[1, 2.5, 'x']", [1, 2.5, 'x']),
+])
+def test_evaluate(expression, expected):
+    assert evaluate(expression, CONTEXT) == expected
+
+
+def test_boolean_operators_short_circuit():
+    assert evaluate("false and inputs.missing", CONTEXT) is False
+    assert evaluate("inputs.count or inputs.missing", CONTEXT) == 3
+
+
+def test_compiled_expression_is_cached_and_reusable():
+    condition = compile_expression("inputs.count > 2")
+
+    assert compile_expression("inputs.count > 2") is condition
+    assert condition(CONTEXT) is True
+    assert condition({'inputs': {'count': 1}}) is False
+
+
+@pytest.mark.parametrize('expression', [
+    '__import__("os")',
+    'open("file")',
+    'inputs.__class__',
+    "inputs.mode.format()",
+    '1 +',
+    '(1',
+])
+def test_unsafe_or_invalid_expressions_are_rejected(expression):
+    with pytest.raises(ExpressionError):
+        evaluate(expression, CONTEXT)
+
+
+def test_missing_path_raises():
+    with pytest.raises(ExpressionError, match='missing'):
+        evaluate("inputs.missing == 1", CONTEXT)
@@ -0,0 +1,47 @@
+# tests/test_import_budget.py
+"""
+Import-time budget of the adapters package, measured in a fresh interpreter
+"""
+
+import subprocess
+import sys
+
+from benchmarks.bench_startup import ROOT, HEAVY_MODULES, IMPORT_BUDGET_SECONDS, check_import_budget
+
+
+def run_python(script):
+    """Runs a script in a fresh interpreter from the repository root and returns its stdout."""
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_import_adapters_within_budget():
+    assert check_import_budget(IMPORT_BUDGET_SECONDS) == []
+
+
+def test_registry_lookups_do_not_import_adapter_modules():
+    output = run_python(
+        "import sys\n"
+        "from adapters import ADAPTERS\n"
+        "assert 'bash' in ADAPTERS and 'zpl' in ADAPTERS\n"
+        "assert ADAPTERS.class_name('zpl') == 'ZplAdapter'\n"
+        "print(sorted(name for name in sys.modules if name.startswith('adapters.')))\n"
+        f"print([name for name in {HEAVY_MODULES!r} if name in sys.modules])\n"
+    )
+    loaded_adapters, loaded_heavy = output.splitlines()
+
+    assert 'adapters.zpl_adapter' not in loaded_adapters
+    assert 'adapters.bash_adapter' not in loaded_adapters
+    assert loaded_heavy == '[]'
+
+
+def test_first_lookup_imports_only_that_adapter():
+    output = run_python(
+        "import sys\n"
+        "from adapters import ADAPTERS\n"
+        "ADAPTERS['pcl']\n"
+        "print(ADAPTERS.is_loaded('pcl'), ADAPTERS.is_loaded('escpos'), 'adapters.escpos_adapter' in sys.modules)\n"
+    )
+
+    assert output.split() == ['True', 'False', 'False']
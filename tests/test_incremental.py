@@ -0,0 +1,90 @@
+# tests/test_incremental.py
+"""
+Tests for make-style incremental re-execution (core/incremental.py)
+"""
+
+import os
+
+from core.incremental import IncrementalState
+
+
+def fingerprint(value='x', upstream=(), input_files=()):
+    return IncrementalState.step_fingerprint('step', [('value', value)], None, upstream, input_files)
+
+
+def test_state_round_trip(tmp_path):
+    path = str(tmp_path / 'wf.pkl')
+    state = IncrementalState(path)
+    state.record('a', fingerprint(), {'rows': 3})
+    state.save()
+
+    reloaded = IncrementalState(path)
+    assert reloaded.lookup('a', fingerprint()) == (True, {'rows': 3})
+    assert reloaded.lookup('a', fingerprint('y')) == (False, None)
+    assert reloaded.lookup('b', fingerprint()) == (False, None)
+
+
+def test_fingerprint_depends_on_upstream_and_input_files(tmp_path):
+    source = tmp_path / 'source.csv'
+    source.write_text('a,b\n')
+
+    before = fingerprint(input_files=[str(source)])
+    assert fingerprint(input_files=[str(source)]) == before
+    assert fingerprint(upstream=[('fetch', 'abc')]) != fingerprint(upstream=[('fetch', 'abd')])
+
+    source.write_text('a,b\n1,2\n')
+    assert fingerprint(input_files=[str(source)]) != before
+
+
+def test_changed_output_file_invalidates_step(tmp_path):
+    output = tmp_path / 'out.txt'
+    output.write_text('result')
+    state = IncrementalState(str(tmp_path / 'wf.pkl'))
+    state.record('a', fingerprint(), 'done', [str(output)])
+
+    assert state.lookup('a', fingerprint())[0]
+
+    os.unlink(output)
+    assert not state.lookup('a', fingerprint())[0]
+
+
+def test_unfingerprintable_step_is_never_up_to_date(tmp_path):
+    state = IncrementalState(str(tmp_path / 'wf.pkl'))
+    state.record('a', fingerprint(), 'old')
+    state.record('a', None, 'new')
+
+    assert state.lookup('a', None) == (False, None)
+    assert state.lookup('a', fingerprint()) == (False, None)
+
+
+def test_corrupt_state_means_full_run(tmp_path):
+    path = tmp_path / 'wf.pkl'
+    path.write_bytes(b'not a pickle')
+
+    assert IncrementalState(str(path)).lookup('a', fingerprint()) == (False, None)
+
+
+def test_engine_reruns_only_changed_steps(engine, step_adapter):
+    def workflow(second):
+        return {'steps': [
+            {'id': 'a', 'adapter': 'step', 'methods': [{'name': 'value', 'value': 'A'}]},
+            {'id': 'b', 'adapter': 'step', 'methods': [{'name': 'value', 'value': second}]},
+            {'id': 'c', 'adapter': 'step', 'methods': [{'name': 'value', 'value': '${steps.b.output}!'}]},
+        ]}
+
+    engine.workflows['wf'] = workflow('B')
+    engine.execute_workflow('wf', incremental=True)
+    engine.result_cache.clear()
+
+    context = engine.execute_workflow('wf', incremental=True)
+    assert all(record.get('up_to_date') for record in context['steps'].values())
+    assert len(step_adapter.calls) == 3
+
+    # Changing 'b' also invalidates the dependent 'c', but not 'a'
+    engine.workflows['wf'] = workflow('B2')
+    context = engine.execute_workflow('wf', incremental=True)
+
+    assert context['steps']['a'].get('up_to_date')
+    assert not context['steps']['b'].get('up_to_date')
+    assert context['steps']['c']['output'] == 'B2!'
+    assert [call['value'] for call in step_adapter.calls[3:]] == ['B2', 'B2!']
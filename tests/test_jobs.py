@@ -0,0 +1,134 @@
+# tests/test_jobs.py
+"""
+Tests for the background job queue (core/jobs.py)
+"""
+
+import threading
+import time
+
+import pytest
+
+from adapters.cancellation import current_token
+from core.jobs import (
+    JOB_CANCELLED, JOB_COMPLETED, JOB_FAILED, JOB_QUEUED, JobQueue, QueueFull
+)
+
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(workers=1)
+    yield queue
+    queue.shutdown(cancel_running=True)
+
+
+def blocker():
+    """Returns a job function that runs until the returned event is set."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def function():
+        started.set()
+        release.wait(5)
+        return 'released'
+
+    return function, started, release
+
+
+def test_job_result_and_failure(queue):
+    completed = queue.submit(lambda a, b: a + b, 1, 2, kind='sum', description='1+2')
+    failed = queue.submit(lambda: 1 / 0)
+
+    assert queue.wait(completed.id, 5).to_dict()['result'] == 3
+    assert queue.wait(failed.id, 5).status == JOB_FAILED
+    assert 'division by zero' in failed.to_dict()['error']
+    assert completed.to_dict()['kind'] == 'sum'
+
+
+def test_higher_priority_runs_first(queue):
+    function, started, release = blocker()
+    queue.submit(function)
+    started.wait(5)
+
+    order = []
+    low = queue.submit(order.append, 'low')
+    high = queue.submit(order.append, 'high', priority=10)
+    release.set()
+
+    queue.wait(low.id, 5)
+    queue.wait(high.id, 5)
+    assert order == ['high', 'low']
+
+
+def test_pending_limit():
+    queue = JobQueue(workers=1, max_pending=1)
+    function, started, release = blocker()
+    try:
+        queue.submit(function)
+        started.wait(5)
+        queue.submit(lambda: None)
+
+        with pytest.raises(QueueFull):
+            queue.submit(lambda: None)
+    finally:
+        release.set()
+        queue.shutdown()
+
+
+def test_cancel_queued_and_running_jobs(queue):
+    def cooperative():
+        while not current_token().wait(0.01):
+            pass
+        current_token().raise_if_cancelled()
+
+    running = queue.submit(cooperative)
+    queued = queue.submit(lambda: 'never')
+    while running.status == JOB_QUEUED:
+        time.sleep(0.01)
+
+    queue.cancel(queued.id)
+    queue.cancel(running.id, 'stop')
+
+    assert queued.status == JOB_CANCELLED and queue.pending == 0
+    assert queue.wait(running.id, 5).status == JOB_CANCELLED
+    assert running.error == 'stop'
+
+
+def test_finished_jobs_are_bounded():
+    queue = JobQueue(workers=1, max_finished=2)
+    try:
+        jobs = [queue.submit(lambda: None) for _ in range(4)]
+        for job in jobs:
+            job.wait(5)
+
+        assert queue.get(jobs[0].id) is None
+        assert [job.id for job in queue.jobs(JOB_COMPLETED)] == [job.id for job in jobs[2:]]
+    finally:
+        queue.shutdown()
+
+
+def test_listing_jobs_while_workers_finish_them():
+    queue = JobQueue(workers=4, max_pending=None, max_finished=5)
+    errors = []
+    done = threading.Event()
+
+    def reader():
+        while not done.is_set():
+            try:
+                queue.jobs()
+                queue.get('missing')
+            except RuntimeError as e:
+                errors.append(e)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    try:
+        jobs = [queue.submit(lambda: None) for _ in range(500)]
+        for job in jobs:
+            job.wait(5)
+    finally:
+        done.set()
+        thread.join()
+        queue.shutdown()
+
+    assert errors == []
+    assert len(queue.jobs()) == 5
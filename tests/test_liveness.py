@@ -0,0 +1,75 @@
+# tests/test_liveness.py
+"""
+Tests for releasing dead step outputs and spilling them to disk (core/liveness.py)
+"""
+
+import os
+
+import pytest
+
+from core.liveness import SpilledRecord, parse_size
+
+
+@pytest.mark.parametrize('value, expected', [
+    (None, None), (1024, 1024), ('512', 512), ('2KB', 2048), ('1.5 mb', 1572864), ('1G', 1024 ** 3),
+])
+def test_parse_size(value, expected):
+    assert parse_size(value) == expected
+
+
+def test_parse_size_rejects_garbage():
+    with pytest.raises(ValueError, match='Invalid size'):
+        parse_size('lots')
+
+
+def chain(**options):
+    """a -> b -> c; only c's output is kept in 'outputs'."""
+    return dict(options, steps=[
+        {'id': 'a', 'adapter': 'step', 'methods': [{'name': 'value', 'value': 'x' * 1000}]},
+        {'id': 'b', 'adapter': 'step', 'methods': [{'name': 'value', 'value': '${steps.a.output}y'}]},
+        {'id': 'c', 'adapter': 'step', 'methods': [{'name': 'value', 'value': '${steps.b.output}z'}]},
+    ], outputs=[{'name': 'result', 'value': '${steps.c.output}'}])
+
+
+def test_outputs_without_readers_are_released(engine):
+    engine.workflows['wf'] = chain(release_outputs=True)
+    context = engine.execute_workflow('wf')
+
+    assert context['steps']['a']['released'] and 'output' not in context['steps']['a']
+    assert context['steps']['b']['released'] and 'output' not in context['steps']['b']
+    assert context['steps']['c']['output'].endswith('yz')
+    assert context['outputs']['result'] == context['steps']['c']['output']
+    assert context['memory']['released'] == 2
+
+
+def test_outputs_are_kept_by_default(engine):
+    engine.workflows['wf'] = chain()
+    context = engine.execute_workflow('wf')
+
+    assert all('output' in record for record in context['steps'].values())
+
+
+def test_outputs_over_memory_limit_are_spilled_and_restored(engine, tmp_path):
+    spill_dir = tmp_path / 'spill'
+    engine.workflows['wf'] = chain(memory_limit=100, spill_dir=str(spill_dir))
+    context = engine.execute_workflow('wf')
+
+    assert context['memory']['spilled'] >= 1
+    assert context['memory']['peak_bytes'] <= 100 + 1002
+    # Spilled outputs are loaded back at the end and the spill directory is removed
+    assert not any(isinstance(record, SpilledRecord) for record in context['steps'].values())
+    assert context['steps']['a']['output'] == 'x' * 1000
+    assert os.listdir(spill_dir) == []
+
+
+def test_spilled_record_loads_output_on_access(tmp_path):
+    import pickle
+
+    path = tmp_path / 'out.pkl'
+    path.write_bytes(pickle.dumps([1, 2, 3]))
+    record = SpilledRecord(str(path), {'success': True})
+
+    assert 'output' in record
+    assert record['output'] == [1, 2, 3]
+    assert record.get('output') == [1, 2, 3]
+    assert record['success'] is True
@@ -0,0 +1,136 @@
+# tests/test_pool.py
+"""
+Tests for per-execution adapter instances (adapters/pool.py)
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from adapters import ADAPTERS
+from adapters.pool import AdapterPool
+
+
+@pytest.fixture
+def pool():
+    return AdapterPool(ADAPTERS, max_idle=2)
+
+
+def test_each_execution_gets_its_own_clean_instance(pool):
+    prototype = ADAPTERS['step']
+    with pool.adapter('step') as first, pool.adapter('step') as second:
+        first.value(1)
+        second.value(2)
+
+        assert first is not second and prototype not in (first, second)
+        assert first.execute() == 1 and second.execute() == 2
+
+    assert prototype._params == {}
+
+
+def test_released_instances_are_reset_and_reused(pool):
+    with pool.adapter('step') as adapter:
+        adapter.value('stale')
+
+    with pool.adapter('step') as reused:
+        assert reused is adapter
+        assert reused._params == {}
+
+
+def test_idle_instances_are_bounded(pool):
+    instances = [pool.acquire('step') for _ in range(4)]
+    for instance in instances:
+        pool.release('step', instance)
+
+    assert len(pool._idle[('step', ADAPTERS['step'].__class__)]) == 2
+
+
+def test_replaced_prototype_is_not_served_from_old_instances(pool, step_adapter):
+    with pool.adapter('step'):
+        pass
+
+    class Replacement(step_adapter):
+        pass
+
+    ADAPTERS['step'] = Replacement('step')
+    with pool.adapter('step') as adapter:
+        assert type(adapter) is Replacement
+
+
+def test_unknown_adapter(pool):
+    with pytest.raises(ValueError, match='Unknown adapter'):
+        pool.acquire('missing')
+
+
+def test_thread_unsafe_adapters_are_serialized(pool):
+    assert pool.execution_lock(pool.acquire('step')) is None
+
+    active = []
+    overlaps = []
+
+    def run():
+        with pool.adapter('unsafe_step') as adapter:
+            active.append(adapter)
+            overlaps.append(len(active))
+            adapter.sleep(0.02).execute()
+            active.remove(adapter)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == [1, 1, 1, 1]
+
+
+class NativeAsyncAdapter:
+    """Thread-unsafe adapter with a native execute_async() that records overlapping executions."""
+
+    supports_async = True
+    thread_safe = False
+    active = 0
+    overlaps = []
+
+    async def execute_async(self, input_data=None):
+        cls = type(self)
+        cls.active += 1
+        cls.overlaps.append(cls.active)
+        await asyncio.sleep(0.02)
+        cls.active -= 1
+        return input_data
+
+
+def test_native_async_executions_are_serialized():
+    from core.async_engine import execute_adapter_async
+
+    NativeAsyncAdapter.overlaps = []
+    adapter = NativeAsyncAdapter()
+
+    async def main():
+        return await asyncio.gather(*[execute_adapter_async(adapter, index) for index in range(4)])
+
+    assert asyncio.run(main()) == [0, 1, 2, 3]
+    assert NativeAsyncAdapter.overlaps == [1, 1, 1, 1]
+
+
+def test_cancelled_waiter_does_not_leak_the_lock():
+    from adapters import ADAPTER_POOL
+    from core.async_engine import execute_adapter_async
+
+    adapter = NativeAsyncAdapter()
+    lock = ADAPTER_POOL.execution_lock(adapter)
+
+    async def main():
+        lock.acquire()
+        waiter = asyncio.ensure_future(execute_adapter_async(adapter))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        lock.release()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        # The pool thread that acquired the lock for the cancelled waiter releases it
+        return await asyncio.wait_for(execute_adapter_async(adapter, 'next'), 1)
+
+    assert asyncio.run(main()) == 'next'
@@ -0,0 +1,121 @@
+# tests/test_result_cache.py
+"""
+Tests for value fingerprints and the content-addressed step result cache
+(core/fingerprint.py, core/result_cache.py)
+"""
+
+import datetime
+import os
+import time
+
+import pytest
+
+from core.fingerprint import Unfingerprintable, fingerprint, fingerprint_or_none
+from core.result_cache import ResultCache
+
+
+def test_fingerprint_ignores_dict_order_but_not_types():
+    assert fingerprint({'a': 1, 'b': [1, 2]}) == fingerprint({'b': [1, 2], 'a': 1})
+    assert fingerprint(1) != fingerprint('1') != fingerprint(1.0)
+    assert fingerprint(True) != fingerprint(1)
+    assert fingerprint(b'ab') == fingerprint(bytearray(b'ab')) == fingerprint(memoryview(b'ab'))
+    assert fingerprint({1, 2}) == fingerprint({2, 1})
+    assert fingerprint(datetime.date(2024, 1, 2)) != fingerprint(datetime.date(2024, 1, 3))
+
+
+def test_unknown_types_have_no_fingerprint():
+    class Opaque:
+        pass
+
+    with pytest.raises(Unfingerprintable):
+        fingerprint([1, Opaque()])
+    assert fingerprint_or_none({'value': Opaque()}) is None
+
+
+def test_memory_tier_is_lru_bounded():
+    cache = ResultCache(max_memory_bytes=400)
+    cache.put('a', 'x' * 150)
+    cache.put('b', 'y' * 150)
+    cache.get('a')
+    cache.put('c', 'z' * 150)
+
+    assert cache.get('a') == (True, 'x' * 150)
+    assert cache.get('b') == (False, None)
+    assert cache.memory_bytes <= 400
+
+
+def test_hits_return_independent_copies():
+    cache = ResultCache()
+    cache.put('key', {'rows': [1]})
+    cache.get('key')[1]['rows'].append(2)
+
+    assert cache.get('key') == (True, {'rows': [1]})
+    assert cache.hit_ratio() == 1.0
+
+
+def test_unpicklable_value_is_not_stored():
+    cache = ResultCache()
+
+    assert cache.put('key', lambda: None) is False
+    assert cache.get('key') == (False, None)
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    ResultCache(disk_dir=str(tmp_path)).put('ab' * 32, [1, 2, 3])
+
+    assert ResultCache(disk_dir=str(tmp_path)).get('ab' * 32) == (True, [1, 2, 3])
+
+
+def test_disk_tier_evicts_least_recently_used_entries(tmp_path):
+    cache = ResultCache(max_memory_bytes=0, disk_dir=str(tmp_path), max_disk_bytes=1000)
+    keys = [f"{index:02d}" * 32 for index in range(4)]
+
+    for index, key in enumerate(keys[:3]):
+        cache.put(key, 'v' * 280)
+        # Distinct modification times for a deterministic LRU order
+        stamp = time.time() - 100 + index
+        os.utime(cache._disk_path(key), (stamp, stamp))
+
+    # Reading the oldest entry makes it the most recently used
+    assert cache.get(keys[0])[0]
+    cache.put(keys[3], 'v' * 280)
+
+    assert cache.disk_bytes() <= 1000
+    assert not os.path.exists(cache._disk_path(keys[1]))
+    assert cache.get(keys[0])[0] and cache.get(keys[3])[0]
+
+
+def test_disk_usage_includes_entries_from_earlier_runs(tmp_path):
+    ResultCache(disk_dir=str(tmp_path)).put('ab' * 32, 'v' * 500)
+    cache = ResultCache(disk_dir=str(tmp_path), max_disk_bytes=800)
+    cache.put('cd' * 32, 'w' * 500)
+
+    assert cache.disk_bytes() <= 800
+    assert cache.get('cd' * 32)[0]
+
+
+def test_engine_uses_disk_tier_by_default(tmp_path, monkeypatch, step_adapter):
+    from core.workflow_engine import WorkflowEngine
+
+    monkeypatch.chdir(tmp_path)
+    workflow = {'steps': [{'id': 'a', 'adapter': 'step', 'methods': [{'name': 'value', 'value': 'A'}]}]}
+
+    for _ in range(2):
+        engine = WorkflowEngine(state_dir=str(tmp_path / 'state'))
+        engine.workflows['wf'] = workflow
+        context = engine.execute_workflow('wf')
+        engine.shutdown()
+
+    assert engine.result_cache.disk_dir == os.path.join('data', 'step_cache')
+    assert context['steps']['a']['cached'] is True
+    assert len(step_adapter.calls) == 1
+
+
+def test_engine_without_disk_tier(tmp_path, monkeypatch):
+    from core.workflow_engine import WorkflowEngine
+
+    monkeypatch.chdir(tmp_path)
+    engine = WorkflowEngine(cache_dir=None)
+    engine.shutdown()
+
+    assert engine.result_cache.disk_dir is None
@@ -0,0 +1,108 @@
+# tests/test_singleflight.py
+"""
+Tests for single-flight coalescing of identical concurrent executions (core/singleflight.py)
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from adapters.cancellation import CancellationToken, OperationCancelled, use_token
+from core.singleflight import SingleFlight, allows_single_flight
+
+
+def slow_call(calls, result='done', delay=0.1):
+    def function():
+        calls.append(threading.current_thread().name)
+        time.sleep(delay)
+        return result
+    return function
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight('test')
+    calls = []
+
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda _: flight.do('key', slow_call(calls)), range(4)))
+
+    assert results == ['done'] * 4
+    assert len(calls) == 1
+    assert (flight.executions, flight.shared) == (1, 3)
+    assert len(flight) == 0
+
+
+def test_key_is_released_after_completion():
+    flight = SingleFlight('test')
+    calls = []
+
+    flight.do('key', slow_call(calls, delay=0))
+    flight.do('key', slow_call(calls, delay=0))
+
+    assert len(calls) == 2
+
+
+def test_none_key_disables_coalescing():
+    flight = SingleFlight('test')
+    calls = []
+
+    with ThreadPoolExecutor(3) as executor:
+        list(executor.map(lambda _: flight.do(None, slow_call(calls)), range(3)))
+
+    assert len(calls) == 3
+
+
+def test_waiters_receive_the_leaders_exception():
+    flight = SingleFlight('test')
+
+    def failing():
+        time.sleep(0.1)
+        raise ValueError('boom')
+
+    def call(_):
+        try:
+            return flight.do('key', failing)
+        except ValueError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(3) as executor:
+        assert list(executor.map(call, range(3))) == ['boom'] * 3
+
+
+def test_waiter_respects_its_own_deadline():
+    flight = SingleFlight('test')
+    leader = threading.Thread(target=flight.do, args=('key', slow_call([], delay=0.5)))
+    leader.start()
+    time.sleep(0.05)
+
+    with use_token(CancellationToken(timeout=0.05)):
+        with pytest.raises(OperationCancelled):
+            flight.do('key', slow_call([]))
+    leader.join()
+
+
+def test_async_calls_share_one_execution():
+    flight = SingleFlight('test')
+    calls = []
+
+    async def function():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'done'
+
+    async def main():
+        return await asyncio.gather(*[flight.do_async('key', function) for _ in range(3)])
+
+    assert asyncio.run(main()) == ['done'] * 3
+    assert calls == [1]
+
+
+def test_adapters_can_opt_out(step_adapter):
+    class SideEffects(step_adapter):
+        single_flight = False
+
+    assert allows_single_flight(step_adapter)
+    assert not allows_single_flight(SideEffects)
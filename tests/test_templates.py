@@ -0,0 +1,70 @@
+# tests/test_templates.py
+"""
+Tests for precompiled workflow templates and path accessors (core/templates.py)
+"""
+
+import pytest
+
+from core.templates import compile_path, compile_step, compile_template
+
+CONTEXT = {
+    'inputs': {'name': 'report', 'size': 3},
+    'steps': {'fetch': {'output': [{'id': 7}, {'id': 8}]}},
+}
+
+
+def test_render_substitutes_values():
+    template = compile_template('${inputs.name}-${inputs.size}.pdf')
+
+    assert template.render(CONTEXT) == 'report-3.pdf'
+
+
+def test_render_serializes_containers_as_json():
+    assert compile_template('data=${steps.fetch.output.1}').render(CONTEXT) == 'data={"id": 8}'
+
+
+def test_unresolved_reference_is_kept():
+    assert compile_template('${inputs.missing}/x').render(CONTEXT) == '${inputs.missing}/x'
+
+
+def test_static_template_is_not_interpolated():
+    template = compile_template('plain text')
+
+    assert template.is_static
+    assert template.render(CONTEXT) == 'plain text'
+
+
+def test_templates_and_paths_are_cached():
+    assert compile_template('${inputs.name}') is compile_template('${inputs.name}')
+    assert compile_path('${inputs.name}') is compile_path('${inputs.name}')
+
+
+def test_path_resolves_list_indexes():
+    assert compile_path('${ steps.fetch.output.0.id }').resolve(CONTEXT) == 7
+
+
+def test_path_errors():
+    assert compile_path('inputs.name') is None
+
+    with pytest.raises(ValueError, match='Cannot resolve path'):
+        compile_path('${steps.fetch.result}').resolve(CONTEXT)
+
+
+def test_compile_step_templates_only_dynamic_values():
+    templates = compile_step({
+        'id': 'render',
+        'input': '${steps.fetch.output}',
+        'methods': [
+            {'name': 'title', 'value': '${inputs.name}'},
+            {'name': 'dpi', 'value': 300},
+            {'name': 'mode', 'value': 'fast'},
+            {'value': 'no name'},
+        ],
+    })
+
+    (title, title_value, title_template), dpi, mode = templates.methods
+    assert (title, title_value) == ('title', '${inputs.name}')
+    assert title_template.render(CONTEXT) == 'report'
+    assert dpi == ('dpi', 300, None)
+    assert mode == ('mode', 'fast', None)
+    assert templates.input_path.resolve(CONTEXT) == CONTEXT['steps']['fetch']['output']
@@ -0,0 +1,110 @@
+# tests/test_workflow_cli.py
+"""
+End-to-end tests of runners/workflow_cli.py
+"""
+
+import json
+
+import pytest
+
+from runners.workflow_cli import main
+
+WORKFLOW = """
+workflow:
+  name: CLI test
+  inputs:
+    - name: greeting
+      default: hello
+  steps:
+    - id: first
+      adapter: step
+      methods:
+        - name: value
+          value: "${inputs.greeting}"
+    - id: second
+      adapter: step
+      methods:
+        - name: value
+          value: "${steps.first.output} world"
+  outputs:
+    - name: message
+      value: "${steps.second.output}"
+"""
+
+
+@pytest.fixture
+def workflow_path(tmp_path, monkeypatch):
+    """Writes the test workflow; the CLI keeps its state under data/ in the working directory."""
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'cli_test.yaml'
+    path.write_text(WORKFLOW)
+    return str(path)
+
+
+def test_incremental_second_run_is_up_to_date(workflow_path, step_adapter, capsys):
+    main(['run', '-w', workflow_path, '--incremental'])
+    assert 'Up-to-date steps skipped: 0/2' in capsys.readouterr().out
+
+    main(['run', '-w', workflow_path, '--incremental', '-o', 'result.json'])
+    output = capsys.readouterr().out
+
+    assert 'Up-to-date steps skipped: 2/2' in output
+    assert 'message: hello world' in output
+    assert len(step_adapter.calls) == 2
+
+    with open('result.json') as f:
+        steps = json.load(f)['steps']
+    assert all(record['up_to_date'] for record in steps.values())
+
+
+def test_incremental_rerun_after_input_change(workflow_path, capsys):
+    main(['run', '-w', workflow_path, '--incremental'])
+    main(['run', '-w', workflow_path, '--incremental', '-p', 'greeting=hi'])
+    output = capsys.readouterr().out
+
+    assert 'Up-to-date steps skipped: 0/2' in output.split('Executing workflow')[-1]
+    assert 'message: hi world' in output
+
+
+def test_failed_checkpointed_run_resumes(workflow_path, step_adapter, capsys):
+    with open(workflow_path) as f:
+        fixed = f.read()
+    with open(workflow_path, 'w') as f:
+        f.write(fixed.replace('value: "${steps.first.output} world"',
+                              'value: "${steps.first.output} world"\n        - name: fail\n          value: broken'))
+
+    with pytest.raises(SystemExit):
+        main(['run', '-w', workflow_path, '--checkpoint'])
+    output = capsys.readouterr().out
+    assert 'Step second failed: broken' in output
+    run_id = output.split('--run-id ')[1].split()[0]
+
+    # Fix the step and resume - 'first' is not executed again
+    with open(workflow_path, 'w') as f:
+        f.write(fixed)
+    main(['resume', '-w', workflow_path, '--run-id', run_id])
+
+    assert 'message: hello world' in capsys.readouterr().out
+    assert [call['value'] for call in step_adapter.calls] == ['hello', 'hello world', 'hello world']
+
+
+def test_resume_unknown_run_fails(workflow_path, capsys):
+    with pytest.raises(SystemExit):
+        main(['resume', '-w', workflow_path, '--run-id', 'missing'])
+
+    assert 'Checkpoint not found: missing' in capsys.readouterr().out
+
+
+def test_trace_is_saved_and_summarized(workflow_path, capsys):
+    main(['run', '-w', workflow_path, '--trace', 'trace.json'])
+    output = capsys.readouterr().out
+
+    assert 'Step timings:' in output
+    assert 'Trace saved to: trace.json' in output
+
+    with open('trace.json') as f:
+        trace = json.load(f)
+    steps = [event for event in trace['traceEvents'] if event.get('cat') == 'step']
+    assert sorted(event['name'] for event in steps) == ['first', 'second']
+    assert all(event['ph'] == 'X' and event['args']['status'] == 'ok' for event in steps)
+    assert trace['otherData']['run_id'] in output
@@ -0,0 +1,118 @@
+# tests/test_workflow_engine.py
+"""
+Tests for the concurrent workflow scheduler: implicit dependencies and parallelism
+"""
+
+import time
+
+import pytest
+
+
+def run(engine, steps, **options):
+    """Executes an in-memory workflow definition."""
+    engine.workflows['wf'] = dict(options, steps=steps)
+    return engine.execute_workflow('wf')
+
+
+def step(step_id, value=None, sleep=0, **extra):
+    """Builds a 'step' adapter step returning value after sleep seconds."""
+    methods = [{'name': 'sleep', 'value': sleep}]
+    if value is not None:
+        methods.append({'name': 'value', 'value': value})
+    return dict(extra, id=step_id, adapter='step', methods=methods)
+
+
+def test_independent_steps_run_concurrently(engine):
+    start = time.monotonic()
+    context = run(engine, [step('a', 1, sleep=0.3), step('b', 2, sleep=0.3), step('c', 3, sleep=0.3)])
+
+    assert time.monotonic() - start < 0.8
+    assert [context['steps'][step_id]['output'] for step_id in 'abc'] == [1, 2, 3]
+
+
+def test_template_reference_orders_steps(engine):
+    context = run(engine, [step('a', 'A', sleep=0.2), step('b', '${steps.a.output}-B')])
+
+    assert context['steps']['b']['output'] == 'A-B'
+
+
+def test_condition_with_bare_step_reference_waits_for_step(engine):
+    # Regression: the condition used to be evaluated before the slow step finished
+    context = run(engine, [
+        step('a', {'value': 1}, sleep=0.3),
+        step('b', 'ran', condition="steps.a.output.value == 1"),
+        step('c', 'ran', condition="steps['a'].output.value == 2"),
+    ])
+
+    assert context['steps']['b']['output'] == 'ran'
+    assert context['steps']['c'] == {'skipped': True}
+
+
+def test_nested_method_values_are_dependencies(engine, step_adapter):
+    run(engine, [
+        step('b', {'query': {'source': '${steps.a.output}'}}),
+        step('a', 'A', sleep=0.2),
+    ])
+
+    assert [call['value'] for call in step_adapter.calls] == ['A', {'query': {'source': '${steps.a.output}'}}]
+
+
+def test_whole_steps_access_reads_preceding_steps(engine):
+    context = run(engine, [
+        step('a', 1, sleep=0.2),
+        step('b', 2, sleep=0.1),
+        step('count', 'many', condition="len(steps) == 2"),
+        step('later', 4),
+    ])
+
+    assert context['steps']['count']['output'] == 'many'
+    assert context['steps']['later']['output'] == 4
+
+
+def test_plan_reads_include_all_references(engine):
+    plan = engine.compile_plan('wf', {'steps': [
+        step('a', 1),
+        step('b', ['${steps.a.output}']),
+        step('c', condition="steps.b.output"),
+        step('d', condition="len(steps) > 0"),
+    ]})
+
+    assert plan.reads['b'] == ('a',)
+    assert plan.reads['c'] == ('b',)
+    assert plan.reads['d'] == ('a', 'b', 'c')
+    assert plan.pending['d'] == 3
+
+
+def test_reference_cycle_is_rejected(engine):
+    with pytest.raises(ValueError, match='Circular dependency'):
+        run(engine, [step('a', '${steps.b.output}'), step('b', condition="steps.a.output")])
+
+
+def test_failed_step_stops_workflow(engine):
+    failing = step('a')
+    failing['methods'].append({'name': 'fail', 'value': 'boom'})
+
+    with pytest.raises(RuntimeError, match='boom'):
+        run(engine, [failing, step('b', depends_on='a')])
+
+
+def test_max_parallel_limits_concurrency(engine):
+    start = time.monotonic()
+    run(engine, [step(name, name, sleep=0.2) for name in 'abc'], max_parallel=1)
+
+    assert time.monotonic() - start >= 0.6
+
+
+def test_async_engine_waits_for_condition_reference(tmp_path):
+    import asyncio
+    from core.async_engine import AsyncWorkflowEngine
+
+    engine = AsyncWorkflowEngine(state_dir=str(tmp_path), cache_dir=None)
+    engine.workflows['wf'] = {'steps': [step('a', {'value': 1}, sleep=0.3),
+                                        step('b', 'ran', condition="steps.a.output.value == 1")]}
+    try:
+        context = asyncio.run(engine.execute_workflow_async('wf'))
+    finally:
+        engine.shutdown()
+
+    assert context['steps']['b']['output'] == 'ran'